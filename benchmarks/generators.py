@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Generadores sintéticos (con semilla) para cada fuente soportada.
+
+- Cisco ASA: syslog con mezcla de 302015 (Built UDP), 106023 (Deny) y 305012
+  (Teardown dynamic translation). Como en el syslog real, la línea no trae año.
+- Splunk: CSV con headers sinónimos (_time, host, src, dest, dport, signature, _raw …),
+  distintos según la variante.
+- Cisco Secure Endpoint: JSONL con objetos anidados (computer, file, network, process).
+
+Todas comparten los mismos pools de hosts, IPs, cuentas y hashes, así que el
+combinado tiene cardinalidades de un caso real: pocos dispositivos, miles de IPs
+internas y externas con distribución sesgada, pocos hashes.
+"""
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+import csv, json, random, time
+
+SEED = 1337
+# Inicio de la línea de tiempo sintética (2025-11-04 00:00:00 UTC)
+EPOCH0 = 1762214400
+
+FIREWALLS = 4
+INTERNAL_HOSTS = 2000
+EXTERNAL_HOSTS = 20000
+USERS = 300
+HASHES = 400
+THREATS = ("W32.LockBit.RansomA", "Emotet.Loader", "QakBot.Banker", "CobaltStrike.Beacon")
+ASA_MIX = (("302015", 5), ("106023", 3), ("305012", 2))
+# Variantes de header de Splunk (todas se resuelven por sinónimos)
+SPLUNK_HEADERS = (
+    ["_time", "host", "src", "dest", "sport", "dport", "proto", "action", "user", "signature", "sha256", "_raw"],
+    ["date", "sourcetype", "client_ip", "destination", "spt", "dpt", "protocol", "result", "account",
+     "threatName", "md5", "message"],
+    ["timestamp", "device", "srcaddr", "dst", "src_port", "dst_port", "proto", "status", "username",
+     "malware_name", "malware_hash", "msg"],
+)
+
+class Pools:
+    """Valores compartidos por todas las fuentes, derivados de la semilla."""
+    def __init__(self, seed: int = SEED):
+        rng = random.Random(seed)
+        self.firewalls = [f"fw-asa{i + 1}" for i in range(FIREWALLS)]
+        self.hosts = [f"WS-{i:04d}" for i in range(INTERNAL_HOSTS)]
+        self.internal = [f"10.{rng.randint(0, 3)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+                         for _ in range(INTERNAL_HOSTS)]
+        self.external = [f"{rng.choice((23, 45, 93, 104, 151, 185, 198, 203))}.{rng.randint(0, 255)}."
+                         f"{rng.randint(0, 255)}.{rng.randint(1, 254)}" for _ in range(EXTERNAL_HOSTS)]
+        self.users = [f"user{i:03d}" for i in range(USERS)] + ["svc_backup", "administrator"]
+        self.sha256 = [f"{rng.getrandbits(256):064x}" for _ in range(HASHES)]
+        self.md5 = [h[:32] for h in self.sha256]
+
+def _skewed(rng: random.Random, seq: List):
+    # Pocos valores concentran la mayoría de los eventos
+    return seq[int(rng.paretovariate(1.2)) % len(seq)]
+
+def _clock(rng: random.Random):
+    """Epochs crecientes, con varios eventos por segundo."""
+    t = EPOCH0
+    while True:
+        t += rng.random() < 0.3
+        yield t
+
+# ----------------- Cisco ASA -----------------
+def asa_lines(n: int, seed: int = SEED) -> Iterator[str]:
+    """Líneas syslog ASA (sin salto de línea), las mismas que escribe write_asa."""
+    rng, pools = random.Random(seed), Pools(seed)
+    ids = [m for m, w in ASA_MIX for _ in range(w)]
+    clock = _clock(rng)
+    for i in range(n):
+        stamp = time.strftime("%b %d %H:%M:%S", time.gmtime(next(clock)))
+        fw = pools.firewalls[i % FIREWALLS]
+        src, dst = _skewed(rng, pools.internal), _skewed(rng, pools.external)
+        sport = rng.randint(1024, 65535)
+        msgid = rng.choice(ids)
+        if msgid == "302015":
+            dport = rng.choice((53, 53, 123, 443))
+            msg = (f"%ASA-6-302015: Built outbound UDP connection {rng.randint(1, 9999999)} for "
+                   f"outside:{dst}/{dport} ({dst}/{dport}) to inside:{src}/{sport} ({src}/{sport})")
+        elif msgid == "106023":
+            dport = rng.choice((22, 445, 3389, 23))
+            msg = (f"%ASA-4-106023: Deny tcp src outside:{dst}/{sport} dst inside:{src}/{dport} "
+                   f'by access-group "outside_access_in" [0x0, 0x0]')
+        else:
+            msg = (f"%ASA-6-305012: Teardown dynamic TCP translation from inside:{src}/{sport} "
+                   f"to outside:203.0.113.{rng.randint(1, 254)}/{sport} duration 0:00:{rng.randint(10, 59)}")
+        yield f"{stamp} {fw} {msg}"
+
+def write_asa(path: Path, n: int, seed: int = SEED) -> None:
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for line in asa_lines(n, seed):
+            f.write(line + "\n")
+
+# ----------------- Splunk CSV -----------------
+def write_splunk(path: Path, n: int, seed: int = SEED, variant: int = 0) -> None:
+    rng, pools = random.Random(seed + 1), Pools(seed)
+    header = SPLUNK_HEADERS[variant % len(SPLUNK_HEADERS)]
+    hashes = pools.md5 if "md5" in header else pools.sha256
+    clock = _clock(rng)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(header)
+        for _ in range(n):
+            stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(next(clock)))
+            i = int(rng.paretovariate(1.2)) % INTERNAL_HOSTS
+            src, dst = pools.internal[i], _skewed(rng, pools.external)
+            dport = rng.choice(("443", "443", "80", "53", "8080"))
+            threat = rng.random() < 0.03
+            raw = f"{stamp} {pools.hosts[i]} conn {src} -> {dst}:{dport}"
+            # Sin IP de origen el parser la recupera del texto crudo
+            w.writerow([
+                stamp, pools.hosts[i], "" if rng.random() < 0.05 else src, dst,
+                rng.randint(1024, 65535), dport, "tcp", "blocked" if threat else "allowed",
+                _skewed(rng, pools.users) if rng.random() < 0.6 else "",
+                rng.choice(THREATS) if threat else "", _skewed(rng, hashes) if threat else "", raw,
+            ])
+
+# ----------------- Cisco Secure Endpoint JSONL -----------------
+def write_amp(path: Path, n: int, seed: int = SEED) -> None:
+    rng, pools = random.Random(seed + 2), Pools(seed)
+    clock = _clock(rng)
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for _ in range(n):
+            stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(next(clock)))
+            i = int(rng.paretovariate(1.2)) % INTERNAL_HOSTS
+            ev: Dict = {
+                "date": stamp,
+                "computer_name": pools.hosts[i],
+                "computer": {"connector_guid": f"{i:08x}-0000-4000-8000-{seed:012x}",
+                             "local_ip": pools.internal[i], "os": "Windows 10"},
+                "user": _skewed(rng, pools.users),
+            }
+            r = rng.random()
+            if r < 0.1:
+                h = _skewed(rng, pools.sha256)
+                ev.update({
+                    "event_type": "Threat Detected", "disposition": rng.choice(("Malicious", "Quarantined")),
+                    "detection": rng.choice(THREATS),
+                    "file": {"sha256": h, "path": f"C:\\Users\\{ev['user']}\\AppData\\Local\\Temp\\{h[:8]}.exe"},
+                    "process": {"name": "explorer.exe", "command_line": f"explorer.exe /select,{h[:8]}.exe"},
+                })
+            else:
+                ev.update({
+                    "event_type": "Network Connection", "disposition": "Clean",
+                    "dst_ip": _skewed(rng, pools.external),
+                    "network": {"src_port": rng.randint(1024, 65535),
+                                "dst_port": rng.choice((443, 443, 80, 445)), "protocol": "TCP",
+                                "bytes_in": rng.randint(0, 10 ** 6), "bytes_out": rng.randint(0, 10 ** 5)},
+                    "process": {"name": rng.choice(("chrome.exe", "svchost.exe", "powershell.exe"))},
+                })
+                if rng.random() < 0.2:
+                    ev["network"]["domain"] = f"cdn{rng.randint(1, 50)}.example.com"
+            f.write(json.dumps(ev, separators=(",", ":")) + "\n")
+
+GENERATORS: Dict[str, Callable[[Path, int, int], None]] = {
+    "cisco_asa": write_asa,
+    "splunk": write_splunk,
+    "cisco_secure_endpoint": write_amp,
+}
+SUFFIXES = {"cisco_asa": ".txt", "splunk": ".csv", "cisco_secure_endpoint": ".jsonl"}
+
+def dataset(data_dir: Path, source: str, n: int, seed: int = SEED) -> Path:
+    """Ruta del archivo sintético (se genera solo si todavía no existe)."""
+    path = Path(data_dir) / f"{source}_{n}_{seed}{SUFFIXES[source]}"
+    if not path.exists():
+        tmp = path.with_name(path.name + ".partial")
+        GENERATORS[source](tmp, n, seed)
+        tmp.replace(path)
+    return path
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Regresión de tiempo sobre entradas adversariales.
+
+    python -m benchmarks.pathological [--budget-ms 5]
+
+Pasa cada línea de benchmarks/data/asa_pathological.txt por el normalizador ASA
+y por los extractores de IP de Splunk y Secure Endpoint. Termina con código 1 si
+alguna línea supera el presupuesto por línea.
+"""
+from pathlib import Path
+from typing import Callable, List, Tuple
+import argparse, sys, time
+
+from normalizer.asa import parse_cisco_line
+from normalizer.splunk import _first_ipv4
+from normalizer.cisco_secure_endpoint import _extract_first_ip_any
+
+CORPUS = Path(__file__).resolve().parent / "data" / "asa_pathological.txt"
+
+def load_corpus(path: Path = CORPUS) -> List[str]:
+    with path.open("r", encoding="utf-8") as f:
+        return [ln.rstrip("\n") for ln in f if ln.strip() and not ln.startswith("#")]
+
+CHECKS: List[Tuple[str, Callable[[str], object]]] = [
+    ("asa", parse_cisco_line),
+    ("splunk_ip", _first_ipv4),
+    ("amp_ip", _extract_first_ip_any),
+]
+
+def time_line(fn: Callable[[str], object], line: str, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(line)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Regresión de tiempo con líneas patológicas")
+    ap.add_argument("--budget-ms", type=float, default=5.0, help="Máximo por línea y por chequeo (ms)")
+    ap.add_argument("--corpus", type=Path, default=CORPUS)
+    args = ap.parse_args(argv)
+
+    lines = load_corpus(args.corpus)
+    failures = 0
+    worst = 0.0
+    for i, line in enumerate(lines, start=1):
+        for name, fn in CHECKS:
+            ms = time_line(fn, line) * 1000
+            worst = max(worst, ms)
+            if ms > args.budget_ms:
+                failures += 1
+                print(f"[FAIL] línea {i} ({len(line)} chars) {name}: {ms:.2f} ms")
+    print(f"[{'OK' if not failures else 'ERROR'}] {len(lines)} líneas, peor caso {worst:.2f} ms "
+          f"(presupuesto {args.budget_ms} ms)")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks de punta a punta con datos sintéticos.
+
+    python -m benchmarks.runner [--sizes 10000,100000,1000000] [--out resultados.json]
+                                [--compare base.json] [--tracemalloc]
+
+Por cada tamaño (eventos totales, repartidos según MIX entre las tres fuentes):
+- eventos/s de cada parser sobre su archivo,
+- normalize_files + generate_report sobre las tres fuentes juntas.
+Cada medición corre en un proceso nuevo, así el pico de RSS es el de esa etapa.
+Los resultados se escriben en JSON; con --compare se muestra la variación
+respecto de una corrida anterior (por ejemplo, de otro commit).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import argparse, contextlib, json, multiprocessing, os, platform, subprocess, sys, tempfile, time, tracemalloc
+
+from benchmarks.generators import SEED, dataset
+
+try:
+    import resource
+except ImportError:  # Windows: sin pico de RSS
+    resource = None
+
+# Proporción de eventos por fuente
+MIX = {"cisco_asa": 0.5, "splunk": 0.3, "cisco_secure_endpoint": 0.2}
+DEFAULT_SIZES = "10000,100000,1000000"
+
+def _peak_rss_mib() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KiB; macOS, bytes
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+# ----------------- Tareas (corren en el proceso hijo) -----------------
+def _parse(source: str, path: str) -> Dict:
+    from normalizer.registry import registered_parsers
+    parser = next(s.parser for s in registered_parsers() if s.name == source)
+    t0 = time.perf_counter()
+    n = sum(1 for _ in parser(Path(path)))
+    dt = time.perf_counter() - t0
+    return {"events": n, "seconds": round(dt, 3), "events_per_s": round(n / dt) if dt else None}
+
+def _end_to_end(paths: List[str], work_dir: str) -> Dict:
+    from normalizer import normalize_files
+    from report_generator import generate_report
+    csv_path = os.path.join(work_dir, "combined.csv")
+    t0 = time.perf_counter()
+    normalize_files(paths, csv_path)
+    t1 = time.perf_counter()
+    generate_report(csv_path, os.path.join(work_dir, "Reporte.docx"))
+    t2 = time.perf_counter()
+    return {"normalize_s": round(t1 - t0, 3), "report_s": round(t2 - t1, 3), "total_s": round(t2 - t0, 3)}
+
+TASKS: Dict[str, Callable[..., Dict]] = {"parse": _parse, "end_to_end": _end_to_end}
+
+def _child(task: str, args: tuple, trace: bool) -> Dict:
+    if trace:
+        tracemalloc.start()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        res = TASKS[task](*args)
+    if trace:
+        res["peak_traced_mib"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+        tracemalloc.stop()
+    res["peak_rss_mib"] = _peak_rss_mib()
+    return res
+
+def isolated(task: str, *args, trace: bool = False) -> Dict:
+    """Corre una tarea en un intérprete nuevo (spawn: sin memoria heredada)."""
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ex:
+        return ex.submit(_child, task, args, trace).result()
+
+# ----------------- Corrida -----------------
+def _meta(seed: int, trace: bool) -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "seed": seed,
+        "tracemalloc": trace,
+    }
+
+def run(sizes: List[int], data_dir: Path, seed: int = SEED, trace: bool = False) -> Dict:
+    results = []
+    for size in sizes:
+        paths = {}
+        for source, share in MIX.items():
+            print(f"[INFO] {size}: generando {source} …")
+            paths[source] = str(dataset(data_dir, source, max(1, int(size * share)), seed))
+        entry: Dict = {"size": size, "parsers": {}}
+        for source, path in paths.items():
+            entry["parsers"][source] = r = isolated("parse", source, path, trace=trace)
+            print(f"[OK] {size}: {source} {r['events_per_s']} ev/s, pico RSS {r['peak_rss_mib']} MiB")
+        with tempfile.TemporaryDirectory(prefix="bench_", dir=data_dir) as work:
+            entry["end_to_end"] = r = isolated("end_to_end", list(paths.values()), work, trace=trace)
+        print(f"[OK] {size}: normalize {r['normalize_s']} s + reporte {r['report_s']} s, "
+              f"pico RSS {r['peak_rss_mib']} MiB")
+        results.append(entry)
+    return {"meta": _meta(seed, trace), "results": results}
+
+# ----------------- Comparación -----------------
+def _metrics(doc: Dict) -> Dict[tuple, float]:
+    out = {}
+    for e in doc.get("results", []):
+        for source, r in e.get("parsers", {}).items():
+            out[(e["size"], source, "events_per_s")] = r.get("events_per_s")
+            out[(e["size"], source, "peak_rss_mib")] = r.get("peak_rss_mib")
+            out[(e["size"], source, "peak_traced_mib")] = r.get("peak_traced_mib")
+        for k, v in e.get("end_to_end", {}).items():
+            out[(e["size"], "end_to_end", k)] = v
+    return out
+
+def compare(base: Dict, new: Dict) -> None:
+    old_m, new_m = _metrics(base), _metrics(new)
+    print(f"Comparación: {base['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    if base["meta"].get("tracemalloc") != new["meta"].get("tracemalloc"):
+        print("[WARN] Solo una de las corridas usó --tracemalloc: los tiempos no son comparables.")
+    for key in sorted(k for k in new_m if k in old_m):
+        a, b = old_m[key], new_m[key]
+        if not a or b is None:
+            continue
+        size, stage, metric = key
+        print(f"  {size:>9} {stage:<22} {metric:<15} {a:>12} -> {b:>12}  ({(b - a) / a * 100:+.1f}%)")
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmarks con datos sintéticos (parsers y punta a punta)")
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Eventos totales por corrida, separados por coma (default: {DEFAULT_SIZES})")
+    ap.add_argument("--seed", type=int, default=SEED)
+    ap.add_argument("--data-dir", type=Path, default=Path(tempfile.gettempdir()) / "report_benchmarks",
+                    help="Dónde se guardan (y reutilizan) los archivos sintéticos")
+    ap.add_argument("--out", type=Path, default=None, help="Escribe los resultados en este JSON")
+    ap.add_argument("--compare", type=Path, default=None, help="JSON de una corrida anterior para comparar")
+    ap.add_argument("--tracemalloc", action="store_true",
+                    help="Además mide el pico de memoria de Python con tracemalloc (hace más lentas las etapas)")
+    args = ap.parse_args(argv)
+
+    sizes = [int(s.replace("_", "")) for s in args.sizes.split(",") if s.strip()]
+    args.data_dir.mkdir(parents=True, exist_ok=True)
+    doc = run(sizes, args.data_dir, args.seed, args.tracemalloc)
+    text = json.dumps(doc, indent=2, ensure_ascii=False)
+    if args.out:
+        args.out.write_text(text + "\n", encoding="utf-8")
+        print(f"[OK] Resultados en {args.out}")
+    else:
+        print(text)
+    if args.compare:
+        compare(json.loads(args.compare.read_text(encoding="utf-8")), doc)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Comparación de backends de summarize sobre un combined CSV sintético.
+
+    python -m benchmarks.summary_backends [--rows 10000000] [--csv ruta] [--regen]
+
+Genera (con semilla fija) un CSV con el formato del normalizador y cardinalidades
+de un caso real (pocos dispositivos, miles de IPs con distribución sesgada, pocos
+hashes), y mide:
+- lectura del CSV sola (piso común a todos los backends),
+- backend 'python' (fields.summarize sobre iter_combined, streaming),
+- backend 'numpy' (numpy_backend.summarize_numpy).
+Termina con código 1 si los resúmenes no coinciden.
+"""
+from pathlib import Path
+from typing import Callable, Tuple
+import argparse, csv, os, random, sys, tempfile, time
+
+from normalizer.core import FIELDNAMES, open_text
+from report_generator.fields import iter_combined, summarize
+from report_generator import numpy_backend
+
+SEED = 1337
+DEVICES = 12
+SRC_POOL = 5000
+DST_POOL = 20000
+HASH_POOL = 500
+USERS = 200
+PORTS = ("443", "80", "53", "22", "3389", "445", "8080", "25")
+MALWARE = ("LockBit", "Emotet", "QakBot", "Cobalt Strike")
+MSG = '%ASA-4-106023: Deny tcp src outside:{}/{} dst inside:{}/{} by access-group "outside_in"'
+
+def _skewed(rng: random.Random, n: int) -> int:
+    # Pocos valores concentran la mayoría de los eventos
+    return int(rng.paretovariate(1.1)) % n
+
+def write_combined(path: Path, rows: int, seed: int = SEED) -> None:
+    rng = random.Random(seed)
+    srcs = [f"10.{rng.randint(0, 3)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}" for _ in range(SRC_POOL)]
+    dsts = [f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+            for _ in range(DST_POOL)]
+    hashes = [f"{rng.getrandbits(256):064x}" for _ in range(HASH_POOL)]
+    epoch0 = 1762000000
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(FIELDNAMES)
+        for i in range(rows):
+            epoch = epoch0 + i // 50
+            ts = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(epoch))
+            src, dst = srcs[_skewed(rng, SRC_POOL)], dsts[_skewed(rng, DST_POOL)]
+            sport, dport = str(rng.randint(1024, 65535)), PORTS[_skewed(rng, len(PORTS))]
+            infected = rng.random() < 0.05
+            w.writerow([
+                ts, epoch, f"fw-{i % DEVICES:02d}", src, sport, dst, dport, "tcp", "deny",
+                f"user{_skewed(rng, USERS)}" if rng.random() < 0.3 else "",
+                MALWARE[_skewed(rng, len(MALWARE))] if infected else "",
+                hashes[_skewed(rng, HASH_POOL)] if infected else "",
+                MSG.format(src, sport, dst, dport), "4", "106023",
+            ])
+
+def read_only(path: Path) -> int:
+    with open_text(path, newline="") as f:
+        return sum(1 for _ in csv.reader(f))
+
+def timed(fn: Callable[[], object]) -> Tuple[float, object]:
+    t0 = time.perf_counter()
+    res = fn()
+    return time.perf_counter() - t0, res
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Backends de summarize: python vs numpy")
+    ap.add_argument("--rows", type=int, default=10_000_000)
+    ap.add_argument("--csv", type=Path, default=None, help="CSV a usar (se genera si no existe)")
+    ap.add_argument("--regen", action="store_true", help="Regenera el CSV aunque exista")
+    args = ap.parse_args(argv)
+
+    if not numpy_backend.available():
+        print("[ERROR] numpy no está instalado.")
+        return 1
+    path = args.csv or Path(tempfile.gettempdir()) / f"bench_combined_{args.rows}.csv"
+    if args.regen or not path.exists():
+        print(f"[INFO] Generando {args.rows} filas en {path} …")
+        write_combined(path, args.rows)
+    print(f"[INFO] {path} ({os.path.getsize(path) / 2**20:.0f} MiB)")
+
+    t_read, _ = timed(lambda: read_only(path))
+    t_py, s_py = timed(lambda: summarize(iter_combined(path)))
+    t_np, s_np = timed(lambda: numpy_backend.summarize_numpy(str(path)))
+    print(f"lectura CSV     : {t_read:7.2f} s")
+    print(f"backend python  : {t_py:7.2f} s  (resumen {t_py - t_read:6.2f} s sobre la lectura)")
+    print(f"backend numpy   : {t_np:7.2f} s  (resumen {t_np - t_read:6.2f} s sobre la lectura)")
+    print(f"speedup total {t_py / t_np:.2f}x, sobre la lectura {(t_py - t_read) / max(t_np - t_read, 1e-9):.2f}x")
+    if s_py != s_np:
+        print("[ERROR] Los resúmenes no coinciden.")
+        return 1
+    print("[OK] Resúmenes idénticos.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Generador de carga para el receptor syslog, todo en localhost.
+
+    python -m benchmarks.syslog_load [--count 200000] [--rate 50000] [--proto udp|tcp]
+    python -m benchmarks.syslog_load --port 5514 --proto udp   # contra un receptor ya corriendo
+
+Sin --port levanta un SyslogReceiver en un puerto libre dentro del mismo proceso,
+envía `count` líneas ASA sintéticas (con `<PRI>`, como las manda el firewall) a
+`rate` mensajes/s y, al terminar, verifica que todas llegaron a la salida.
+Termina con código 1 si faltan filas.
+"""
+from pathlib import Path
+from typing import List
+import argparse, asyncio, socket, sys, tempfile, time
+
+from normalizer.syslog_receiver import SyslogReceiver
+from .generators import SEED, asa_lines
+
+# Mensajes por tanda entre dos chequeos del ritmo de envío
+SEND_CHUNK = 500
+
+def payloads(count: int, seed: int = SEED) -> List[bytes]:
+    # <166> = local4.info, lo habitual en ASA
+    return [f"<166>{line}".encode("utf-8") for line in asa_lines(count, seed)]
+
+async def _send_udp(host: str, port: int, msgs: List[bytes], rate: float) -> None:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    t0 = time.perf_counter()
+    try:
+        for i in range(0, len(msgs), SEND_CHUNK):
+            for m in msgs[i:i + SEND_CHUNK]:
+                sock.sendto(m, (host, port))
+            # Ritmo objetivo; cede el loop para que el receptor (si es local) lea
+            ahead = (i + SEND_CHUNK) / rate - (time.perf_counter() - t0) if rate else 0
+            await asyncio.sleep(max(0.0, ahead))
+    finally:
+        sock.close()
+
+async def _send_tcp(host: str, port: int, msgs: List[bytes], rate: float) -> None:
+    _, writer = await asyncio.open_connection(host, port)
+    t0 = time.perf_counter()
+    for i in range(0, len(msgs), SEND_CHUNK):
+        writer.write(b"".join(m + b"\n" for m in msgs[i:i + SEND_CHUNK]))
+        await writer.drain()
+        ahead = (i + SEND_CHUNK) / rate - (time.perf_counter() - t0) if rate else 0
+        await asyncio.sleep(max(0.0, ahead))
+    writer.close()
+    await writer.wait_closed()
+
+async def _run(args) -> int:
+    msgs = payloads(args.count, args.seed)
+    send = _send_udp if args.proto == "udp" else _send_tcp
+    if args.port:
+        t0 = time.perf_counter()
+        await send(args.host, args.port, msgs, args.rate)
+        dt = time.perf_counter() - t0
+        print(f"[OK] Enviados {len(msgs)} mensajes {args.proto.upper()} en {dt:.2f} s ({len(msgs) / dt:,.0f}/s)")
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="syslog_load_") as out_dir:
+        rx = SyslogReceiver(out_dir, args.host, udp_port=0 if args.proto == "udp" else None,
+                            tcp_port=0 if args.proto == "tcp" else None)
+        await rx.start()
+        port = rx.udp_port if args.proto == "udp" else rx.tcp_port
+        t0 = time.perf_counter()
+        await send(args.host, port, msgs, args.rate)
+        # Los últimos datagramas pueden seguir en el buffer del socket
+        deadline = time.monotonic() + 5
+        while rx.received < len(msgs) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        await rx.stop()
+        dt = time.perf_counter() - t0
+        rows = sum(sum(1 for _ in open(p, encoding="utf-8")) - 1 for p in Path(out_dir).glob("*.csv"))
+    lost = len(msgs) - rx.received
+    print(f"[{'OK' if rows == len(msgs) else 'ERROR'}] {args.proto.upper()}: enviados {len(msgs)}, "
+          f"recibidos {rx.received}, descartados en cola {rx.dropped}, perdidos en el socket {lost}, "
+          f"filas escritas {rows} ({len(msgs) / dt:,.0f} msg/s)")
+    return 0 if rows == len(msgs) else 1
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Carga sintética de syslog ASA sobre localhost")
+    ap.add_argument("--count", type=int, default=200_000, help="Mensajes a enviar")
+    ap.add_argument("--rate", type=float, default=50_000, help="Mensajes por segundo (0 = sin límite)")
+    ap.add_argument("--proto", choices=("udp", "tcp"), default="udp")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=None, help="Receptor externo; sin esto se levanta uno local")
+    ap.add_argument("--seed", type=int, default=SEED)
+    args = ap.parse_args(argv)
+    return asyncio.run(_run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
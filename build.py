@@ -0,0 +1,53 @@
+# python build.py --in "LockBit Case/cisco_fw.txt" --in "LockBit Case/splunk_siem.csv" --in "LockBit Case/cisco_edr.jsonl" --out Reporte_Borrador.docx --csv lockbit_combined.csv
+
+from report_generator.run import build_report
+from normalizer import stats
+import argparse
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Logs crudos (Cisco ASA, Splunk CSV, Cisco Secure Endpoint AMP) -> borrador de reporte SOC L1, en un solo paso"
+    )
+    ap.add_argument("--in", dest="inputs", action="append", required=True,
+                    help="Ruta de entrada; puede venir comprimida en gzip/bz2/xz (puedes repetir --in varias veces)")
+    ap.add_argument("--out", dest="outfile", default="Reporte_Borrador.docx", help="Ruta de salida .docx")
+    ap.add_argument("--csv", dest="combined_csv", default=None,
+                    help="Además escribe el CSV unificado en esta ruta (opcional; .csv.gz/.bz2/.xz comprimido)")
+    ap.add_argument("--max-rows-in-memory", dest="max_rows", type=int, default=None,
+                    help="Presupuesto de filas en memoria; activa el ordenamiento externo (runs en disco)")
+    ap.add_argument("--workers", dest="workers", type=int, default=1,
+                    help="Procesos en paralelo (por archivo y por rangos de archivos grandes)")
+    ap.add_argument("--incremental", action="store_true",
+                    help="Con --csv: guarda checkpoints y en corridas siguientes parsea solo lo agregado a cada entrada")
+    ap.add_argument("--alert-id", dest="alert_id", default=None, help="No. de alerta (opcional)")
+    ap.add_argument("--criticidad", dest="criticidad", default=None, help="Criticidad (opcional)")
+    ap.add_argument("--reportado-por", dest="reportado_por", default=None, help="Nombre del analista (opcional)")
+    ap.add_argument("--header-image", dest="header_image", default=None,
+                    help="Imagen del encabezado del .docx (default: img/Notificacion_de_seguridad.jpg; las rutas relativas se resuelven contra la carpeta del proyecto)")
+    ap.add_argument("--stats", dest="stats", default=None,
+                    help="Guarda tiempos por etapa y contadores en este JSON (p. ej. stats.json)")
+    args = ap.parse_args()
+    if args.incremental and not args.combined_csv:
+        ap.error("--incremental requiere --csv")
+    if args.stats:
+        stats.enable()
+
+    build_report(
+        args.inputs,
+        args.outfile,
+        combined_csv=args.combined_csv,
+        override={
+            "No de alerta": args.alert_id,
+            "Criticidad": args.criticidad,
+            "Reportado por": args.reportado_por,
+        },
+        max_rows_in_memory=args.max_rows,
+        workers=args.workers,
+        header_image=args.header_image,
+        incremental=args.incremental,
+    )
+    if args.stats:
+        stats.finish(args.stats)
+
+if __name__ == "__main__":
+    main()
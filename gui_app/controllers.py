@@ -1,5 +1,6 @@
 import os
 import threading
+import time
 from pathlib import Path
 import tkinter as tk
 
@@ -9,28 +10,33 @@ try:
 except Exception:
     DND_FILES = None
 
-from .utils import UILogHandler, call_on_main, ts_line
+from .scanner import UNKNOWN, FileScanner
+from .utils import LogSink, UILogHandler, call_on_main, fmt_bytes, ts_line
 # Backends del proyecto 
-from normalizer.run import normalize_files
-from report_generator.run import generate_report
+from normalizer import stats
+from normalizer.progress import CancelToken, Cancelled
+from normalizer.core import logical_suffix
+from report_generator.run import build_report
 
 
 class AppController:
-    TYPE_MAP = {
-        ".txt": "Cisco ASA",
-        ".log": "Cisco ASA",
-        ".csv": "Splunk",
-        ".jsonl": "Cisco Secure Endpoint",
-        ".json": "Cisco Secure Endpoint",
-    }
     SUPPORTED = {".txt", ".log", ".csv", ".jsonl", ".json"}
+    SCAN_POLL_MS = 100
 
     def __init__(self, view, drag_drop_enabled: bool):
         self.view = view
         self.root = view.root
         self.drag_drop_enabled = drag_drop_enabled
-        self.file_list: list[dict] = []
+        # Ruta -> datos del archivo (en orden de alta); el tipo lo completa el escaneo
+        self.files: dict[str, dict] = {}
+        self.scanner = FileScanner()
+        self._scan_polling = False
         self.current_operation: str | None = None
+        self.cancel_token: CancelToken | None = None
+
+        # Los mensajes de cualquier hilo se encolan y la UI los vuelca por lotes
+        self.log_sink = LogSink(self.view.append_logs)
+        self.log_sink.start(self.root)
 
         # Logging hacia la UI
         import logging
@@ -61,7 +67,7 @@ class AppController:
 
     # ------------------- Helpers UI-safe -------------------
     def append_log(self, text: str):
-        call_on_main(self.root, self.view.append_log, text)
+        self.log_sink.put(text)
 
     def set_status(self, text: str):
         call_on_main(self.root, self.view.set_status, text)
@@ -78,55 +84,127 @@ class AppController:
     def _progress_stop(self):
         call_on_main(self.root, self.view.stop_progress)
 
+    def _progress_fn(self, min_interval: float = 0.2):
+        """Callback de progreso para el worker: limita los refrescos y estima el tiempo restante."""
+        t0 = time.monotonic()
+        last = [0.0]
+
+        def progress(done: int, total: int, current: str):
+            now = time.monotonic()
+            if now - last[0] < min_interval and done < total:
+                return
+            last[0] = now
+            frac = done / total if total else 1.0
+            text = f"{frac * 100:.0f}% · {current}"
+            elapsed = now - t0
+            if 0 < frac < 1 and elapsed > 1:
+                eta = int(elapsed * (1 - frac) / frac)
+                text += f" · quedan ~{eta // 60}:{eta % 60:02d}"
+            call_on_main(self.root, self.view.set_progress, frac * 100, text)
+        return progress
+
     # ------------------- Gestión de archivos -------------------
-    def add_files(self, paths: list[str]):
-        added = 0
+    def _expand(self, paths: list[str]):
+        """Archivos a agregar (las carpetas se recorren completas) y rechazados por extensión."""
+        found, rejected = [], []
         for p in paths:
             path = Path(p)
-            if not path.exists():
+            if not os.path.exists(path):
                 self.append_log(ts_line(f"⚠ No existe: {path}") + "\n")
                 continue
-            ext = path.suffix.lower()
-            if ext not in self.SUPPORTED:
-                self.view.warn("Extensión no soportada",
-                               f"'{path.name}' no es compatible.\nSoportadas: {', '.join(sorted(self.SUPPORTED))}")
+            candidates = sorted(x for x in path.rglob("*") if x.is_file()) if path.is_dir() else [path]
+            for c in candidates:
+                # 'fw.log.gz' -> '.log'
+                (found if logical_suffix(c) in self.SUPPORTED else rejected).append(c)
+        return found, rejected
+
+    def add_files(self, paths: list[str]):
+        found, rejected = self._expand(paths)
+        new = []
+        for path in found:
+            key = str(path)
+            if key in self.files:
                 continue
-            if any(x["path"] == str(path) for x in self.file_list):
-                self.append_log(ts_line(f"ℹ Ya en lista: {path.name}") + "\n")
+            self.files[key] = {"name": path.name, "path": key, "type": None, "size": None, "lines": None}
+            new.append(self.files[key])
+
+        if rejected:
+            names = ", ".join(p.name for p in rejected[:5]) + (" …" if len(rejected) > 5 else "")
+            self.append_log(ts_line(f"⚠ {len(rejected)} archivo(s) con extensión no soportada: {names}") + "\n")
+            if not found:
+                self.view.warn("Extensión no soportada",
+                               f"{names}\nSoportadas: {', '.join(sorted(self.SUPPORTED))}")
+        skipped = len(found) - len(new)
+        if skipped:
+            self.append_log(ts_line(f"ℹ {skipped} archivo(s) ya estaban en la lista.") + "\n")
+        if not new:
+            return
+
+        # Filas provisorias ya mismo; tamaño, líneas y tipo llegan del escaneo
+        call_on_main(self.root, self.view.insert_files, new)
+        self.scanner.submit([it["path"] for it in new])
+        self._update_totals()
+        self.append_log(ts_line(f"Se añadieron {len(new)} archivo(s); analizando…") + "\n")
+        if not self._scan_polling:
+            self._scan_polling = True
+            self.root.after(self.SCAN_POLL_MS, self._poll_scans)
+
+    def _poll_scans(self):
+        updated = []
+        for info in self.scanner.drain():
+            it = self.files.get(info["path"])
+            if it is None:  # se quitó de la lista mientras se analizaba
                 continue
-            self.file_list.append({"name": path.name, "type": self.TYPE_MAP.get(ext, "Desconocido"), "path": str(path)})
-            added += 1
+            it.update(size=info["size"], lines=info["lines"], type=info["type"])
+            if info["error"]:
+                self.append_log(ts_line(f"⚠ {it['name']}: {info['error']}") + "\n")
+            updated.append(it)
+        if updated:
+            self.view.update_files(updated)
+            self._update_totals()
+        if self.scanner.pending:
+            self.root.after(self.SCAN_POLL_MS, self._poll_scans)
+        else:
+            self._scan_polling = False
+            unknown = sum(1 for it in self.files.values() if it["type"] == UNKNOWN)
+            if unknown:
+                self.append_log(ts_line(f"⚠ {unknown} archivo(s) sin parser reconocido; se omitirán.") + "\n")
 
-        call_on_main(self.root, self.view.refresh_files, self.file_list)
-        if added:
-            self.append_log(ts_line(f"Se añadieron {added} archivo(s).") + "\n")
+    def _update_totals(self):
+        total = sum(it["size"] or 0 for it in self.files.values())
+        text = f"({len(self.files)} archivo{'s' if len(self.files) != 1 else ''} · {fmt_bytes(total)}"
+        if self.scanner.pending:
+            text += f" · analizando {self.scanner.pending}"
+        call_on_main(self.root, self.view.set_file_totals, text + ")")
 
     def remove_selected(self):
         sel = self.view.file_tree.selection()
         if not sel:
             self.view.info("Sin selección", "Selecciona al menos un archivo.")
             return
-        idxs = sorted((self.view.file_tree.index(i) for i in sel), reverse=True)
-        for i in idxs:
-            del self.file_list[i]
-        self.view.refresh_files(self.file_list)
+        # Los iid de la tabla son las rutas
+        for iid in sel:
+            self.files.pop(iid, None)
+        self.view.remove_files(sel)
+        self._update_totals()
         self.append_log(ts_line(f"Se eliminaron {len(sel)} archivo(s).") + "\n")
 
     def clear_list(self):
-        if not self.file_list:
+        if not self.files:
             self.view.info("Lista vacía", "No hay archivos.")
             return
         from tkinter import messagebox
         if messagebox.askyesno("Confirmar", "¿Limpiar toda la lista?"):
-            self.file_list.clear()
-            self.view.refresh_files(self.file_list)
+            self.files.clear()
+            self.view.refresh_files([])
+            self._update_totals()
             self.append_log(ts_line("Lista limpiada.") + "\n")
 
     def browse_files(self):
         from tkinter import filedialog
         files = filedialog.askopenfilenames(
             title="Selecciona archivos de log",
-            filetypes=[("Archivos soportados", "*.txt *.log *.csv *.jsonl *.json"),
+            filetypes=[("Archivos soportados", "*.txt *.log *.csv *.jsonl *.json *.gz *.bz2 *.xz"),
                        ("Todos", "*.*")],
         )
         if files:
@@ -134,7 +212,7 @@ class AppController:
 
     # ------------------- Build All (normaliza + reporte) -------------------
     def run_build_all(self):
-        if not self.file_list:
+        if not self.files:
             self.view.warn("Sin archivos", "Añade al menos un archivo para generar el reporte.")
             return
         if self.current_operation:
@@ -156,49 +234,54 @@ class AppController:
         if self.view.reported_by.get(): override["Reportado por"] = self.view.reported_by.get()
 
         self.current_operation = "build_all"
+        self.cancel_token = CancelToken()
         t = threading.Thread(
             target=self._build_all_worker,
-            args=([x["path"] for x in self.file_list], str(out_csv), str(out_docx), override),
+            args=(list(self.files), str(out_csv), str(out_docx), override, self.view.collect_stats.get()),
             daemon=True,
         )
         t.start()
 
-    def _needs_normalize(self, files: list[str], csv_path: Path) -> bool:
-        """True si el CSV no existe o está más viejo que alguno de los insumos."""
-        if not csv_path.exists():
-            return True
-        csv_mtime = csv_path.stat().st_mtime
-        try:
-            return any(Path(f).stat().st_mtime > csv_mtime for f in files)
-        except Exception:
-            # Ante duda, se normaliza
-            return True
-
-    def _build_all_worker(self, files: list[str], out_csv: str, out_docx: str, override: dict):
+    def _build_all_worker(self, files: list[str], out_csv: str, out_docx: str, override: dict,
+                          collect_stats: bool = False):
         self._disable_buttons(); self.set_status("⏳ Preparando…"); self._progress_start()
         try:
-            csv_path = Path(out_csv)
-
-            # 1) Normalización si hace falta (si prefieres forzar siempre, elimina el if)
-            if self._needs_normalize(files, csv_path):
-                self.append_log(ts_line("Iniciando normalización…") + "\n")
-                normalize_files(files, out_csv)
-                self.append_log(ts_line(f"✓ CSV generado: {out_csv}") + "\n")
-            else:
-                self.append_log(ts_line("CSV actualizado; se omite normalización.") + "\n")
-
-            # 2) Generación de reporte
-            self.append_log(ts_line("Generando reporte DOCX…") + "\n")
-            generate_report(out_csv, out_docx, override if override else None)
+            # Normalización incremental: con el checkpoint del CSV combinado solo se
+            # parsea lo agregado a cada insumo desde el build anterior, y el resumen
+            # sale de la misma pasada que reescribe el combinado.
+            self.append_log(ts_line("Normalizando (incremental) y generando reporte DOCX…") + "\n")
+            # Opcional, como --stats: instrumenta los handlers ASA mientras dura la corrida
+            if collect_stats:
+                stats.enable()
+            build_report(files, out_docx, combined_csv=out_csv, override=override if override else None,
+                         progress=self._progress_fn(), cancel=self.cancel_token, incremental=True)
+            self._log_stats(stats.disable())
+            self.append_log(ts_line(f"✓ CSV actualizado: {out_csv}") + "\n")
             self.append_log(ts_line(f"✓ Reporte generado: {out_docx}") + "\n")
             self.set_status(f"✓ Reporte en: {out_docx}")
             self.view.info("Éxito", f"Reporte generado en:\n{out_docx}")
+        except Cancelled:
+            self.append_log(ts_line("⚠ Cancelado por el usuario; no se modificaron las salidas.") + "\n")
+            self.set_status("Cancelado")
         except Exception as e:
             self.append_log(ts_line(f"✗ Error en build_all: {e}") + "\n")
             self.set_status("✗ Error")
             self.view.error("Error", f"Ocurrió un error:\n{e}")
         finally:
-            self._progress_stop(); self._enable_buttons(); self.current_operation = None
+            stats.disable()
+            self._progress_stop(); self._enable_buttons()
+            self.current_operation = None; self.cancel_token = None
+
+    def cancel_build(self):
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+            self.append_log(ts_line("Cancelando… (termina el lote en curso)") + "\n")
+
+    def _log_stats(self, st):
+        if st is None:
+            return
+        lines = st.summary_lines()
+        self.append_log(ts_line(lines[0]) + "\n" + "".join(ln + "\n" for ln in lines[1:]))
 
     # ------------------- Utilidades -------------------
     def open_output_folder(self):
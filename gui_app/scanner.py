@@ -0,0 +1,67 @@
+"""
+Análisis en segundo plano de los archivos agregados a la GUI: tamaño, líneas
+estimadas y parser detectado por sniffing (el mismo que usará el normalizador).
+"""
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from normalizer.core import detect_compression
+from normalizer.router import sniff
+
+UNKNOWN = "Desconocido"
+# Muestra para estimar líneas (el sniffing lee su propia ventana inicial)
+SAMPLE_BYTES = 1 << 16
+
+def scan_file(path: str) -> dict:
+    """Metadatos de un archivo; `lines` es None si no se puede estimar (comprimidos)."""
+    p = Path(path)
+    try:
+        size = p.stat().st_size
+    except OSError as e:
+        return {"path": path, "size": 0, "lines": None, "type": UNKNOWN, "error": str(e)}
+    # Fuera de las estadísticas: el escaneo puede coincidir con un build que mide
+    spec = sniff(p, timed=False)
+    lines = None
+    if detect_compression(p) is None:
+        with open(p, "rb") as f:
+            sample = f.read(SAMPLE_BYTES)
+        n = sample.count(b"\n")
+        if len(sample) >= size:
+            lines = n + (1 if sample and not sample.endswith(b"\n") else 0)
+        elif n:
+            lines = round(size * n / len(sample))
+    return {"path": path, "size": size, "lines": lines, "type": spec.label if spec else UNKNOWN, "error": None}
+
+class FileScanner:
+    """
+    Analiza archivos en un pool de hilos. Los resultados se acumulan en una cola
+    que el hilo de la UI vacía con `drain()` (por lotes, desde un timer).
+    """
+    def __init__(self, workers: int = min(8, (os.cpu_count() or 1) + 2)):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+        self._results: queue.SimpleQueue = queue.SimpleQueue()
+        self.pending = 0
+
+    def submit(self, paths: list[str]):
+        self.pending += len(paths)
+        for p in paths:
+            self._pool.submit(self._scan, p)
+
+    def _scan(self, path: str):
+        try:
+            info = scan_file(path)
+        except Exception as e:
+            info = {"path": path, "size": 0, "lines": None, "type": UNKNOWN, "error": str(e)}
+        self._results.put(info)
+
+    def drain(self, limit: int = 2000) -> list[dict]:
+        out = []
+        try:
+            while len(out) < limit:
+                out.append(self._results.get_nowait())
+        except queue.Empty:
+            pass
+        self.pending -= len(out)
+        return out
@@ -3,10 +3,14 @@ from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 
+from .utils import fmt_bytes
+
 
 class AppView(ttk.Frame):
     """Interfaz gráfica mejorada del normalizador y generador de reportes SOC."""
     SUPPORTED_EXTENSIONS = {".txt", ".log", ".csv", ".jsonl", ".json"}
+    # Líneas que conserva el widget de log (el resto queda en el archivo de log)
+    LOG_MAX_LINES = 5000
 
     def __init__(self, root: tk.Misc):
         super().__init__(root)
@@ -117,7 +121,7 @@ class AppView(ttk.Frame):
         # Extensiones soportadas
         tk.Label(
             text_container,
-            text="Formatos: .txt, .log, .csv, .json, .jsonl",
+            text="Formatos: .txt, .log, .csv, .json, .jsonl (también .gz/.bz2/.xz)",
             foreground="#7f8c8d",
             font=("Segoe UI", 8),
             bg="#f0f4f8",
@@ -143,7 +147,7 @@ class AppView(ttk.Frame):
 
         self.file_tree = ttk.Treeview(
             tree_frame,
-            columns=("Estado", "Tipo", "Ruta"),
+            columns=("Estado", "Tipo", "Tamaño", "Líneas", "Ruta"),
             show="tree headings",
             yscrollcommand=yscroll.set,
             xscrollcommand=xscroll.set,
@@ -158,6 +162,10 @@ class AppView(ttk.Frame):
         self.file_tree.heading("Estado", text="Estado")
         self.file_tree.column("Tipo", width=100, anchor="center")
         self.file_tree.heading("Tipo", text="Tipo")
+        self.file_tree.column("Tamaño", width=80, anchor="e")
+        self.file_tree.heading("Tamaño", text="Tamaño")
+        self.file_tree.column("Líneas", width=80, anchor="e")
+        self.file_tree.heading("Líneas", text="Líneas (aprox.)")
         self.file_tree.column("Ruta", width=400, anchor="w")
         self.file_tree.heading("Ruta", text="Ruta")
         self.file_tree.pack(fill=tk.BOTH, expand=True)
@@ -239,6 +247,13 @@ class AppView(ttk.Frame):
         self.reported_by = tk.StringVar()
         ttk.Entry(params_card, textvariable=self.reported_by).pack(fill=tk.X)
 
+        self.collect_stats = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            params_card,
+            text="Registrar tiempos y contadores",
+            variable=self.collect_stats
+        ).pack(anchor="w", pady=(8, 0))
+
         # Botones de acción principales
         action_frame = ttk.Frame(right)
         action_frame.pack(fill=tk.X, pady=(0, 10))
@@ -271,6 +286,12 @@ class AppView(ttk.Frame):
             length=200
         )
         self.progress.pack(fill=tk.X)
+        self.btn_cancel = ttk.Button(
+            self.progress_frame,
+            text="✖ Cancelar",
+            command=self._on_cancel
+        )
+        self.btn_cancel.pack(fill=tk.X, pady=(5, 0))
 
         # ==================== PANEL INFERIOR: LOGS ====================
         bottom = ttk.LabelFrame(
@@ -335,6 +356,10 @@ class AppView(ttk.Frame):
     def _on_clear(self): self.controller.clear_list()
     def _on_build_all(self): self.controller.run_build_all()
     def _on_open_folder(self): self.controller.open_output_folder()
+    def _on_cancel(self):
+        self.btn_cancel.config(state=tk.DISABLED)
+        self.progress_label.config(text="Cancelando...")
+        self.controller.cancel_build()
 
     def _browse_csv(self):
         f = filedialog.asksaveasfilename(
@@ -352,31 +377,56 @@ class AppView(ttk.Frame):
         )
         if f: self.docx_path.set(f)
 
+    @staticmethod
+    def _file_values(it):
+        """Columnas de un archivo; sin tipo todavía = en análisis"""
+        if it["type"] is None:
+            return ("⏳ Analizando", "…", "", "", it["path"])
+        # Determinar estado basado en tipo
+        status = "✓ Válido" if it["type"] != "Desconocido" else "⚠ Revisar"
+        lines = f"{it['lines']:,}".replace(",", ".") if it["lines"] is not None else "—"
+        return (status, it["type"], fmt_bytes(it["size"] or 0), lines, it["path"])
+
     def refresh_files(self, items):
-        """Actualizar lista de archivos con estado"""
+        """Reconstruir la lista completa de archivos"""
         self.file_tree.delete(*self.file_tree.get_children())
+        self.insert_files(items)
+
+    def insert_files(self, items):
+        """Agregar filas nuevas (el iid de cada fila es la ruta)"""
         for it in items:
-            # Determinar estado basado en tipo
-            status = "✓ Válido" if it["type"] != "Desconocido" else "⚠ Revisar"
-            self.file_tree.insert(
-                "", "end",
-                text=it["name"],
-                values=(status, it["type"], it["path"])
-            )
-        
-        # Actualizar contador
-        count = len(items)
-        self.file_count_label.config(
-            text=f"({count} archivo{'s' if count != 1 else ''})"
-        )
+            self.file_tree.insert("", "end", iid=it["path"], text=it["name"], values=self._file_values(it))
+
+    def update_files(self, items):
+        """Actualizar solo las filas indicadas"""
+        for it in items:
+            if self.file_tree.exists(it["path"]):
+                self.file_tree.item(it["path"], values=self._file_values(it))
+
+    def remove_files(self, iids):
+        self.file_tree.delete(*iids)
+
+    def set_file_totals(self, text: str):
+        self.file_count_label.config(text=text)
 
     def start_progress(self, interval_ms: int = 75):
-        """Iniciar indicador de progreso"""
+        """Iniciar indicador de progreso (indeterminado hasta el primer avance)"""
         self.progress_frame.pack(fill=tk.X, pady=(10, 0))
+        self.progress.config(mode="indeterminate")
         self.progress['value'] = 0
         self.progress.start(interval_ms)
+        self.progress_label.config(text="Procesando...")
+        self.btn_cancel.config(state=tk.NORMAL)
         self.btn_report.config(state=tk.DISABLED)
 
+    def set_progress(self, percent: float, text: str):
+        """Avance conocido: barra determinada (0-100) y texto con % y ETA"""
+        if str(self.progress['mode']) != "determinate":
+            self.progress.stop()
+            self.progress.config(mode="determinate", maximum=100)
+        self.progress['value'] = percent
+        self.progress_label.config(text=text)
+
     def stop_progress(self):
         """Detener indicador de progreso"""
         self.progress.stop()
@@ -399,26 +449,36 @@ class AppView(ttk.Frame):
         
         self.status_var.set(f"{icon} {text}")
 
+    @staticmethod
+    def _log_tag(line: str) -> str:
+        """Detectar nivel de log"""
+        if "[INFO]" in line or "✓" in line:
+            return "INFO"
+        if "[WARNING]" in line or "⚠" in line:
+            return "WARNING"
+        if "[ERROR]" in line or "✗" in line:
+            return "ERROR"
+        if "[SUCCESS]" in line or "Éxito" in line:
+            return "SUCCESS"
+        return ""
+
     def append_log(self, line: str):
         """Agregar línea al log con formato"""
+        self.append_logs([line])
+
+    def append_logs(self, lines: list[str]):
+        """Agregar un lote de líneas en una sola inserción y recortar a LOG_MAX_LINES"""
+        args = []
+        for line in lines:
+            args += [line, self._log_tag(line)]
         self.log_text.config(state=tk.NORMAL)
-        
-        # Detectar nivel de log
-        tag = None
-        if "[INFO]" in line or "✓" in line:
-            tag = "INFO"
-        elif "[WARNING]" in line or "⚠" in line:
-            tag = "WARNING"
-        elif "[ERROR]" in line or "✗" in line:
-            tag = "ERROR"
-        elif "[SUCCESS]" in line or "Éxito" in line:
-            tag = "SUCCESS"
-        
-        if tag:
-            self.log_text.insert(tk.END, line, tag)
-        else:
-            self.log_text.insert(tk.END, line)
-        
+        self.log_text.insert(tk.END, *args)
+
+        # Ring buffer: se descartan las líneas más viejas
+        count = int(self.log_text.index("end-1c").split(".")[0])
+        if count > self.LOG_MAX_LINES:
+            self.log_text.delete("1.0", f"{count - self.LOG_MAX_LINES + 1}.0")
+
         self.log_text.see(tk.END)
         self.log_text.config(state=tk.DISABLED)
 
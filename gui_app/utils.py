@@ -1,6 +1,9 @@
 import logging
+import logging.handlers
+import queue
 import threading
 from datetime import datetime
+from pathlib import Path
 
 class UILogHandler(logging.Handler):
     """Envía logs a la UI de forma segura."""
@@ -19,5 +22,64 @@ def call_on_main(root, func, *args, **kwargs):
     else:
         root.after(0, lambda: func(*args, **kwargs))
 
+# Log completo de la GUI (el widget solo muestra las últimas líneas)
+LOG_FILE = Path.home() / ".generador-de-reportes" / "gui.log"
+LOG_FILE_BYTES = 1 << 20
+LOG_FILE_BACKUPS = 3
+
+class LogSink:
+    """
+    Cola de mensajes para el log de la GUI. `put` se puede llamar desde cualquier
+    hilo; el hilo principal la vacía cada `interval_ms` y entrega todo lo
+    acumulado en una sola llamada a `append_many(lista)`, así una ráfaga de
+    mensajes no inunda la cola de eventos de Tk. Todo se copia además a un
+    archivo rotativo.
+    """
+    def __init__(self, append_many, log_file: Path | None = LOG_FILE,
+                 interval_ms: int = 100, max_batch: int = 2000):
+        self.append_many = append_many
+        self.interval_ms = interval_ms
+        self.max_batch = max_batch
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._file = self._file_handler(log_file) if log_file else None
+
+    @staticmethod
+    def _file_handler(path: Path):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            return logging.handlers.RotatingFileHandler(
+                path, maxBytes=LOG_FILE_BYTES, backupCount=LOG_FILE_BACKUPS, encoding="utf-8")
+        except OSError as e:
+            print(f"[WARN] Sin log en archivo ({path}): {e}")
+            return None
+
+    def put(self, text: str):
+        self._queue.put(text)
+
+    def start(self, root):
+        self._root = root
+        root.after(self.interval_ms, self._drain)
+
+    def _drain(self):
+        batch = []
+        try:
+            # Con un tope por tick para no bloquear la ventana si la cola es enorme
+            while len(batch) < self.max_batch:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        if batch:
+            self.append_many(batch)
+            if self._file is not None:
+                text = "".join(batch).rstrip("\n")
+                self._file.emit(logging.makeLogRecord({"msg": text, "levelno": logging.INFO}))
+        self._root.after(self.interval_ms, self._drain)
+
+def fmt_bytes(n: int) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if n < 1024 or unit == "GiB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
 def ts_line(text: str) -> str:
     return f"[{datetime.now().strftime('%H:%M:%S')}] {text}"
@@ -1,4 +1,6 @@
 from normalizer.run import normalize_files
+from normalizer import stats
+from normalizer.follow import POLL_INTERVAL, follow_files
 import argparse
 
 def main():
@@ -6,11 +8,47 @@ def main():
         description="Normalizador (Cisco ASA, Splunk CSV, Cisco Secure Endpoint AMP) -> CSV unificado"
     )
     ap.add_argument("--in", dest="inputs", action="append", required=True,
-                    help="Ruta de entrada (puedes repetir --in varias veces)")
+                    help="Ruta de entrada; puede venir comprimida en gzip/bz2/xz (puedes repetir --in varias veces)")
     ap.add_argument("--out", dest="out_csv", required=True,
-                    help="Ruta del CSV de salida")
+                    help="Ruta del CSV de salida (.csv.gz/.csv.bz2/.csv.xz se escriben comprimidos; .sqlite crea una base indexada)")
+    ap.add_argument("--max-rows-in-memory", dest="max_rows", type=int, default=None,
+                    help="Presupuesto de filas en memoria; activa el ordenamiento externo (runs en disco)")
+    ap.add_argument("--workers", dest="workers", type=int, default=1,
+                    help="Procesos en paralelo (por archivo y por rangos de archivos grandes)")
+    ap.add_argument("--incremental", action="store_true",
+                    help="Guarda checkpoints por entrada y en corridas siguientes parsea solo lo agregado")
+    ap.add_argument("--stats", dest="stats", default=None,
+                    help="Guarda tiempos por etapa y contadores en este JSON (p. ej. stats.json)")
+    ap.add_argument("--partition", choices=("hour", "day"), default=None,
+                    help="--out es una carpeta: un CSV por hora o por día (UTC) y un manifest.json con sus rangos")
+    ap.add_argument("--follow", action="store_true",
+                    help="Después de normalizar sigue las entradas (rotación y truncado incluidos) y agrega lo nuevo al CSV hasta Ctrl+C")
+    ap.add_argument("--poll", dest="poll", type=float, default=POLL_INTERVAL,
+                    help="Con --follow: segundos entre sondeos de las entradas")
+    ap.add_argument("--report", dest="report", default=None,
+                    help="Con --follow: regenera este .docx con el resumen actualizado")
+    ap.add_argument("--report-every", dest="report_every", type=float, default=60.0,
+                    help="Con --report: segundos mínimos entre dos regeneraciones")
     args = ap.parse_args()
-    normalize_files(args.inputs, args.out_csv)
+    if args.report and not args.follow:
+        ap.error("--report requiere --follow")
+    if args.partition and (args.incremental or args.follow):
+        ap.error("--partition no se combina con --incremental ni --follow")
+    if args.stats:
+        stats.enable()
+    if args.follow and args.report:
+        # Import diferido: el normalizador no necesita python-docx
+        from report_generator.run import follow_report
+        follow_report(args.inputs, args.out_csv, args.report, args.report_every, poll_interval=args.poll,
+                      max_rows_in_memory=args.max_rows, workers=args.workers)
+    elif args.follow:
+        follow_files(args.inputs, args.out_csv, poll_interval=args.poll,
+                     max_rows_in_memory=args.max_rows, workers=args.workers)
+    else:
+        normalize_files(args.inputs, args.out_csv, max_rows_in_memory=args.max_rows, workers=args.workers,
+                        incremental=args.incremental, partition=args.partition)
+    if args.stats:
+        stats.finish(args.stats)
 
 if __name__ == "__main__":
     main()
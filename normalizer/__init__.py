@@ -1,6 +1,7 @@
 # Re-export útil para clientes
-from .run import normalize_files
+from .run import normalize_files, normalize_iter
+from .progress import CancelToken, Cancelled
 
-__all__ = ["normalize_files"]
+__all__ = ["normalize_files", "normalize_iter", "CancelToken", "Cancelled"]
 
 #python ..\normalize_sources.py --in cisco_lockbit_raw.txt --in splunk_lockbit.csv --in cisco_secure_lockbit.jsonl --out lockbit_combined.csv
@@ -1,126 +1,288 @@
 # -*- coding: utf-8 -*-
-from typing import Dict, Iterable, Optional
+from typing import Iterable, Optional
 from pathlib import Path
 import re
-from .core import FIELDNAMES, parse_syslog_prefix
+from .core import NormalizedEvent, iter_lines, logical_suffix, parse_syslog_prefix
+from .registry import first_line, register_parser
+from . import stats
+
+# Todos los patrones usan tramos acotados (sin `.*?` ni `[^:]+` abiertos) para que
+# el costo del match sea lineal en el largo de la línea, incluso con entradas basura.
+_IP = r"\d{1,3}(?:\.\d{1,3}){3}"
+_IFACE = r"[^:\s]{1,64}"
+_PORT = r"\d{1,5}"
+_SRC = rf"{_IFACE}:(?P<src_ip>{_IP})/(?P<src_port>{_PORT})"
+_DST = rf"{_IFACE}:(?P<dst_ip>{_IP})/(?P<dst_port>{_PORT})"
+# Tuplas mapeadas/identidad entre origen y destino: "(10.0.0.1/123)(LOCAL\user)"
+_PAREN_GROUPS = r"(?:\s{0,8}\([^()]{0,128}\)){0,4}"
 
 RE_ASA_BUILT = re.compile(
-    r"Built\s+(?:inbound|outbound|local-host|remote-host)?\s*(?:[A-Za-z0-9_-]+)?\s*connection\s+\S+\s+for\s+[^:]+:(?P<src_ip>\d{1,3}(?:\.\d{1,3}){3})/(?P<src_port>\d+).*?\s+to\s+[^:]+:(?P<dst_ip>\d{1,3}(?:\.\d{1,3}){3})/(?P<dst_port>\d+)",
+    rf"Built\s{{1,8}}(?:(?:inbound|outbound|local-host|remote-host)\s{{1,8}})?(?:[A-Za-z0-9_-]{{1,32}}\s{{1,8}})?connection\s{{1,8}}\S{{1,32}}\s{{1,8}}for\s{{1,8}}{_SRC}{_PAREN_GROUPS}\s{{1,8}}to\s{{1,8}}{_DST}",
     re.IGNORECASE,
 )
 RE_ASA_DENY = re.compile(
-    r"Deny\s+(?P<protocol>\w+)\s+src\s+[^:]+:(?P<src_ip>\d{1,3}(?:\.\d{1,3}){3})/(?P<src_port>\d+)\s+dst\s+[^:]+:(?P<dst_ip>\d{1,3}(?:\.\d{1,3}){3})/(?P<dst_port>\d+)",
+    rf"Deny\s{{1,8}}(?P<protocol>\w{{1,16}})\s{{1,8}}src\s{{1,8}}{_SRC}\s{{1,8}}dst\s{{1,8}}{_DST}",
     re.IGNORECASE,
 )
 RE_ASA_TEARDOWN = re.compile(
-    r"Teardown\s+(?:UDP|TCP|ICMP)?\s*connection\s+\S+\s+for\s+[^:]+:(?P<src_ip>\d{1,3}(?:\.\d{1,3}){3})/(?P<src_port>\d+)\s+to\s+[^:]+:(?P<dst_ip>\d{1,3}(?:\.\d{1,3}){3})/(?P<dst_port>\d+)",
+    rf"Teardown\s{{1,8}}(?:(?:UDP|TCP|ICMP)\s{{1,8}})?connection\s{{1,8}}\S{{1,32}}\s{{1,8}}for\s{{1,8}}{_SRC}\s{{1,8}}to\s{{1,8}}{_DST}",
     re.IGNORECASE,
 )
 RE_ASA_NAT = re.compile(
-    r"Translation by NAT for\s+[^:]+:(?P<src_ip>\d{1,3}(?:\.\d{1,3}){3})/(?P<src_port>\d+)\s+to\s+[^:]+:(?P<dst_ip>\d{1,3}(?:\.\d{1,3}){3})/(?P<dst_port>\d+)",
+    rf"Translation by NAT for\s{{1,8}}{_SRC}\s{{1,8}}to\s{{1,8}}{_DST}",
+    re.IGNORECASE,
+)
+RE_LOGIN_FAIL = re.compile(rf"Login failed for user\s{{1,8}}(?P<user>\S{{1,128}})\s{{1,8}}from\s{{1,8}}(?P<src_ip>{_IP})", re.IGNORECASE)
+RE_ASA_XLATE = re.compile(
+    rf"(?P<verb>Built|Teardown)\s{{1,8}}(?:dynamic|static)\s{{1,8}}(?:(?P<protocol>TCP|UDP|ICMP)\s{{1,8}})?translation\s{{1,8}}from\s{{1,8}}{_SRC}\s{{1,8}}to\s{{1,8}}{_DST}",
+    re.IGNORECASE,
+)
+RE_ASA_ACL = re.compile(
+    rf"access-list\s{{1,8}}\S{{1,64}}\s{{1,8}}(?P<verdict>permitted|denied)\s{{1,8}}(?P<protocol>\w{{1,16}})\s{{1,8}}[^/\s]{{1,64}}/(?P<src_ip>{_IP})\((?P<src_port>{_PORT})\)\s{{1,8}}->\s{{1,8}}[^/\s]{{1,64}}/(?P<dst_ip>{_IP})\((?P<dst_port>{_PORT})\)",
+    re.IGNORECASE,
+)
+RE_AAA_REJECT = re.compile(rf"user\s{{0,8}}=\s{{0,8}}(?P<user>[^:\s]{{1,128}})\s{{0,8}}:\s{{0,8}}user IP\s{{0,8}}=\s{{0,8}}(?P<src_ip>{_IP})", re.IGNORECASE)
+RE_LOGIN_DENIED = re.compile(
+    # El puerto puede venir como nombre de servicio ("/ssh", "/https")
+    rf"Login denied from\s{{1,8}}(?P<src_ip>{_IP})/(?P<src_port>\w{{1,16}})\s{{1,8}}to\s{{1,8}}"
+    rf"(?:{_IFACE}:(?P<dst_ip>{_IP})/(?P<dst_port>\w{{1,16}})|\S{{1,128}})\s{{1,8}}for user\s{{1,8}}\"?(?P<user>[^\"\s]{{1,128}})",
     re.IGNORECASE,
 )
-RE_LOGIN_FAIL = re.compile(r"Login failed for user\s+(?P<user>\S+)\s+from\s+(?P<src_ip>\d{1,3}(?:\.\d{1,3}){3})", re.IGNORECASE)
 
 RE_ANY_IP = re.compile(r"\b(?P<ip>\d{1,3}(?:\.\d{1,3}){3})\b")
 RE_ANY_PORT = re.compile(r"/(?P<port>\d{1,5})\b")
 
-def normalize_asa_line(line: str) -> Dict[str, Optional[str]]:
-    iso_ts, host, msg = parse_syslog_prefix(line)
-    out = {k: None for k in FIELDNAMES}
-    out.update({"timestamp": iso_ts, "device": host, "msg": msg})
+# Etiqueta %ASA-<sev>-<msgid> (también FTD/PIX comparten los IDs)
+RE_ASA_TAG = re.compile(r"%(?:ASA|FTD|PIX)-(?P<sev>\d)-(?P<msgid>\d{6})")
+# La etiqueta siempre va al inicio del mensaje (o tras un prefijo ISO sin parsear)
+TAG_SEARCH_WINDOW = 128
+# Por encima de este largo no se prueban los patrones estructurados: solo la
+# heurística barata (findall + substrings) sobre los primeros MAX_LINE_LEN caracteres.
+MAX_LINE_LEN = 4096
+
+def _set_tuple(out: NormalizedEvent, m) -> None:
+    out.src_ip, out.src_port, out.dst_ip, out.dst_port = m.group("src_ip", "src_port", "dst_ip", "dst_port")
 
+# ----------------- Handlers por tipo de mensaje -----------------
+# Cada handler completa `out` y devuelve True si el mensaje coincidió.
+def _built(msg: str, out: NormalizedEvent) -> bool:
     m = RE_ASA_BUILT.search(msg)
-    if m:
-        out.update({
-            "action": "built",
-            "src_ip": m.group("src_ip"), "src_port": m.group("src_port"),
-            "dst_ip": m.group("dst_ip"), "dst_port": m.group("dst_port"),
-            "protocol": "tcp" if "TCP" in msg.upper() else ("udp" if "UDP" in msg.upper() else None),
-        })
-        return out
+    if not m:
+        return False
+    up = msg.upper()
+    _set_tuple(out, m)
+    out.action = "built"
+    out.protocol = "tcp" if "TCP" in up else ("udp" if "UDP" in up else None)
+    return True
+
+def _deny(msg: str, out: NormalizedEvent) -> bool:
     m = RE_ASA_DENY.search(msg)
-    if m:
-        out.update({
-            "action": "deny",
-            "protocol": m.group("protocol").lower(),
-            "src_ip": m.group("src_ip"), "src_port": m.group("src_port"),
-            "dst_ip": m.group("dst_ip"), "dst_port": m.group("dst_port"),
-        })
-        return out
+    if not m:
+        return False
+    _set_tuple(out, m)
+    out.action = "deny"
+    out.protocol = m.group("protocol").lower()
+    return True
+
+def _teardown(msg: str, out: NormalizedEvent) -> bool:
     m = RE_ASA_TEARDOWN.search(msg)
-    if m:
-        out.update({
-            "action": "teardown",
-            "src_ip": m.group("src_ip"), "src_port": m.group("src_port"),
-            "dst_ip": m.group("dst_ip"), "dst_port": m.group("dst_port"),
-        })
-        return out
+    if not m:
+        return False
+    _set_tuple(out, m)
+    out.action = "teardown"
+    return True
+
+def _nat(msg: str, out: NormalizedEvent) -> bool:
     m = RE_ASA_NAT.search(msg)
-    if m:
-        out.update({
-            "action": "nat",
-            "src_ip": m.group("src_ip"), "src_port": m.group("src_port"),
-            "dst_ip": m.group("dst_ip"), "dst_port": m.group("dst_port"),
-        })
-        return out
+    if not m:
+        return False
+    _set_tuple(out, m)
+    out.action = "nat"
+    return True
+
+def _login_fail(msg: str, out: NormalizedEvent) -> bool:
     m = RE_LOGIN_FAIL.search(msg)
-    if m:
-        out.update({
-            "action": "failed_login",
-            "username": m.group("user"),
-            "src_ip": m.group("src_ip"),
-        })
-        return out
-
-    ips = RE_ANY_IP.findall(msg)
-    ports = RE_ANY_PORT.findall(msg)
+    if not m:
+        return False
+    out.action = "failed_login"
+    out.username, out.src_ip = m.group("user", "src_ip")
+    return True
+
+def _xlate(msg: str, out: NormalizedEvent) -> bool:
+    if _nat(msg, out):
+        return True
+    m = RE_ASA_XLATE.search(msg)
+    if not m:
+        return False
+    _set_tuple(out, m)
+    # Como antes del despacho por ID: la acción es el verbo ("built"/"teardown")
+    out.action = m.group("verb").lower()
+    out.protocol = m.group("protocol").lower() if m.group("protocol") else None
+    return True
+
+def _acl(msg: str, out: NormalizedEvent) -> bool:
+    m = RE_ASA_ACL.search(msg)
+    if not m:
+        return False
+    _set_tuple(out, m)
+    out.action = "deny" if m.group("verdict").lower() == "denied" else "permit"
+    out.protocol = m.group("protocol").lower()
+    return True
+
+def _aaa_reject(msg: str, out: NormalizedEvent) -> bool:
+    if _login_fail(msg, out):
+        return True
+    m = RE_AAA_REJECT.search(msg)
+    if not m:
+        return False
+    out.action = "failed_login"
+    out.username, out.src_ip = m.group("user", "src_ip")
+    return True
+
+def _login_denied(msg: str, out: NormalizedEvent) -> bool:
+    if _login_fail(msg, out):
+        return True
+    m = RE_LOGIN_DENIED.search(msg)
+    if not m:
+        return False
+    out.action = "failed_login"
+    out.username = m.group("user")
+    _set_tuple(out, m)
+    return True
+
+# Tabla de despacho por message ID de ASA
+ASA_HANDLERS = {
+    "302013": _built,       # Built inbound/outbound TCP connection
+    "302015": _built,       # Built inbound/outbound UDP connection
+    "302014": _teardown,    # Teardown TCP connection
+    "302016": _teardown,    # Teardown UDP connection
+    "106023": _deny,        # Deny <proto> src ... dst ... by access-group
+    "106100": _acl,         # access-list <acl> permitted/denied ...
+    "305011": _xlate,       # Built dynamic translation
+    "305012": _xlate,       # Teardown dynamic translation
+    "113015": _aaa_reject,  # AAA user authentication Rejected
+    "605004": _login_denied,  # Login denied
+}
+
+# Orden histórico de prueba cuando el ID es desconocido (o el texto no coincide)
+_FALLBACK_CHAIN = (_built, _deny, _teardown, _nat, _login_fail)
+# Handlers que ya prueban otros del fallback: si fallaron, esos no se repiten
+_COVERS = {_xlate: (_nat,), _aaa_reject: (_login_fail,), _login_denied: (_login_fail,)}
+
+# Handlers en uso: los de arriba o, con estadísticas activas, versiones que
+# cuentan aciertos/fallos por patrón (así apagadas no cuestan nada por línea)
+_handlers = ASA_HANDLERS
+_fallback = _FALLBACK_CHAIN
+_covers = _COVERS
+
+def _counting(fn, st: stats.Stats):
+    name = fn.__name__.lstrip("_")
+    hit, miss = f"asa.{name}.hit", f"asa.{name}.miss"
+    incr = st.incr
+    def wrapped(msg: str, out: NormalizedEvent) -> bool:
+        ok = fn(msg, out)
+        incr(hit if ok else miss)
+        return ok
+    return wrapped
+
+def _instrument(st: Optional[stats.Stats]) -> None:
+    global _handlers, _fallback, _covers
+    if st is None:
+        _handlers, _fallback, _covers = ASA_HANDLERS, _FALLBACK_CHAIN, _COVERS
+        return
+    wrapped = {fn: _counting(fn, st) for fn in {*ASA_HANDLERS.values(), *_FALLBACK_CHAIN}}
+    _handlers = {k: wrapped[fn] for k, fn in ASA_HANDLERS.items()}
+    _fallback = tuple(wrapped[fn] for fn in _FALLBACK_CHAIN)
+    _covers = {wrapped[fn]: tuple(wrapped[c] for c in cs) for fn, cs in _COVERS.items()}
+
+stats.on_toggle(_instrument)
+
+def normalize_asa_line(line: str) -> NormalizedEvent:
+    iso_ts, host, msg = parse_syslog_prefix(line)
+    out = NormalizedEvent(timestamp=iso_ts, device=host, msg=msg)
+
+    handler = None
+    tag = RE_ASA_TAG.search(msg, 0, TAG_SEARCH_WINDOW)
+    if tag:
+        out.severity = tag.group("sev")
+        out.message_id = tag.group("msgid")
+        handler = _handlers.get(tag.group("msgid"))
+
+    if len(msg) <= MAX_LINE_LEN:
+        if handler and handler(msg, out):
+            return out
+        tried = _covers.get(handler, ())
+        for h in _fallback:
+            if h is not handler and h not in tried and h(msg, out):
+                return out
+        body = msg
+    else:
+        body = msg[:MAX_LINE_LEN]
+    stats.incr("asa.heuristic")
+
+    ips = RE_ANY_IP.findall(body)
+    ports = RE_ANY_PORT.findall(body)
     if ips:
-        out["src_ip"] = ips[0]
+        out.src_ip = ips[0]
         if len(ips) > 1:
-            out["dst_ip"] = ips[1]
+            out.dst_ip = ips[1]
     if ports:
         if len(ports) >= 2:
-            out["src_port"] = ports[0]
-            out["dst_port"] = ports[1]
+            out.src_port = ports[0]
+            out.dst_port = ports[1]
         else:
-            out["dst_port"] = ports[0]
-
-    s = msg.lower()
-    if "deny" in s: out["action"] = out["action"] or "deny"
-    if "built" in s: out["action"] = out["action"] or "built"
-    if "teardown" in s: out["action"] = out["action"] or "teardown"
-    if "translation by nat" in s: out["action"] = out["action"] or "nat"
-    if "tcp" in s: out["protocol"] = out["protocol"] or "tcp"
-    if "udp" in s: out["protocol"] = out["protocol"] or "udp"
-    if "icmp" in s: out["protocol"] = out["protocol"] or "icmp"
+            out.dst_port = ports[0]
+
+    s = body.lower()
+    if "deny" in s: out.action = out.action or "deny"
+    if "built" in s: out.action = out.action or "built"
+    if "teardown" in s: out.action = out.action or "teardown"
+    if "translation by nat" in s: out.action = out.action or "nat"
+    if "tcp" in s: out.protocol = out.protocol or "tcp"
+    if "udp" in s: out.protocol = out.protocol or "udp"
+    if "icmp" in s: out.protocol = out.protocol or "icmp"
     return out
 
-def parse_cisco_txt(path: Path) -> Iterable[Dict[str, Optional[str]]]:
-    PRI_RE = re.compile(r"^<\d+>")
-    ISO_TS_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}")
-
-    with path.open("r", encoding="utf-8", errors="ignore") as f:
-        for ln in f:
-            ln = ln.strip()
-            if not ln or ln.startswith("#"):
-                continue
-            if PRI_RE.match(ln):
-                ln = PRI_RE.sub("", ln).strip()
-            if ISO_TS_RE.match(ln):
-                parts = ln.split(" ", 1)
-                if len(parts) == 2:
-                    ts, rest = parts
-                    ln = f"{ts} {rest}"
-            try:
-                rec = normalize_asa_line(ln)
-                rec["raw"] = ln
-                yield rec
-            except Exception as e:
-                yield {
-                    "timestamp": None,
-                    "device": None,
-                    "msg": ln,
-                    "error": str(e),
-                    **{k: None for k in FIELDNAMES if k not in ("timestamp", "device", "msg")},
-                }
+PRI_RE = re.compile(r"^<\d+>")
+ISO_TS_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}")
+
+def parse_cisco_line(ln: str) -> Optional[NormalizedEvent]:
+    """Normaliza una línea cruda del archivo; None si es vacía o comentario."""
+    ln = ln.strip()
+    if not ln or ln.startswith("#"):
+        return None
+    if PRI_RE.match(ln):
+        ln = PRI_RE.sub("", ln).strip()
+    if ISO_TS_RE.match(ln):
+        parts = ln.split(" ", 1)
+        if len(parts) == 2:
+            ts, rest = parts
+            ln = f"{ts} {rest}"
+    try:
+        return normalize_asa_line(ln)
+    except Exception:
+        stats.incr("asa.parse_errors")
+        return NormalizedEvent(msg=ln)
+
+def parse_cisco_txt(path: Path, start: int = 0, end: Optional[int] = None) -> Iterable[NormalizedEvent]:
+    for ln in iter_lines(path, start, end, errors="ignore"):
+        rec = parse_cisco_line(ln)
+        if rec is not None:
+            yield rec
+
+RE_SYSLOG_HEAD = re.compile(rb"^(?:<\d+>)?(?:[A-Z][a-z]{2}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}|\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})", re.MULTILINE)
+
+def sniff_cisco_txt(head: bytes, path: Path) -> float:
+    if first_line(head).startswith("{"):
+        return 0.0
+    if b"%ASA-" in head or b"%FTD-" in head:
+        return 0.9
+    if RE_SYSLOG_HEAD.search(head):
+        return 0.6
+    if logical_suffix(path) in (".log", ".txt"):
+        return 0.5
+    # Último recurso para texto arbitrario (como antes)
+    return 0.1
+
+register_parser("cisco_asa", parse_cisco_txt, sniff_cisco_txt, label="Cisco ASA", line_oriented=True,
+                parse_line=parse_cisco_line)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Checkpoints por entrada para la normalización incremental.
+
+Junto a la salida se guarda `<salida>.manifest.json` con, por cada entrada:
+device/inode, tamaño, hash de la cabecera y el último offset procesado.
+Con eso una corrida siguiente sabe si el archivo solo creció (se parsea la cola)
+o si fue truncado/reescrito (hay que reconstruir todo).
+"""
+from pathlib import Path
+from typing import Dict, Optional
+import hashlib, json, os
+from .core import FIELDNAMES
+
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+# Bytes iniciales que identifican el contenido de un archivo
+HEAD_BYTES = 4096
+
+def manifest_path(out_path) -> Path:
+    return Path(str(out_path) + MANIFEST_SUFFIX)
+
+def _head_sha1(path: Path, length: int) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+def file_state(path: Path) -> Dict:
+    st = os.stat(path)
+    head_len = min(st.st_size, HEAD_BYTES)
+    return {
+        "dev": st.st_dev,
+        "ino": st.st_ino,
+        "size": st.st_size,
+        "head_len": head_len,
+        "head_sha1": _head_sha1(path, head_len),
+    }
+
+def same_file(prev: Dict, path: Path, state: Dict) -> bool:
+    """True si `path` es el mismo archivo de `prev` y solo pudo haber crecido."""
+    if (prev.get("dev"), prev.get("ino")) != (state["dev"], state["ino"]):
+        return False
+    if state["size"] < prev.get("offset", 0):
+        return False  # truncado
+    head_len = prev.get("head_len", 0)
+    if state["size"] < head_len:
+        return False
+    return _head_sha1(path, head_len) == prev.get("head_sha1")
+
+def complete_lines_end(path: Path, size: int) -> int:
+    """
+    Fin de la última línea completa (posición tras su '\n') dentro de los primeros
+    `size` bytes. Una línea que todavía se está escribiendo queda fuera del rango
+    y del checkpoint, y se lee entera en la corrida siguiente.
+    """
+    block = 64 * 1024
+    with open(path, "rb") as f:
+        pos = size
+        while pos > 0:
+            start = max(0, pos - block)
+            f.seek(start)
+            i = f.read(pos - start).rfind(b"\n")
+            if i >= 0:
+                return start + i + 1
+            pos = start
+    return 0
+
+def resume_offset(path: Path, offset: int) -> int:
+    """
+    Primer inicio de línea en o después de `offset`. Si la última línea procesada
+    estaba incompleta, su continuación se descarta (ya se contó una vez).
+    """
+    if offset <= 0:
+        return 0
+    with open(path, "rb") as f:
+        f.seek(offset - 1)
+        if f.read(1) == b"\n":
+            return offset
+        f.readline()
+        return f.tell()
+
+def load_manifest(out_path) -> Optional[Dict]:
+    p = manifest_path(out_path)
+    try:
+        with open(p, "r", encoding="utf-8") as f:
+            man = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if man.get("version") != MANIFEST_VERSION or man.get("fieldnames") != FIELDNAMES:
+        return None
+    return man
+
+def save_manifest(out_path, inputs: Dict[str, Dict], unsorted: bool = False) -> None:
+    """
+    `unsorted` marca una salida con filas agregadas sin ordenar (modo --follow):
+    la corrida incremental siguiente no puede fusionar sobre ella y la reconstruye.
+    """
+    p = manifest_path(out_path)
+    tmp = p.with_name(p.name + ".tmp")
+    man = {"version": MANIFEST_VERSION, "fieldnames": FIELDNAMES, "inputs": inputs}
+    if unsorted:
+        man["unsorted"] = True
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(man, f, indent=1)
+    os.replace(tmp, p)
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
-from typing import Dict, Iterable, Optional
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+from functools import lru_cache
 from pathlib import Path
-from .core import FIELDNAMES, to_iso
+from .core import NormalizedEvent, iter_lines, to_iso
+from .registry import first_line, register_parser
+from . import stats
 import json, re, ipaddress
 
 KEY_VARIANTS = {
@@ -26,102 +29,208 @@ KEY_VARIANTS = {
     "bytes_out": ["bytes_out", "egress_bytes", "tx_bytes", "network.bytes_out"],
 }
 
-def _get_nested(d: dict, dotted: str):
+# Esquemas distintos (conjuntos de claves de primer nivel) con plan compilado en cache
+PLAN_CACHE_SIZE = 1024
+
+Accessor = Union[str, Tuple[str, ...]]
+
+def _get_path(d: dict, parts: Tuple[str, ...]):
     cur = d
-    for part in dotted.split("."):
+    for part in parts:
         if not isinstance(cur, dict) or part not in cur:
             return None
         cur = cur[part]
     return cur
 
-def _find_one(d: dict, variants):
-    for k in variants:
-        v = _get_nested(d, k) if "." in k else d.get(k)
-        if v not in (None, ""):
-            return v
-    return None
+Plan = Tuple[Tuple[str, Tuple[Accessor, ...]], ...]
 
-def _extract_first_ip_any(obj):
-    if not obj:
-        return None
-    s = obj if isinstance(obj, str) else json.dumps(obj, ensure_ascii=False)
-    m4 = re.search(r"\b(\d{1,3}(?:\.\d{1,3}){3})\b", s)
-    if m4:
-        return m4.group(1)
-    m6 = re.search(r"([0-9a-fA-F:]{5,})", s)
-    if m6:
-        cand = m6.group(1)
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _compile_plan(keys: FrozenSet[str]) -> Plan:
+    """
+    Para un conjunto de claves de primer nivel, deja por cada campo solo las
+    variantes que pueden existir (clave simple presente o ruta cuyo primer tramo
+    está presente), con las rutas ya partidas. Los campos sin candidatas se omiten.
+    """
+    plan = []
+    for fld, variants in KEY_VARIANTS.items():
+        acc: List[Accessor] = []
+        for k in variants:
+            if "." in k:
+                parts = tuple(k.split("."))
+                if parts[0] in keys:
+                    acc.append(parts)
+            elif k in keys:
+                acc.append(k)
+        if acc:
+            plan.append((fld, tuple(acc)))
+    return tuple(plan)
+
+def _resolve(d: dict, plan: Plan) -> Dict[str, object]:
+    """Primer valor no vacío de cada campo según el plan (campos sin valor quedan fuera)."""
+    vals = {}
+    for fld, accessors in plan:
+        for a in accessors:
+            v = d[a] if a.__class__ is str else _get_path(d, a)
+            if v not in (None, ""):
+                vals[fld] = v
+                break
+    return vals
+
+try:
+    import orjson
+except ImportError:  # opcional: sin orjson se usa el módulo json estándar
+    orjson = None
+
+def _loads(ln: str):
+    if orjson is not None:
         try:
-            ipaddress.ip_address(cand)
-            return cand
-        except Exception:
-            return None
-    return None
+            return orjson.loads(ln)
+        except orjson.JSONDecodeError:
+            pass  # NaN, enteros enormes, etc.: lo que json acepte se sigue aceptando
+    return json.loads(ln)
+
+RE_IPV4 = re.compile(r"\b(\d{1,3}(?:\.\d{1,3}){3})\b")
+# Una IPv6 textual nunca supera 45 caracteres; el tramo acotado evita recorrer hashes enteros
+RE_IPV6_CAND = re.compile(r"([0-9a-fA-F:]{5,45})")
+# Solo se inspeccionan los primeros caracteres de texto del evento
+MAX_SCAN_LEN = 65536
+
+def _collect_strings(obj, out: List[str], budget: int) -> int:
+    """Agrega a `out` los valores de texto en orden de documento; devuelve el presupuesto restante."""
+    for v in (obj.values() if isinstance(obj, dict) else obj):
+        if budget <= 0:
+            break
+        if isinstance(v, str):
+            out.append(v)
+            budget -= len(v)
+        elif isinstance(v, (dict, list)):
+            budget = _collect_strings(v, out, budget)
+    return budget
 
-def parse_cisco_secure_endpoint_jsonl(path: Path) -> Iterable[Dict[str, Optional[str]]]:
-    with path.open("r", encoding="utf-8") as f:
-        for ln in f:
-            ln = ln.strip()
-            if not ln:
+def _first_ipv6(texts: List[str]) -> Optional[str]:
+    for s in texts:
+        for cand in RE_IPV6_CAND.findall(s, 0, MAX_SCAN_LEN):
+            # Una IPv6 tiene 8 grupos o abrevia con '::' (descarta horas, MACs, etc.)
+            if "::" not in cand and cand.count(":") != 7:
                 continue
             try:
-                ev = json.loads(ln)
-            except Exception:
+                ipaddress.ip_address(cand)
+                return cand
+            except ValueError:
                 continue
+    return None
+
+def _extract_first_ip_any(obj):
+    """Primera IPv4 (o, si no hay, primera IPv6 válida) entre los textos del evento."""
+    if not obj:
+        return None
+    texts = [obj] if isinstance(obj, str) else []
+    if not texts:
+        _collect_strings(obj, texts, MAX_SCAN_LEN)
+    for s in texts:
+        m4 = RE_IPV4.search(s, 0, MAX_SCAN_LEN)
+        if m4:
+            return m4.group(1)
+    return _first_ipv6(texts)
+
+def parse_cisco_secure_endpoint_line(ln: str) -> Optional[NormalizedEvent]:
+    """Normaliza una línea JSONL; None si es vacía, inválida o no es un objeto."""
+    ln = ln.strip()
+    if not ln:
+        return None
+    try:
+        ev = _loads(ln)
+    except Exception:
+        stats.incr("amp.json_errors")
+        return None
+    if not isinstance(ev, dict):
+        stats.incr("amp.non_object")
+        return None
+    vals = _resolve(ev, _compile_plan(frozenset(ev)))
+
+    out = NormalizedEvent()
+
+    ts = vals.get("timestamp")
+    out.timestamp = to_iso(ts) if ts else None
+    out.device = vals.get("device")
+
+    agent_ip = vals.get("agent_ip")
+    out.src_ip = vals.get("src_ip") or agent_ip or _extract_first_ip_any(ev)
+    out.dst_ip = vals.get("dst_ip")
+
+    sp = vals.get("src_port")
+    dp = vals.get("dst_port")
+    out.src_port = str(int(sp)) if isinstance(sp, (int, float)) else (str(sp) if sp else None)
+    out.dst_port = str(int(dp)) if isinstance(dp, (int, float)) else (str(dp) if dp else None)
+
+    proto = vals.get("protocol")
+    out.protocol = (proto or "").lower() if proto else None
+
+    out.username = vals.get("username")
+    out.malware_name = vals.get("malware_name")
+    out.malware_hash = vals.get("malware_hash")
+
+    action = vals.get("action")
+    if isinstance(action, str):
+        a = action.strip().lower()
+        out.action = action.title() if a in ("malicious", "quarantined", "blocked", "detected", "clean") else action
+    else:
+        out.action = action
+
+    cmd = vals.get("command_line")
+    dom = vals.get("domain")
+    bi = vals.get("bytes_in")
+    bo = vals.get("bytes_out")
+    try: bi = int(bi) if bi is not None else None
+    except Exception: pass
+    try: bo = int(bo) if bo is not None else None
+    except Exception: pass
+
+    parts = []
+    fp = vals.get("file_path")
+    pn = vals.get("process_name")
+    if fp: parts.append(f"file={fp}")
+    if pn: parts.append(f"proc={pn}")
+    if cmd: parts.append(f"cmd={cmd}")
+    if dom: parts.append(f"domain={dom}")
+    if out.src_ip: parts.append(f"src={out.src_ip}")
+    if out.dst_ip: parts.append(f"dst={out.dst_ip}")
+    if out.dst_port: parts.append(f"dport={out.dst_port}")
+    if out.protocol: parts.append(f"proto={out.protocol}")
+    if bi is not None: parts.append(f"bytes_in={bi}")
+    if bo is not None: parts.append(f"bytes_out={bo}")
+    if out.malware_name: parts.append(f"threat={out.malware_name}")
+    if out.action: parts.append(f"disposition={out.action}")
+    out.msg = " ".join(parts) if parts else json.dumps(ev, ensure_ascii=False)
+    return out
+
+def parse_cisco_secure_endpoint_jsonl(path: Path, start: int = 0, end: Optional[int] = None) -> Iterable[NormalizedEvent]:
+    for ln in iter_lines(path, start, end):
+        out = parse_cisco_secure_endpoint_line(ln)
+        if out is not None:
+            yield out
+
+AMP_KEY_HINTS = ("connector_guid", "computer", "disposition")
+AMP_TEXT_HINTS = ("secure endpoint", "amp for endpoints", "disposition")
+
+def sniff_cisco_secure_endpoint(head: bytes, path: Path) -> float:
+    first = first_line(head)
+    if not first.startswith("{"):
+        return 0.0
+    try:
+        sample = json.loads(first)
+    except Exception:
+        # Primera línea truncada por la ventana de sniffing: pistas por texto
+        low = first.lower()
+        return 0.8 if any(f'"{h}"' in low for h in AMP_KEY_HINTS) else 0.0
+    if not isinstance(sample, dict):
+        return 0.0
+    keys_lower = {k.lower() for k in sample.keys()}
+    blob = json.dumps(sample).lower()
+    if any(h in keys_lower for h in AMP_KEY_HINTS) or any(h in blob for h in AMP_TEXT_HINTS):
+        return 0.95
+    return 0.0
 
-            out = {k: None for k in FIELDNAMES}
-
-            ts = _find_one(ev, KEY_VARIANTS["timestamp"])
-            out["timestamp"] = to_iso(ts) if ts else None
-            out["device"] = _find_one(ev, KEY_VARIANTS["device"])
-
-            agent_ip = _find_one(ev, KEY_VARIANTS["agent_ip"])
-            out["src_ip"] = _find_one(ev, KEY_VARIANTS["src_ip"]) or agent_ip or _extract_first_ip_any(ev)
-            out["dst_ip"] = _find_one(ev, KEY_VARIANTS["dst_ip"])
-
-            sp = _find_one(ev, KEY_VARIANTS["src_port"])
-            dp = _find_one(ev, KEY_VARIANTS["dst_port"])
-            out["src_port"] = str(int(sp)) if isinstance(sp, (int, float)) else (str(sp) if sp else None)
-            out["dst_port"] = str(int(dp)) if isinstance(dp, (int, float)) else (str(dp) if dp else None)
-
-            proto = _find_one(ev, KEY_VARIANTS["protocol"])
-            out["protocol"] = (proto or "").lower() if proto else None
-
-            out["username"] = _find_one(ev, KEY_VARIANTS["username"])
-            out["malware_name"] = _find_one(ev, KEY_VARIANTS["malware_name"])
-            out["malware_hash"] = _find_one(ev, KEY_VARIANTS["malware_hash"])
-
-            action = _find_one(ev, KEY_VARIANTS["action"])
-            if isinstance(action, str):
-                a = action.strip().lower()
-                out["action"] = action.title() if a in ("malicious", "quarantined", "blocked", "detected", "clean") else action
-            else:
-                out["action"] = action
-
-            cmd = _find_one(ev, KEY_VARIANTS["command_line"])
-            dom = _find_one(ev, KEY_VARIANTS["domain"])
-            bi = _find_one(ev, KEY_VARIANTS["bytes_in"])
-            bo = _find_one(ev, KEY_VARIANTS["bytes_out"])
-            try: bi = int(bi) if bi is not None else None
-            except Exception: pass
-            try: bo = int(bo) if bo is not None else None
-            except Exception: pass
-
-            parts = []
-            fp = _find_one(ev, KEY_VARIANTS["file_path"])
-            pn = _find_one(ev, KEY_VARIANTS["process_name"])
-            if fp: parts.append(f"file={fp}")
-            if pn: parts.append(f"proc={pn}")
-            if cmd: parts.append(f"cmd={cmd}")
-            if dom: parts.append(f"domain={dom}")
-            if out["src_ip"]: parts.append(f"src={out['src_ip']}")
-            if out["dst_ip"]: parts.append(f"dst={out['dst_ip']}")
-            if out["dst_port"]: parts.append(f"dport={out['dst_port']}")
-            if out["protocol"]: parts.append(f"proto={out['protocol']}")
-            if bi is not None: parts.append(f"bytes_in={bi}")
-            if bo is not None: parts.append(f"bytes_out={bo}")
-            if out["malware_name"]: parts.append(f"threat={out['malware_name']}")
-            if out["action"]: parts.append(f"disposition={out['action']}")
-            out["msg"] = " ".join(parts) if parts else json.dumps(ev, ensure_ascii=False)
-
-            yield {k: (out.get(k) if out.get(k) is not None else "") for k in FIELDNAMES}
+register_parser("cisco_secure_endpoint", parse_cisco_secure_endpoint_jsonl, sniff_cisco_secure_endpoint,
+                label="Cisco Secure Endpoint", line_oriented=True,
+                parse_line=parse_cisco_secure_endpoint_line)
@@ -1,51 +1,161 @@
 # -*- coding: utf-8 -*-
-from datetime import datetime
-from typing import Optional, Tuple
-import re
+from pathlib import Path
+from typing import IO, Callable, Iterator, List, Optional, Tuple
+import bz2, gzip, io, lzma, os, threading
+from operator import attrgetter
+# Re-export: el motor de timestamps vive en su propio módulo
+from .timestamps import MONTHS, to_iso, parse_syslog_prefix
 
 FIELDNAMES = [
-    "timestamp","device","src_ip","src_port","dst_ip","dst_port",
-    "protocol","action","username","malware_name","malware_hash","msg"
+    "timestamp","epoch","device","src_ip","src_port","dst_ip","dst_port",
+    "protocol","action","username","malware_name","malware_hash","msg",
+    "severity","message_id"
 ]
 
-MONTHS = {m: i for i, m in enumerate(
-    ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"], start=1
-)}
-
-def to_iso(ts: str) -> Optional[str]:
-    if not ts:
-        return None
-    ts = ts.strip()
-    try:
-        return datetime.fromisoformat(ts.replace("Z", "+00:00")).replace(microsecond=0).isoformat()
-    except Exception:
-        pass
-    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y/%m/%d %H:%M:%S"):
-        try:
-            return datetime.strptime(ts, fmt).isoformat()
-        except Exception:
-            continue
+# ----------------- Evento normalizado -----------------
+class NormalizedEvent:
+    """
+    Un evento con las columnas de FIELDNAMES como slots (None = vacío).
+    Es lo que producen los parsers y lo que consume el reporte: sin __dict__
+    por instancia, ocupa bastante menos que un dict con las mismas claves.
+    """
+    __slots__ = tuple(FIELDNAMES)
+
+    def __init__(self, timestamp=None, epoch=None, device=None, src_ip=None, src_port=None,
+                 dst_ip=None, dst_port=None, protocol=None, action=None, username=None,
+                 malware_name=None, malware_hash=None, msg=None, severity=None, message_id=None):
+        self.timestamp = timestamp
+        self.epoch = epoch
+        self.device = device
+        self.src_ip = src_ip
+        self.src_port = src_port
+        self.dst_ip = dst_ip
+        self.dst_port = dst_port
+        self.protocol = protocol
+        self.action = action
+        self.username = username
+        self.malware_name = malware_name
+        self.malware_hash = malware_hash
+        self.msg = msg
+        self.severity = severity
+        self.message_id = message_id
+
+    def values(self) -> Tuple:
+        """Valores en orden FIELDNAMES."""
+        return _EVENT_VALUES(self)
+
+    def as_row(self) -> List[str]:
+        """Fila para el CSV: valores en orden FIELDNAMES, None -> ''."""
+        return ["" if v is None else v for v in _EVENT_VALUES(self)]
+
+    def get(self, key: str, default=None):
+        """Acceso estilo dict, para código que todavía trata los eventos como mapas."""
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def __eq__(self, other):
+        if not isinstance(other, NormalizedEvent):
+            return NotImplemented
+        return self.values() == other.values()
+
+    def __repr__(self):
+        return "NormalizedEvent(%s)" % ", ".join(
+            f"{k}={v!r}" for k, v in zip(FIELDNAMES, self.values()) if v is not None)
+
+_EVENT_VALUES = attrgetter(*FIELDNAMES)
+
+# ----------------- Compresión transparente -----------------
+# Detección por magic bytes (no por extensión)
+MAGIC = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+}
+_OPENERS = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+# Para escribir sí se decide por extensión (el archivo aún no existe)
+_EXT_COMPRESSION = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+def detect_compression(path: Path) -> Optional[str]:
+    with open(path, "rb") as f:
+        magic = f.read(6)
+    for name, sig in MAGIC.items():
+        if magic.startswith(sig):
+            return name
     return None
 
-def parse_syslog_prefix(line: str) -> Tuple[Optional[str], Optional[str], str]:
+# Quien quiera seguir la posición de lectura (progress.Tracker) recibe cada archivo
+# abierto. Es por hilo: lo que abren otros hilos (p. ej. el escaneo de la GUI) no le llega.
+_local = threading.local()
+
+def observe_opens(observer: Optional[Callable[[Path, IO[bytes]], None]]):
+    """Instala `observer(path, f)` para las próximas aperturas de este hilo; devuelve el anterior."""
+    prev = getattr(_local, "observer", None)
+    _local.observer = observer
+    return prev
+
+def open_binary(path: Path) -> IO[bytes]:
+    """Abre en binario, descomprimiendo al vuelo gzip/bz2/xz si corresponde."""
+    comp = detect_compression(path)
+    f = _OPENERS[comp](path, "rb") if comp else open(path, "rb")
+    observer = getattr(_local, "observer", None)
+    if observer is not None:
+        observer(path, f)
+    return f
+
+def open_text(path: Path, encoding: str = "utf-8", errors: str = "strict", newline: Optional[str] = None) -> IO[str]:
+    return io.TextIOWrapper(open_binary(path), encoding=encoding, errors=errors, newline=newline)
+
+def open_text_write(path, encoding: str = "utf-8", newline: Optional[str] = "") -> IO[str]:
+    """Abre para escritura; comprime según la extensión (.gz/.bz2/.xz)."""
+    comp = _EXT_COMPRESSION.get(Path(path).suffix.lower())
+    if comp:
+        return _OPENERS[comp](path, "wt", encoding=encoding, newline=newline)
+    return open(path, "w", encoding=encoding, newline=newline)
+
+def logical_suffix(path: Path) -> str:
+    """Extensión sin la de compresión: 'fw.log.gz' -> '.log'."""
+    suffixes = [s.lower() for s in Path(path).suffixes]
+    while suffixes and suffixes[-1] in _EXT_COMPRESSION:
+        suffixes.pop()
+    return suffixes[-1] if suffixes else ""
+
+# ----------------- Lectura por rangos de bytes -----------------
+def iter_lines(path: Path, start: int = 0, end: Optional[int] = None,
+               encoding: str = "utf-8", errors: str = "strict") -> Iterator[str]:
+    """
+    Itera las líneas (decodificadas) que comienzan en [start, end).
+    `start` debe estar alineado a inicio de línea (ver split_ranges).
+    Los archivos comprimidos solo admiten lectura completa (start=0, end=None).
+    """
+    with open_binary(path) as f:
+        if start:
+            f.seek(start)
+        pos = start
+        for raw in f:
+            if end is not None and pos >= end:
+                break
+            pos += len(raw)
+            yield raw.decode(encoding, errors)
+
+def split_ranges(path: Path, parts: int, min_bytes: int = 0) -> List[Tuple[int, Optional[int]]]:
     """
-    Extrae 'Mon DD HH:MM:SS host ' al inicio si está presente.
-    Retorna (iso_ts, host, msg_sin_prefijo)
+    Divide el archivo en hasta `parts` rangos [start, end) alineados a saltos de línea.
+    Cada rango tiene al menos `min_bytes` (salvo el último).
+    Un archivo comprimido no se puede partir: se devuelve un único rango.
     """
-    m = re.match(r"^(?P<mon>[A-Z][a-z]{2})\s+(?P<day>\d{1,2})\s+(?P<time>\d{2}:\d{2}:\d{2})\s+(?P<host>\S+)\s+(?P<msg>.+)$", line.strip())
-    if not m:
-        return None, None, line.strip()
-    mon = m.group("mon")
-    day = int(m.group("day"))
-    time_str = m.group("time")
-    host = m.group("host")
-    msg = m.group("msg")
-    mon_n = MONTHS.get(mon)
-    if not mon_n:
-        return None, host, msg
-    y = datetime.now().year
-    try:
-        dt = datetime.strptime(f"{y}-{mon_n:02d}-{day:02d} {time_str}", "%Y-%m-%d %H:%M:%S")
-        return dt.isoformat(), host, msg
-    except Exception:
-        return None, host, msg
+    if detect_compression(path):
+        return [(0, None)]
+    size = os.path.getsize(path)
+    if min_bytes:
+        parts = min(parts, size // min_bytes)
+    parts = max(1, parts)
+    if parts == 1:
+        return [(0, None)]
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            f.seek(size * i // parts)
+            f.readline()
+            pos = f.tell()
+            if pos > bounds[-1] and pos < size:
+                bounds.append(pos)
+    return [(a, b) for a, b in zip(bounds, bounds[1:] + [None])]
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Modo --follow: sigue archivos que siguen creciendo (como `tail -F`).
+
+- Arranca con una corrida incremental normal (ordenada, con checkpoint) y desde
+  ahí lee solo los bytes nuevos de cada entrada.
+- Solo se siguen las fuentes con `parse_line` (ASA, Secure Endpoint) y sin
+  comprimir; las demás quedan con lo leído al arrancar.
+- Rotación (el path apunta a otro inode): se termina de leer el archivo viejo por
+  el descriptor abierto y se sigue con el nuevo desde el inicio.
+- Truncado (el tamaño baja del offset leído): se vuelve a leer desde el inicio.
+- Las filas nuevas se agregan al final del CSV en micro-lotes, sin reordenar, y
+  el checkpoint se guarda después de cada lote (ante un corte, al reanudar se
+  puede repetir a lo sumo el último lote). El manifiesto marca la salida como
+  desordenada, así que la próxima corrida incremental (o un nuevo --follow)
+  la reconstruye ordenada en lugar de fusionar sobre ella.
+"""
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import csv, os, time
+from .core import FIELDNAMES, NormalizedEvent, detect_compression
+from .checkpoint import file_state, load_manifest, resume_offset, same_file, save_manifest
+from .registry import ParserSpec, spec_for
+from .run import _iter_sources, _key, _to_row, normalize_files
+from .progress import CancelToken
+from . import stats
+
+# Segundos entre dos sondeos de las entradas
+POLL_INTERVAL = 1.0
+# Máximo de bytes leídos por entrada en cada sondeo (acota la memoria de un lote)
+READ_CHUNK = 1 << 20
+
+# on_batch(eventos agregados en el sondeo); se llama en cada sondeo, aunque no haya nuevos
+BatchFn = Callable[[List[NormalizedEvent]], None]
+
+class _Tail:
+    """Una entrada seguida: descriptor abierto, offset leído y línea incompleta pendiente."""
+    def __init__(self, path: Path, spec: ParserSpec, offset: int):
+        self.path = path
+        self.spec = spec
+        self.f = open(path, "rb")
+        self.state = file_state(path)
+        self.offset = offset
+        self.f.seek(offset)
+        self.partial = b""
+
+    def close(self) -> None:
+        self.f.close()
+
+    def _reopen(self) -> None:
+        self.f.close()
+        self.f = open(self.path, "rb")
+        self.state = file_state(self.path)
+        self.offset = 0
+        self.partial = b""
+
+    def _read(self, final: bool = False) -> List[bytes]:
+        """Líneas completas nuevas; con `final` también la última sin salto de línea."""
+        data = self.f.read(READ_CHUNK)
+        self.offset += len(data)
+        buf = self.partial + data
+        lines = buf.split(b"\n")
+        self.partial = lines.pop()
+        if final and self.partial:
+            lines.append(self.partial)
+            self.partial = b""
+        return lines
+
+    def poll(self) -> List[bytes]:
+        lines: List[bytes] = []
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            st = None  # rotación en curso: el nuevo archivo todavía no existe
+        if st is not None and (st.st_dev, st.st_ino) != (self.state["dev"], self.state["ino"]):
+            # Rotación: vaciar el archivo viejo antes de pasar al nuevo
+            while True:
+                chunk = self._read(final=True)
+                if not chunk:
+                    break
+                lines.extend(chunk)
+            print(f"[INFO] {self.path.name} rotó; se sigue el archivo nuevo.")
+            stats.incr("follow.rotations")
+            self._reopen()
+        elif os.fstat(self.f.fileno()).st_size < self.offset:
+            print(f"[INFO] {self.path.name} fue truncado; se lee desde el inicio.")
+            stats.incr("follow.truncations")
+            self._reopen()
+        lines.extend(self._read())
+        return lines
+
+    def checkpoint(self) -> Dict:
+        # El offset guardado apunta al inicio de la línea incompleta, si la hay
+        st = dict(self.state, size=self.offset, offset=self.offset - len(self.partial))
+        st["parser"] = self.spec.name
+        return st
+
+    def has_more(self) -> bool:
+        return os.fstat(self.f.fileno()).st_size > self.offset
+
+def _open_tails(inputs: List[str], out_csv: str) -> List[_Tail]:
+    man = load_manifest(out_csv) or {"inputs": {}}
+    tails = []
+    for path, parser in _iter_sources(inputs):
+        spec = spec_for(parser)
+        if spec is None or spec.parse_line is None or detect_compression(path):
+            print(f"[INFO] {path.name} no se puede seguir en vivo; queda con lo leído al arrancar.")
+            continue
+        prev = man["inputs"].get(_key(path))
+        offset = 0
+        if prev is not None and same_file(prev, path, file_state(path)):
+            offset = resume_offset(path, prev["offset"])
+        tails.append(_Tail(path, spec, offset))
+    return tails
+
+def follow_files(inputs: List[str], out_csv: str, poll_interval: float = POLL_INTERVAL,
+                 on_batch: Optional[BatchFn] = None, cancel: Optional[CancelToken] = None,
+                 max_rows_in_memory: Optional[int] = None, workers: int = 1):
+    """
+    Normaliza las entradas (como normalize_files con `incremental`) y después
+    sigue agregando al CSV lo que se escriba en ellas, hasta que se cancele con
+    `cancel` o con Ctrl+C. `on_batch` recibe los eventos de cada micro-lote ya
+    escritos (p. ej. para refrescar un resumen sin releer el CSV).
+    `max_rows_in_memory` y `workers` se aplican a la corrida inicial.
+    """
+    if Path(out_csv).suffix.lower() != ".csv":
+        raise ValueError(f"--follow solo admite un CSV sin comprimir: {out_csv}")
+    normalize_files(inputs, out_csv, max_rows_in_memory=max_rows_in_memory, workers=workers, incremental=True)
+    tails = _open_tails(inputs, out_csv)
+    # Checkpoint de las entradas que no se siguen (se conserva tal cual)
+    states = (load_manifest(out_csv) or {"inputs": {}})["inputs"]
+    if not tails:
+        print("[WARN] Ninguna entrada se puede seguir en vivo.")
+        return
+    print(f"[OK] Siguiendo {len(tails)} entrada(s); Ctrl+C para terminar.")
+    try:
+        with open(out_csv, "a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            if f.tell() == 0:
+                w.writerow(FIELDNAMES)
+            while cancel is None or not cancel.cancelled:
+                events: List[NormalizedEvent] = []
+                for t in tails:
+                    parse_line = t.spec.parse_line
+                    for raw in t.poll():
+                        ev = parse_line(raw.decode("utf-8", errors="ignore"))
+                        if ev is not None:
+                            events.append(ev)
+                if events:
+                    w.writerows(_to_row(ev) for ev in events)
+                    f.flush()
+                    for t in tails:
+                        states[_key(t.path)] = t.checkpoint()
+                    save_manifest(out_csv, states, unsorted=True)
+                    stats.incr("follow.batches")
+                    stats.incr("follow.rows", len(events))
+                if on_batch is not None:
+                    on_batch(events)
+                # Si quedó algo sin leer (lote acotado por READ_CHUNK) se sigue sin esperar
+                if not any(t.has_more() for t in tails):
+                    time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for t in tails:
+            t.close()
+    print(f"[OK] Seguimiento terminado: {out_csv}")
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Salida particionada por tiempo: un CSV por hora o por día dentro de una carpeta.
+
+    <carpeta>/20251104T10.csv       (hora, UTC)   o   20251104.csv (día)
+    <carpeta>/sin_fecha.csv         eventos sin timestamp
+    <carpeta>/manifest.json         rango, filas y filas por entrada de cada partición
+
+Cada partición es un CSV combinado normal (header FIELDNAMES, ordenado por
+(timestamp, device)). Con el manifiesto el reporte abre solo las particiones que
+se cruzan con el rango pedido.
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import csv, json, os, shutil, time
+from .core import FIELDNAMES
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+# Granularidad -> (segundos, formato del nombre)
+GRANULARITIES = {
+    "hour": (3600, "%Y%m%dT%H"),
+    "day": (86400, "%Y%m%d"),
+}
+UNDATED = "sin_fecha"
+
+_EPOCH = FIELDNAMES.index("epoch")
+_TS = FIELDNAMES.index("timestamp")
+_WIDTH = len(FIELDNAMES)
+
+def manifest_path(out_dir) -> Path:
+    return Path(out_dir) / MANIFEST_NAME
+
+def is_partitioned(path) -> bool:
+    return manifest_path(path).is_file()
+
+def load_manifest(out_dir) -> Dict:
+    with open(manifest_path(out_dir), "r", encoding="utf-8") as f:
+        man = json.load(f)
+    if man.get("version") != MANIFEST_VERSION or man.get("fieldnames") != FIELDNAMES:
+        raise ValueError(f"Manifiesto de particiones incompatible: {manifest_path(out_dir)}")
+    return man
+
+class _Partition:
+    __slots__ = ("file", "start", "end", "first", "last", "rows", "sources")
+
+    def __init__(self, file: str, start: Optional[int], end: Optional[int]):
+        self.file = file
+        self.start = start
+        self.end = end
+        self.first = self.last = None
+        self.rows = 0
+        self.sources: Dict[str, int] = {}
+
+    def add(self, epoch: Optional[int], source: str) -> None:
+        self.rows += 1
+        self.sources[source] = self.sources.get(source, 0) + 1
+        if epoch is not None:
+            if self.first is None or epoch < self.first:
+                self.first = epoch
+            if self.last is None or epoch > self.last:
+                self.last = epoch
+
+    def as_dict(self) -> Dict:
+        return {"file": self.file, "start": self.start, "end": self.end,
+                "first": self.first, "last": self.last, "rows": self.rows, "sources": self.sources}
+
+def _epoch(row: List[str]) -> Optional[int]:
+    try:
+        return int(row[_EPOCH])
+    except ValueError:
+        return None
+
+def _write(out_dir: Path, rows: Iterable[List[str]], granularity: str) -> List[_Partition]:
+    """
+    Reparte filas ordenadas (con el nombre de la entrada como columna extra) en
+    particiones. Como vienen ordenadas, cada partición suele ser un tramo contiguo
+    y hay un solo archivo abierto; si una reaparece se reabre en modo append.
+    """
+    seconds, fmt = GRANULARITIES[granularity]
+    parts: Dict[Optional[int], _Partition] = {}
+    cur_key = object()
+    f = w = None
+    try:
+        for row in rows:
+            source = row[_WIDTH] if len(row) > _WIDTH else ""
+            e = _epoch(row)
+            key = None if e is None else e - e % seconds
+            if key != cur_key:
+                if f is not None:
+                    f.close()
+                part = parts.get(key)
+                if part is None:
+                    name = UNDATED if key is None else time.strftime(fmt, time.gmtime(key))
+                    part = parts[key] = _Partition(name + ".csv", key, None if key is None else key + seconds)
+                    f = open(out_dir / part.file, "w", newline="", encoding="utf-8")
+                    w = csv.writer(f)
+                    w.writerow(FIELDNAMES)
+                else:
+                    f = open(out_dir / part.file, "a", newline="", encoding="utf-8")
+                    w = csv.writer(f)
+                cur_key = key
+            w.writerow(row[:_WIDTH])
+            part.add(e, source)
+    finally:
+        if f is not None:
+            f.close()
+    return sorted(parts.values(), key=lambda p: (p.start is not None, p.start or 0))
+
+def write_partitioned(out_dir, rows: Iterable[List[str]], granularity: str = "hour") -> int:
+    """
+    Escribe las particiones y su manifiesto en `out_dir`. Se arma en
+    `<carpeta>.partial` y solo reemplaza a la carpeta anterior si terminó.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Partición desconocida: {granularity} (opciones: {', '.join(GRANULARITIES)})")
+    out_dir = Path(out_dir)
+    if out_dir.exists() and not is_partitioned(out_dir) and any(out_dir.iterdir()):
+        raise ValueError(f"{out_dir} existe y no es una salida particionada; no se reemplaza.")
+    tmp = out_dir.with_name(out_dir.name + ".partial")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    try:
+        parts = _write(tmp, rows, granularity)
+        man = {"version": MANIFEST_VERSION, "fieldnames": FIELDNAMES, "granularity": granularity,
+               "partitions": [p.as_dict() for p in parts]}
+        with open(manifest_path(tmp), "w", encoding="utf-8") as f:
+            json.dump(man, f, indent=1)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    if out_dir.exists():
+        old = out_dir.with_name(out_dir.name + ".old")
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(out_dir, old)
+        os.replace(tmp, out_dir)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(tmp, out_dir)
+    return sum(p.rows for p in parts)
+
+def select_partitions(out_dir, start: Optional[int] = None, end: Optional[int] = None) -> List[Path]:
+    """
+    Archivos de las particiones que se cruzan con [start, end) (epochs UTC), en
+    orden cronológico. Sin rango se devuelven todas; la de eventos sin fecha
+    solo entra cuando no se pide rango.
+    """
+    out_dir = Path(out_dir)
+    ranged = start is not None or end is not None
+    out = []
+    for p in load_manifest(out_dir)["partitions"]:
+        if p["start"] is None:
+            if ranged:
+                continue
+        elif (start is not None and p["end"] <= start) or (end is not None and p["start"] >= end):
+            continue
+        out.append(out_dir / p["file"])
+    return out
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Progreso y cancelación cooperativa para corridas largas.
+
+- El progreso se mide en bytes de entrada consumidos sobre el total (por archivo
+  se informa cuál se está leyendo). Para los comprimidos se cuentan bytes en disco.
+- La cancelación se revisa cada BATCH_ROWS filas: la operación termina con
+  `Cancelled` y no deja salidas a medio escribir.
+- Con workers en paralelo el avance se informa al terminar cada tarea (archivo o
+  rango) y al cancelar se descartan las tareas pendientes; las que ya corren terminan.
+"""
+from pathlib import Path
+from typing import IO, Callable, Dict, Iterable, Iterator, Optional, TypeVar
+import os, threading
+from . import core
+
+# Filas entre dos chequeos de progreso/cancelación
+BATCH_ROWS = 4096
+
+# progress(bytes consumidos, bytes totales, archivo o etapa actual)
+ProgressFn = Callable[[int, int, str], None]
+
+T = TypeVar("T")
+
+class Cancelled(Exception):
+    """La operación se canceló con un CancelToken."""
+
+class CancelToken:
+    """Se comparte entre el hilo que cancela (p. ej. la GUI) y el que trabaja."""
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self) -> None:
+        if self._event.is_set():
+            raise Cancelled("Operación cancelada.")
+
+def _disk_position(f: IO[bytes]) -> int:
+    # gzip expone el archivo crudo como `fileobj`; bz2/lzma como `_fp`
+    raw = getattr(f, "fileobj", None) or getattr(f, "_fp", None) or f
+    return raw.tell()
+
+class Tracker:
+    """
+    Avance agregado de varias fuentes. Se apoya en core.observe_opens para
+    conocer el archivo que abre cada parser y leer su posición entre lotes.
+    """
+    def __init__(self, total: int, progress: Optional[ProgressFn] = None,
+                 cancel: Optional[CancelToken] = None):
+        self.total = max(0, total)
+        self.done = 0
+        self.progress = progress
+        self.cancel = cancel
+        self._opened: Dict[str, IO[bytes]] = {}
+
+    def check(self) -> None:
+        if self.cancel is not None:
+            self.cancel.check()
+
+    def report(self, current: str, done: Optional[int] = None) -> None:
+        if self.progress is not None:
+            self.progress(min(self.done if done is None else done, self.total), self.total, current)
+
+    def advance(self, nbytes: int, current: str) -> None:
+        """Suma un bloque ya terminado (p. ej. el rango de una tarea en un worker)."""
+        self.done += nbytes
+        self.report(current)
+        self.check()
+
+    def _observe(self, path, f: IO[bytes]) -> None:
+        self._opened[str(path)] = f
+
+    def track(self, rows: Iterable[T], path: Path, start: int = 0, end: Optional[int] = None) -> Iterator[T]:
+        """Reenvía las filas de una fuente informando avance y revisando la cancelación por lotes."""
+        size = (end if end is not None else os.path.getsize(path)) - start
+        name = Path(path).name
+        base = self.done
+        self.check()
+        self.report(name)
+        prev = core.observe_opens(self._observe)
+        try:
+            n = 0
+            for row in rows:
+                yield row
+                n += 1
+                if n % BATCH_ROWS == 0:
+                    self.check()
+                    f = self._opened.get(str(path))
+                    if f is not None and not f.closed:
+                        self.report(name, base + min(size, _disk_position(f) - start))
+        finally:
+            core.observe_opens(prev)
+            self._opened.pop(str(path), None)
+        self.done = base + size
+        self.report(name)
+
+    def checked(self, rows: Iterable[T], current: str) -> Iterator[T]:
+        """Solo cancelación (y un aviso de etapa) para fases sin bytes de entrada, como la escritura."""
+        self.report(current)
+        n = 0
+        for row in rows:
+            yield row
+            n += 1
+            if n % BATCH_ROWS == 0:
+                self.check()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Registro de parsers. Cada fuente declara una función `sniff(head, path) -> float`
+que solo ve los primeros SNIFF_BYTES del archivo y devuelve una confianza (0..1).
+Las fuentes nuevas se registran con register_parser() sin tocar router.py.
+"""
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+from .core import NormalizedEvent, open_binary
+
+# Ventana máxima que se lee para detectar el tipo de archivo
+SNIFF_BYTES = 8192
+
+Parser = Callable[..., Iterable[Dict]]
+Sniffer = Callable[[bytes, Path], float]
+LineParser = Callable[[str], Optional[NormalizedEvent]]
+
+class ParserSpec(NamedTuple):
+    name: str
+    parser: Parser
+    sniff: Sniffer
+    label: str
+    line_oriented: bool  # admite rangos de bytes (parser(path, start, end))
+    parse_line: Optional[LineParser] = None  # una línea cruda -> evento (modo --follow)
+
+_REGISTRY: List[ParserSpec] = []
+
+def register_parser(name: str, parser: Parser, sniff: Sniffer,
+                    label: Optional[str] = None, line_oriented: bool = False,
+                    parse_line: Optional[LineParser] = None) -> ParserSpec:
+    """
+    Registra (o reemplaza, por nombre) un parser con su función de sniffing.
+    `parse_line` (opcional) normaliza una sola línea; sin ella la fuente no se puede seguir en vivo.
+    """
+    spec = ParserSpec(name, parser, sniff, label or name, line_oriented, parse_line)
+    for i, s in enumerate(_REGISTRY):
+        if s.name == name:
+            _REGISTRY[i] = spec
+            return spec
+    _REGISTRY.append(spec)
+    return spec
+
+def registered_parsers() -> List[ParserSpec]:
+    return list(_REGISTRY)
+
+def spec_for(parser: Parser) -> Optional[ParserSpec]:
+    for s in _REGISTRY:
+        if s.parser is parser:
+            return s
+    return None
+
+def read_head(path: Path, size: int = SNIFF_BYTES) -> bytes:
+    """Primeros `size` bytes (ya descomprimidos) del archivo, sin BOM."""
+    with open_binary(path) as f:
+        head = f.read(size)
+    return head[3:] if head.startswith(b"\xef\xbb\xbf") else head
+
+def first_line(head: bytes) -> str:
+    return head.split(b"\n", 1)[0].decode("utf-8", errors="ignore").strip()
@@ -1,42 +1,38 @@
 # -*- coding: utf-8 -*-
 from pathlib import Path
 from typing import Callable, Dict, Iterable, Optional
-import json
-from .asa import parse_cisco_txt
-from .splunk import parse_splunk_csv
-from .cisco_secure_endpoint import parse_cisco_secure_endpoint_jsonl
+from .registry import ParserSpec, first_line, read_head, registered_parsers
+from . import stats
+# Importar los módulos registra los parsers incluidos
+from . import asa, splunk, cisco_secure_endpoint  # noqa: F401
 
-def guess_parser(path: Path) -> Optional[Callable[[Path], Iterable[Dict]]]:
-    ext = path.suffix.lower()
-    if ext == ".csv":
-        return parse_splunk_csv
-    if ext in (".log", ".txt"):
-        return parse_cisco_txt
-    if ext in (".jsonl", ".jl", ".json"):
+def sniff(path: Path, timed: bool = True) -> Optional[ParserSpec]:
+    """
+    Elige el parser con mayor confianza leyendo solo la ventana inicial del archivo.
+    Con `timed=False` no suma a la etapa "sniff" (consultas ajenas a la corrida, como la GUI).
+    """
+    if not timed:
+        return _sniff(path)
+    with stats.stage("sniff"):
+        return _sniff(path)
+
+def _sniff(path: Path) -> Optional[ParserSpec]:
+    try:
+        head = read_head(path)
+    except Exception:
+        return None
+    best, best_score = None, 0.0
+    for spec in registered_parsers():
         try:
-            first_line = path.read_text(encoding="utf-8", errors="ignore").splitlines()[0].strip()
-            sample = json.loads(first_line) if first_line.startswith("{") else {}
+            score = spec.sniff(head, path)
         except Exception:
-            sample = {}
-
-        keys_lower = {k.lower() for k in sample.keys()} if isinstance(sample, dict) else set()
-        blob = (json.dumps(sample) if isinstance(sample, dict) else "").lower()
-        amp_hints = any(h in keys_lower for h in ["connector_guid", "computer", "disposition"]) or \
-                    ("secure endpoint" in blob or "amp for endpoints" in blob or "disposition" in blob)
-        if amp_hints:
-            return parse_cisco_secure_endpoint_jsonl
-
+            score = 0.0
+        if score > best_score:
+            best, best_score = spec, score
+    if best is None and first_line(head).startswith("{"):
         print(f"[WARN] {path.name}: JSON/JSONL no reconocido como Cisco Secure Endpoint (AMP). Se omitirá.")
-        return None
+    return best
 
-    # Fallback por contenido
-    try:
-        first = path.read_text(encoding="utf-8", errors="ignore").splitlines()[0].strip()
-        if first.startswith("{"):
-            print(f"[WARN] {path.name}: JSON detectado pero solo se admite Cisco Secure Endpoint (AMP). Se omitirá.")
-            return None
-        if "," in first and "timestamp" in first.lower():
-            return parse_splunk_csv
-        return parse_cisco_txt
-    except Exception:
-        return parse_cisco_txt
+def guess_parser(path: Path) -> Optional[Callable[[Path], Iterable[Dict]]]:
+    spec = sniff(path)
+    return spec.parser if spec else None
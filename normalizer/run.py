@@ -1,12 +1,44 @@
 # -*- coding: utf-8 -*-
-from typing import List
-import csv
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import csv, heapq, os, tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
-from .core import FIELDNAMES
+from .core import FIELDNAMES, NormalizedEvent, detect_compression, open_text, open_text_write, split_ranges
+from .timestamps import iso_to_epoch, set_syslog_year
+from .registry import spec_for
+from .checkpoint import complete_lines_end, file_state, load_manifest, resume_offset, same_file, save_manifest
+from .sqlite_store import is_sqlite_path, write_sqlite
+from .partitions import write_partitioned
 from .router import guess_parser
+from . import stats
+from .progress import CancelToken, ProgressFn, Tracker
 
-def normalize_files(inputs: List[str], out_csv: str):
-    rows = []
+# Máximo de runs abiertos simultáneamente durante el merge k-way
+MAX_FAN_IN = 64
+# Tamaño mínimo de cada rango al partir un archivo grande entre workers
+SPLIT_MIN_BYTES = 32 * 1024 * 1024
+
+_TS = FIELDNAMES.index("timestamp")
+_EPOCH = FIELDNAMES.index("epoch")
+_DEV = FIELDNAMES.index("device")
+
+def _to_row(rec) -> List[str]:
+    if isinstance(rec, NormalizedEvent):
+        row = rec.as_row()
+    else:  # parsers registrados desde afuera que todavía emiten dicts
+        row = [(rec.get(k) if rec.get(k) is not None else "") for k in FIELDNAMES]
+    # Epoch junto al ISO: el reporte no necesita volver a parsear el string
+    if row[_EPOCH] == "" and row[_TS]:
+        e = iso_to_epoch(row[_TS])
+        row[_EPOCH] = "" if e is None else str(e)
+    return row
+
+def _sortkey(row):
+    # Mismo criterio de siempre: (timestamp, device)
+    return (row[_TS] or "", row[_DEV] or "")
+
+def _iter_sources(inputs: List[str]) -> Iterator[Tuple[Path, Callable]]:
+    """(path, parser) por cada entrada válida, en el orden recibido."""
     for p in inputs:
         path = Path(p)
         if not path.exists():
@@ -15,18 +47,485 @@ def normalize_files(inputs: List[str], out_csv: str):
         parser = guess_parser(path)
         if parser is None:
             continue
-        for rec in parser(path):
-            row = {k: (rec.get(k) if rec.get(k) is not None else "") for k in FIELDNAMES}
-            rows.append(row)
+        yield path, parser
+
+# (parser, path, start, end): una entrada o un rango de bytes de ella
+Source = Tuple[Callable, Path, int, Optional[int]]
+
+def _splittable(path: Path, parser: Callable) -> bool:
+    spec = spec_for(parser)
+    return spec is not None and spec.line_oriented and not detect_compression(path)
+
+def _plan_sources(found: List[Tuple[Path, Callable]], bounded: bool = False) -> List[Source]:
+    """
+    Una fuente por entrada. Con `bounded`, las que admiten rangos se acotan a la
+    última línea completa del tamaño actual, para que el checkpoint coincida
+    exactamente con lo leído y una línea a medio escribir no se corte.
+    """
+    return [(parser, path, 0,
+             complete_lines_end(path, os.path.getsize(path)) if bounded and _splittable(path, parser) else None)
+            for path, parser in found]
+
+def _source_rows(parser: Callable, path: Path, start: int = 0, end: Optional[int] = None,
+                 tracker: Optional[Tracker] = None, tag: bool = False) -> Iterator[List[str]]:
+    """Filas de una fuente; con `tag` llevan el nombre de la entrada como columna extra al final."""
+    recs = parser(path, start, end) if (start or end is not None) else parser(path)
+    rows = (_to_row(rec) for rec in recs)
+    if tag:
+        name = path.name
+        rows = (row + [name] for row in rows)
+    st = stats.current()
+    if st is not None:
+        rows = _counted(rows, st, parser, path, start, end)
+    return rows if tracker is None else tracker.track(rows, path, start, end)
+
+def _source_bytes(src: Source) -> int:
+    _, path, start, end = src
+    return (end if end is not None else os.path.getsize(path)) - start
+
+def _tracker(sources: List[Source], progress: Optional[ProgressFn],
+             cancel: Optional[CancelToken]) -> Optional[Tracker]:
+    if progress is None and cancel is None:
+        return None
+    return Tracker(sum(map(_source_bytes, sources)), progress, cancel)
+
+def _counted(rows: Iterator[List[str]], st: stats.Stats, parser: Callable, path: Path,
+             start: int, end: Optional[int]) -> Iterator[List[str]]:
+    """Registros y bytes (en disco) leídos de la fuente, al agotarse el iterador."""
+    n = 0
+    for row in rows:
+        n += 1
+        yield row
+    spec = spec_for(parser)
+    nbytes = (end if end is not None else os.path.getsize(path)) - start
+    st.add_source(path, spec.name if spec else getattr(parser, "__name__", "?"), n, nbytes)
+
+# ----------------- Ordenamiento externo -----------------
+class _RunSpiller:
+    """
+    Vuelca corridas ordenadas a archivos temporales.
+    - Mientras una entrada llega ordenada, sus filas van directo a un único run
+      (sin buffer en memoria).
+    - Desde el primer registro fuera de orden, se acumulan hasta `max_rows` filas,
+      se ordenan (sort estable) y se vuelcan como un run nuevo.
+    Los runs quedan en el orden original de los datos, así que heapq.merge
+    (que desempata por índice de iterable) reproduce el sort estable global.
+    """
+    def __init__(self, tmpdir: str, max_rows: Optional[int]):
+        self.tmpdir = tmpdir
+        self.max_rows = max(1, int(max_rows)) if max_rows else None
+        self.runs: List[str] = []
+
+    def _new_run(self):
+        fd, path = tempfile.mkstemp(prefix="run_", suffix=".csv", dir=self.tmpdir)
+        f = os.fdopen(fd, "w", newline="", encoding="utf-8")
+        return path, f, csv.writer(f)
+
+    def _flush(self, buf: List[List[str]]):
+        if not buf:
+            return
+        buf.sort(key=_sortkey)
+        path, f, w = self._new_run()
+        self.runs.append(path)
+        with f:
+            w.writerows(buf)
+        buf.clear()
+
+    def add_input(self, rows: Iterable[List[str]]) -> int:
+        n = 0
+        buf: List[List[str]] = []
+        f = w = None
+        last = None
+        in_order = True
+        try:
+            for row in rows:
+                n += 1
+                if in_order:
+                    k = _sortkey(row)
+                    if last is None or k >= last:
+                        if w is None:
+                            path, f, w = self._new_run()
+                            self.runs.append(path)
+                        w.writerow(row)
+                        last = k
+                        continue
+                    in_order = False
+                buf.append(row)
+                if self.max_rows and len(buf) >= self.max_rows:
+                    self._flush(buf)
+        finally:
+            if f is not None:
+                f.close()
+        self._flush(buf)
+        return n
+
+    @staticmethod
+    def _merge_paths(paths: List[str]) -> Iterator[List[str]]:
+        files = [open(p, "r", newline="", encoding="utf-8") for p in paths]
+        try:
+            yield from heapq.merge(*(csv.reader(f) for f in files), key=_sortkey)
+        finally:
+            for f in files:
+                f.close()
+
+    def merged(self) -> Iterator[List[str]]:
+        # Merge por pasadas para no abrir más de MAX_FAN_IN archivos a la vez.
+        # Se fusionan grupos de runs consecutivos para conservar la estabilidad.
+        while len(self.runs) > MAX_FAN_IN:
+            nxt: List[str] = []
+            for i in range(0, len(self.runs), MAX_FAN_IN):
+                group = self.runs[i:i + MAX_FAN_IN]
+                path, f, w = self._new_run()
+                with f:
+                    w.writerows(self._merge_paths(group))
+                for p in group:
+                    os.remove(p)
+                nxt.append(path)
+            self.runs = nxt
+        yield from self._merge_paths(self.runs)
+
+# ----------------- Ejecución en paralelo -----------------
+def _split_sources(sources: List[Source], workers: int) -> List[Source]:
+    """Parte las fuentes grandes orientadas a líneas en rangos, uno por tarea."""
+    tasks: List[Source] = []
+    for parser, path, start, end in sources:
+        if start == 0 and _splittable(path, parser):
+            for a, b in split_ranges(path, workers, SPLIT_MIN_BYTES):
+                if end is not None:
+                    if a >= end:
+                        break
+                    b = end if b is None else min(b, end)
+                tasks.append((parser, path, a, b))
+        else:
+            tasks.append((parser, path, start, end))
+    return tasks
+
+def _parse_task(parser: Callable, path: Path, start: int, end: Optional[int],
+                tmpdir: str, max_rows: Optional[int], year: int,
+                with_stats: bool = False, tag: bool = False) -> Tuple[List[str], int, Optional[Dict]]:
+    """
+    Corre en un proceso worker: parsea su rango y lo deja como runs ordenados.
+    Con `with_stats` devuelve además lo medido en el worker.
+    """
+    set_syslog_year(year)
+    if with_stats:
+        stats.enable()
+    try:
+        spiller = _RunSpiller(tmpdir, max_rows)
+        with stats.stage("worker.parse"):
+            n = spiller.add_input(_source_rows(parser, path, start, end, tag=tag))
+    finally:
+        st = stats.disable() if with_stats else None
+    return spiller.runs, n, st.as_dict() if st else None
+
+def _gather(futs: List, tasks: List[Source], tracker: Optional[Tracker]) -> List:
+    """Resultados en el orden de las tareas; con tracker informa avance y atiende la cancelación."""
+    if tracker is not None:
+        task_of = dict(zip(futs, tasks))
+        pending = set(futs)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    fut.result()  # propaga errores del worker
+                    tracker.advance(_source_bytes(task_of[fut]), task_of[fut][1].name)
+                tracker.check()
+        except BaseException:
+            # Las tareas pendientes se descartan; las que ya corren terminan su rango
+            for fut in pending:
+                fut.cancel()
+            raise
+    return [fut.result() for fut in futs]
+
+def _write_rows(out_csv: str, rows: Iterable[List[str]]) -> int:
+    if is_sqlite_path(out_csv):
+        return write_sqlite(out_csv, rows)
+    n = 0
+    with open_text_write(out_csv) as f:
+        w = csv.writer(f)
+        w.writerow(FIELDNAMES)
+        for row in rows:
+            w.writerow(row)
+            n += 1
+    return n
+
+def _write_rows_timed(out_csv: str, rows: Iterable[List[str]]) -> int:
+    # Con ordenamiento externo incluye el merge de los runs, que se consume al escribir
+    with stats.stage("write"):
+        return _write_rows(out_csv, rows)
+
+def _iter_sorted_rows(sources: List[Source], max_rows: Optional[int], workers: int, year: int,
+                      tmp_parent: Optional[str] = None, tracker: Optional[Tracker] = None,
+                      tag: bool = False) -> Iterator[List[str]]:
+    """
+    Filas de todas las fuentes ordenadas por (timestamp, device), con sort estable.
+    Con `tag` cada fila lleva al final el nombre de su entrada (ver _source_rows).
+    """
+    st = stats.current()
+    if workers and workers > 1:
+        with tempfile.TemporaryDirectory(prefix="normalize_", dir=tmp_parent) as tmpdir:
+            spiller = _RunSpiller(tmpdir, max_rows)
+            with stats.stage("parse"), ProcessPoolExecutor(max_workers=workers) as ex:
+                tasks = _split_sources(sources, workers)
+                futs = [ex.submit(_parse_task, *t, tmpdir, max_rows, year, st is not None, tag) for t in tasks]
+                for runs, _, worker_stats in _gather(futs, tasks, tracker):
+                    spiller.runs.extend(runs)
+                    if st is not None and worker_stats:
+                        st.merge(worker_stats)
+            yield from _checked(spiller.merged(), tracker, "ordenando")
+        return
+    if not max_rows:
+        with stats.stage("parse"):
+            rows = [row for src in sources for row in _source_rows(*src, tracker=tracker, tag=tag)]
+        if tracker is not None:
+            tracker.report("ordenando")
+        with stats.stage("sort"):
+            rows.sort(key=_sortkey)
+        yield from _checked(rows, tracker, "escribiendo")
+        return
+    with tempfile.TemporaryDirectory(prefix="normalize_", dir=tmp_parent) as tmpdir:
+        spiller = _RunSpiller(tmpdir, max_rows)
+        # Incluye ordenar y volcar los runs
+        with stats.stage("parse"):
+            for src in sources:
+                spiller.add_input(_source_rows(*src, tracker=tracker, tag=tag))
+        yield from _checked(spiller.merged(), tracker, "ordenando")
+
+def _checked(rows: Iterable[List[str]], tracker: Optional[Tracker], phase: str) -> Iterable[List[str]]:
+    return rows if tracker is None else tracker.checked(rows, phase)
+
+def _normalize_full(sources: List[Source], out_csv: str, max_rows: Optional[int], workers: int, year: int,
+                    tracker: Optional[Tracker] = None) -> int:
+    # Se escribe en <salida>.partial y solo reemplaza a la salida si terminó (también al cancelar)
+    out_dir = os.path.dirname(os.path.abspath(out_csv))
+    tmp_out = out_csv + ".partial" + Path(out_csv).suffix
+    try:
+        n = _write_rows_timed(tmp_out, _iter_sorted_rows(sources, max_rows, workers, year, out_dir, tracker))
+    except BaseException:
+        if os.path.exists(tmp_out):
+            os.remove(tmp_out)
+        raise
+    os.replace(tmp_out, out_csv)
+    return n
+
+# ----------------- Modo incremental -----------------
+def _key(path: Path) -> str:
+    return str(path.resolve())
+
+def _checkpoint_states(sources: List[Source]) -> Dict[str, Dict]:
+    states = {}
+    for parser, path, _, end in sources:
+        st = file_state(path)
+        st["offset"] = end if end is not None else st["size"]
+        st["parser"] = spec_for(parser).name
+        states[_key(path)] = st
+    return states
+
+def _incremental_plan(found: List[Tuple[Path, Callable]],
+                      out_csv: str) -> Optional[Tuple[List[Source], Dict[str, Dict]]]:
+    """
+    Colas nuevas a parsear y checkpoint resultante de una corrida incremental.
+    Devuelve None si hace falta reconstruir todo: no hay manifiesto, se quitó una
+    entrada, o alguna fue truncada/reescrita.
+    """
+    if is_sqlite_path(out_csv) or not os.path.exists(out_csv):
+        return None
+    man = load_manifest(out_csv)
+    if man is None:
+        return None
+    if man.get("unsorted"):
+        print("[INFO] La salida tiene filas agregadas por --follow sin ordenar; se reconstruye la salida completa.")
+        return None
+    prev_inputs = man["inputs"]
+    if set(prev_inputs) - {_key(p) for p, _ in found}:
+        print("[INFO] Cambió la lista de entradas; se reconstruye la salida completa.")
+        return None
+    with open_text(out_csv, newline="") as f:
+        if next(csv.reader(f), None) != FIELDNAMES:
+            return None
+
+    tails: List[Source] = []
+    states: Dict[str, Dict] = {}
+    for path, parser in found:
+        key, spec, st = _key(path), spec_for(parser), file_state(path)
+        prev = prev_inputs.get(key)
+        splittable = _splittable(path, parser)
+        # Hasta la última línea completa: la que se está escribiendo queda para la próxima corrida
+        end = complete_lines_end(path, st["size"]) if splittable else st["size"]
+        if prev is None:
+            tails.append((parser, path, 0, end if splittable else None))
+        elif prev.get("parser") != spec.name or not same_file(prev, path, st):
+            print(f"[INFO] {path.name} fue truncado o reescrito; se reconstruye la salida completa.")
+            return None
+        elif st["size"] > prev["offset"]:
+            if not splittable:
+                print(f"[INFO] {path.name} cambió y no admite lectura parcial; se reconstruye la salida completa.")
+                return None
+            start = resume_offset(path, prev["offset"])
+            if end > start:
+                tails.append((parser, path, start, end))
+            else:
+                end = prev["offset"]  # solo creció la línea incompleta
+        else:
+            end = prev["offset"]
+        st["offset"] = end
+        st["parser"] = spec.name
+        states[key] = st
+    return tails, states
+
+def _iter_incremental_rows(out_csv: str, tails: List[Source], max_rows: Optional[int],
+                           tracker: Optional[Tracker] = None) -> Iterator[List[str]]:
+    """
+    Filas de la salida existente (ya ordenada) fusionadas con las de las colas
+    nuevas. A igual (timestamp, device), las filas existentes quedan antes.
+    """
+    out_dir = os.path.dirname(os.path.abspath(out_csv))
+    with tempfile.TemporaryDirectory(prefix="normalize_", dir=out_dir) as tmpdir:
+        spiller = _RunSpiller(tmpdir, max_rows)
+        with stats.stage("parse"):
+            added = sum(spiller.add_input(_source_rows(*src, tracker=tracker)) for src in tails)
+        print(f"[INFO] Incremental: +{added} filas nuevas.")
+        with open_text(out_csv, newline="") as f:
+            existing = csv.reader(f)
+            next(existing, None)
+            yield from _checked(heapq.merge(existing, spiller.merged(), key=_sortkey), tracker, "escribiendo")
+
+def _normalize_incremental(found: List[Tuple[Path, Callable]], out_csv: str, max_rows: Optional[int],
+                           progress: Optional[ProgressFn] = None, cancel: Optional[CancelToken] = None) -> bool:
+    """
+    Parsea solo la cola nueva de las entradas que crecieron y la fusiona con la
+    salida existente. Devuelve False si hace falta reconstruir todo (ver _incremental_plan).
+    """
+    plan = _incremental_plan(found, out_csv)
+    if plan is None:
+        return False
+    tails, states = plan
+    if not tails:
+        save_manifest(out_csv, states)
+        print(f"[OK] Sin cambios en las entradas; se conserva: {out_csv}")
+        return True
+
+    tmp_out = out_csv + ".partial" + Path(out_csv).suffix
+    try:
+        n = _write_rows_timed(tmp_out, _iter_incremental_rows(out_csv, tails, max_rows,
+                                                              _tracker(tails, progress, cancel)))
+    except BaseException:
+        if os.path.exists(tmp_out):
+            os.remove(tmp_out)
+        raise
+    os.replace(tmp_out, out_csv)
+    save_manifest(out_csv, states)
+    print(f"[OK] Incremental: {n} filas normalizadas en: {out_csv}")
+    return True
+
+def normalize_files(inputs: List[str], out_csv: str, max_rows_in_memory: Optional[int] = None,
+                    workers: int = 1, incremental: bool = False, partition: Optional[str] = None,
+                    progress: Optional[ProgressFn] = None, cancel: Optional[CancelToken] = None):
+    """
+    Normaliza las entradas y escribe un CSV ordenado por (timestamp, device).
+    Si `out_csv` termina en .sqlite/.sqlite3/.db se escribe una base SQLite indexada.
+    Con `max_rows_in_memory` se usa ordenamiento externo: nunca se mantienen más
+    de esas filas en memoria (runs en disco + merge k-way). La salida es idéntica
+    byte a byte a la del modo en memoria.
+    Con `workers` > 1 cada archivo (o rango de un archivo grande) se parsea en un
+    proceso aparte y los runs resultantes se fusionan en el mismo orden.
+    Con `incremental` se guarda un checkpoint por entrada (<salida>.manifest.json)
+    y las corridas siguientes solo parsean lo agregado al final de cada archivo.
+    Con `partition` ('hour' o 'day') `out_csv` es una carpeta: un CSV por hora/día
+    más un manifiesto con el rango, las filas y las filas por entrada de cada uno.
+    `progress(hechos, total, actual)` recibe el avance en bytes de entrada y
+    `cancel` (CancelToken) permite cortar la corrida: termina con Cancelled y la
+    salida anterior, si existía, queda intacta.
+    """
+    if partition and (incremental or is_sqlite_path(out_csv)):
+        raise ValueError("La salida particionada no admite --incremental ni SQLite.")
+    year = set_syslog_year()
+    found = list(_iter_sources(inputs))
+    if partition:
+        sources = _plan_sources(found)
+        rows = _iter_sorted_rows(sources, max_rows_in_memory, workers, year,
+                                 os.path.dirname(os.path.abspath(out_csv)),
+                                 _tracker(sources, progress, cancel), tag=True)
+        with stats.stage("write"):
+            n = write_partitioned(out_csv, rows, partition)
+        print(f"[OK] Escribí {n} filas normalizadas en particiones por {partition}: {out_csv}")
+        return
+    if incremental and _normalize_incremental(found, out_csv, max_rows_in_memory, progress, cancel):
+        return
+
+    sources = _plan_sources(found, bounded=incremental)
+    n = _normalize_full(sources, out_csv, max_rows_in_memory, workers, year,
+                        _tracker(sources, progress, cancel))
+    if incremental and not is_sqlite_path(out_csv):
+        save_manifest(out_csv, _checkpoint_states(sources))
+    print(f"[OK] Escribí {n} filas normalizadas en: {out_csv}")
 
-    def sortkey(r):
-        ts = r.get("timestamp") or ""
-        return (ts, r.get("device") or "")
-    rows.sort(key=sortkey)
+# ----------------- API en streaming -----------------
+def _tee_csv(out_csv: str, rows: Iterable[List[str]], states: Dict[str, Dict]) -> Iterator[List[str]]:
+    """
+    Escribe las filas al CSV combinado a medida que pasan. El archivo se arma en
+    `<salida>.partial` y solo reemplaza a la salida (con el checkpoint `states`)
+    si el iterador se consumió entero.
+    """
+    tmp_out = out_csv + ".partial" + Path(out_csv).suffix
+    n = 0
+    try:
+        with open_text_write(tmp_out) as f:
+            w = csv.writer(f)
+            w.writerow(FIELDNAMES)
+            for row in rows:
+                w.writerow(row)
+                n += 1
+                yield row
+    except BaseException:
+        if os.path.exists(tmp_out):
+            os.remove(tmp_out)
+        raise
+    os.replace(tmp_out, out_csv)
+    save_manifest(out_csv, states)
+    print(f"[OK] Escribí {n} filas normalizadas en: {out_csv}")
 
-    with open(out_csv, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=FIELDNAMES)
-        w.writeheader()
-        w.writerows(rows)
+def _iter_existing(out_csv: str) -> Iterator[List[str]]:
+    with open_text(out_csv, newline="") as f:
+        rows = csv.reader(f)
+        next(rows, None)
+        yield from rows
 
-    print(f"[OK] Escribí {len(rows)} filas normalizadas en: {out_csv}")
+def normalize_iter(inputs: List[str], max_rows_in_memory: Optional[int] = None, workers: int = 1,
+                   tee: Optional[str] = None, progress: Optional[ProgressFn] = None,
+                   cancel: Optional[CancelToken] = None, incremental: bool = False) -> Iterator[NormalizedEvent]:
+    """
+    Como normalize_files pero sin CSV intermedio: genera los eventos ya ordenados
+    por (timestamp, device), listos para report_generator.
+    Con `tee` además se escribe el CSV combinado (y su checkpoint, compatible con
+    el modo incremental) mientras se consume el iterador.
+    Con `incremental` (requiere `tee`) se parsea solo lo agregado desde el último
+    checkpoint y se generan las filas del combinado existente fusionadas con las
+    nuevas: todos los eventos, en una sola pasada y sin releer el CSV resultante.
+    `progress` y `cancel` funcionan como en normalize_files.
+    """
+    if tee and is_sqlite_path(tee):
+        raise ValueError(f"tee solo admite CSV (opcionalmente comprimido): {tee}")
+    if incremental and not tee:
+        raise ValueError("El modo incremental necesita la ruta del CSV combinado (tee).")
+    year = set_syslog_year()
+    found = list(_iter_sources(inputs))
+    plan = _incremental_plan(found, tee) if incremental else None
+    if plan is not None:
+        tails, states = plan
+        if tails:
+            rows = _tee_csv(tee, _iter_incremental_rows(tee, tails, max_rows_in_memory,
+                                                        _tracker(tails, progress, cancel)), states)
+        else:
+            save_manifest(tee, states)
+            print(f"[OK] Sin cambios en las entradas; se conserva: {tee}")
+            rows = _iter_existing(tee)
+    else:
+        sources = _plan_sources(found, bounded=bool(tee))
+        tmp_parent = os.path.dirname(os.path.abspath(tee)) if tee else None
+        rows = _iter_sorted_rows(sources, max_rows_in_memory, workers, year, tmp_parent,
+                                 _tracker(sources, progress, cancel))
+        if tee:
+            rows = _tee_csv(tee, rows, _checkpoint_states(sources))
+    for row in rows:
+        yield NormalizedEvent(*row)
@@ -1,67 +1,98 @@
 # -*- coding: utf-8 -*-
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, List, Optional
 from pathlib import Path
 import csv, re
-from .core import FIELDNAMES, to_iso
+from .core import FIELDNAMES, NormalizedEvent, logical_suffix, open_text, to_iso
+from .registry import first_line, register_parser
+from . import stats
 
-def parse_splunk_csv(path: Path) -> Iterable[Dict[str, Optional[str]]]:
-    SYNONYMS = {
-        "timestamp": ["timestamp", "_time", "time", "date"],
-        "device": ["device", "host", "sourcetype"],
-        "src_ip": ["src_ip", "src", "source", "client_ip", "srcaddr"],
-        "dst_ip": ["dst_ip", "dst", "dest", "destination"],
-        "src_port": ["src_port", "sport", "spt"],
-        "dst_port": ["dst_port", "dport", "dpt"],
-        "protocol": ["protocol", "proto"],
-        "action": ["action", "result", "status"],
-        "username": ["username", "user", "account"],
-        "malware_name": ["malware_name", "threatName", "signature"],
-        "malware_hash": ["malware_hash", "sha256", "md5"],
-        "msg": ["msg", "_raw", "message", "signature"],
-    }
+RE_IPV4 = re.compile(r"\b(\d{1,3}(?:\.\d{1,3}){3})\b")
+# Solo se busca una IP dentro de los primeros caracteres del mensaje
+MAX_SCAN_LEN = 4096
 
-    def find_variant(row_keys_set, variants):
-        for v in variants:
-            if v in row_keys_set:
-                return v
-        return None
+def _first_ipv4(text: str) -> Optional[str]:
+    m = RE_IPV4.search(text, 0, MAX_SCAN_LEN)
+    return m.group(1) if m else None
+
+SYNONYMS = {
+    "timestamp": ["timestamp", "_time", "time", "date"],
+    "device": ["device", "host", "sourcetype"],
+    "src_ip": ["src_ip", "src", "source", "client_ip", "srcaddr"],
+    "dst_ip": ["dst_ip", "dst", "dest", "destination"],
+    "src_port": ["src_port", "sport", "spt"],
+    "dst_port": ["dst_port", "dport", "dpt"],
+    "protocol": ["protocol", "proto"],
+    "action": ["action", "result", "status"],
+    "username": ["username", "user", "account"],
+    "malware_name": ["malware_name", "threatName", "signature"],
+    "malware_hash": ["malware_hash", "sha256", "md5"],
+    "msg": ["msg", "_raw", "message", "signature"],
+}
 
-    with path.open("r", encoding="utf-8", newline="") as f:
-        dr = csv.DictReader(f)
-        original_keys = dr.fieldnames or []
-        header_map = {k: (k.lower().strip() if isinstance(k, str) else k) for k in original_keys}
-        normalized_keys_set = {header_map[k] for k in original_keys if isinstance(k, str)}
+# Campos que se copian tal cual (vacío -> None)
+PROJECTED = ("device", "src_ip", "dst_ip", "src_port", "dst_port", "protocol", "action",
+             "username", "malware_name", "malware_hash", "msg")
+
+def _projection_plan(header: List[str]) -> Dict[str, int]:
+    """
+    Resuelve una sola vez, a partir del header, qué columna alimenta cada campo
+    canónico (primer sinónimo presente; con nombres repetidos gana la última columna).
+    """
+    index = {}
+    for i, k in enumerate(header):
+        index[k.lower().strip()] = i
+    plan = {}
+    for canon, variants in SYNONYMS.items():
+        for v in variants:
+            i = index.get(v.lower())
+            if i is not None:
+                plan[canon] = i
+                break
+    return plan
 
-        variant_map = {}
-        for canon, variants in SYNONYMS.items():
-            found = find_variant(normalized_keys_set, [v.lower() for v in variants])
-            variant_map[canon] = found
+_TS = FIELDNAMES.index("timestamp")
+_SRC = FIELDNAMES.index("src_ip")
+_MSG = FIELDNAMES.index("msg")
 
-        for raw_row in dr:
-            row = {}
-            for orig_k, val in raw_row.items():
-                if orig_k is None:
-                    continue
-                nk = orig_k.lower().strip()
-                row[nk] = val
+def parse_splunk_csv(path: Path) -> Iterable[NormalizedEvent]:
+    with open_text(path, newline="") as f:
+        rd = csv.reader(f)
+        header = next(rd, None)
+        if header is None:
+            return
+        plan = _projection_plan(header)
+        ts_i = plan.get("timestamp")
+        # (posición en FIELDNAMES, columna del CSV)
+        cols = [(FIELDNAMES.index(fld), plan[fld]) for fld in PROJECTED if fld in plan]
+        width = len(FIELDNAMES)
 
-            out = {k: None for k in FIELDNAMES}
-            ts_key = variant_map.get("timestamp")
-            if ts_key and row.get(ts_key):
-                out["timestamp"] = to_iso(row.get(ts_key))
+        for r in rd:
+            if not r:
+                continue  # líneas en blanco (igual que DictReader)
+            n = len(r)
+            vals = [None] * width
+            if ts_i is not None and ts_i < n and r[ts_i]:
+                vals[_TS] = to_iso(r[ts_i])
+            for fi, ci in cols:
+                if ci < n:
+                    vals[fi] = r[ci] or None
 
-            dk = variant_map.get("device")
-            if dk:
-                out["device"] = row.get(dk) or None
+            if not vals[_SRC]:
+                vals[_SRC] = _first_ipv4(vals[_MSG] or "")
+                stats.incr("splunk.src_from_msg" if vals[_SRC] else "splunk.src_missing")
 
-            for fld in ("src_ip","dst_ip","src_port","dst_port","protocol","action","username","malware_name","malware_hash","msg"):
-                vk = variant_map.get(fld)
-                if vk:
-                    out[fld] = row.get(vk) or None
+            yield NormalizedEvent(*vals)
 
-            if not out["src_ip"]:
-                m = re.search(r"\b(\d{1,3}(?:\.\d{1,3}){3})\b", (out.get("msg") or ""))
-                if m:
-                    out["src_ip"] = m.group(1)
+def sniff_splunk_csv(head: bytes, path: Path) -> float:
+    first = first_line(head).lower()
+    if not first or first.startswith("{"):
+        return 0.0
+    if "," in first:
+        cols = {c.strip().strip('"') for c in first.split(",")}
+        if "_time" in cols or "_raw" in cols:
+            return 0.95
+        if "timestamp" in first:
+            return 0.7
+    return 0.8 if logical_suffix(path) == ".csv" else 0.0
 
-            yield out
+register_parser("splunk", parse_splunk_csv, sniff_splunk_csv, label="Splunk")
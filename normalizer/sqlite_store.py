@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Almacén SQLite indexado como alternativa al CSV combinado.
+
+Las filas se insertan en el mismo orden que el CSV (rowid = posición), en lotes
+dentro de transacciones; los índices se crean al final de la carga.
+"""
+from pathlib import Path
+from typing import Iterable, List
+import sqlite3
+from .core import FIELDNAMES
+
+SQLITE_SUFFIXES = {".sqlite", ".sqlite3", ".db"}
+SQLITE_MAGIC = b"SQLite format 3\x00"
+TABLE = "events"
+INDEXED = ("timestamp", "src_ip", "dst_ip", "device", "malware_hash")
+# Filas por transacción durante la carga
+BATCH_ROWS = 10000
+
+def is_sqlite_path(path) -> bool:
+    """Decide por extensión (para salidas que todavía no existen)."""
+    return Path(path).suffix.lower() in SQLITE_SUFFIXES
+
+def is_sqlite_file(path) -> bool:
+    """Decide por magic bytes (para entradas existentes)."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(SQLITE_MAGIC)) == SQLITE_MAGIC
+    except OSError:
+        return False
+
+def _create_schema(con: sqlite3.Connection):
+    cols = ", ".join(f"{k} INTEGER" if k == "epoch" else f"{k} TEXT" for k in FIELDNAMES)
+    con.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    con.execute(f"CREATE TABLE {TABLE} ({cols})")
+
+def _create_indexes(con: sqlite3.Connection):
+    for col in INDEXED:
+        con.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_{col} ON {TABLE}({col})")
+
+def write_sqlite(db_path: str, rows: Iterable[List[str]], batch_rows: int = BATCH_ROWS) -> int:
+    """Reemplaza la tabla `events` de db_path con `rows` (listas en orden FIELDNAMES)."""
+    epoch_i = FIELDNAMES.index("epoch")
+    placeholders = ", ".join("?" for _ in FIELDNAMES)
+    sql = f"INSERT INTO {TABLE} ({', '.join(FIELDNAMES)}) VALUES ({placeholders})"
+
+    con = sqlite3.connect(db_path)
+    try:
+        con.execute("PRAGMA journal_mode=OFF")
+        con.execute("PRAGMA synchronous=OFF")
+        with con:
+            _create_schema(con)
+        n = 0
+        buf: List[List] = []
+        for row in rows:
+            row = list(row)
+            row[epoch_i] = int(row[epoch_i]) if row[epoch_i] not in ("", None) else None
+            buf.append(row)
+            if len(buf) >= batch_rows:
+                with con:
+                    con.executemany(sql, buf)
+                n += len(buf)
+                buf.clear()
+        if buf:
+            with con:
+                con.executemany(sql, buf)
+            n += len(buf)
+        with con:
+            _create_indexes(con)
+        return n
+    finally:
+        con.close()
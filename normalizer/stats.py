@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentación opcional del pipeline.
+
+Registra tiempo de pared y de CPU por etapa (sniff, parse, sort, write, summarize,
+render …), registros y bytes por fuente y contadores sueltos (aciertos/fallos por
+patrón ASA, errores de parseo …).
+
+Está apagada por defecto: cada punto de medición consulta una global y usa un
+contexto nulo, y los contadores de la ruta caliente (patrones ASA) se activan
+reemplazando los handlers por versiones que cuentan, así que sin estadísticas no
+se agrega ningún chequeo por línea.
+
+Las actualizaciones de un Stats van bajo un lock: también miden hilos que no son
+el de la corrida (p. ej. el escaneo de archivos de la GUI).
+"""
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import json, threading, time
+
+class Stats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self.counters: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        w0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - w0, time.process_time() - c0)
+
+    def add_stage(self, name: str, wall: float, cpu: float, calls: int = 1) -> None:
+        with self._lock:
+            s = self.stages.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0})
+            s["wall_s"] += wall
+            s["cpu_s"] += cpu
+            s["calls"] += calls
+
+    def add_source(self, path, parser: str, records: int, nbytes: int) -> None:
+        with self._lock:
+            s = self.sources.setdefault(str(path), {"parser": parser, "records": 0, "bytes": 0})
+            s["records"] += records
+            s["bytes"] += nbytes
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def merge(self, other: Dict) -> None:
+        """Suma lo medido en otro proceso (as_dict() de un worker)."""
+        for name, s in other.get("stages", {}).items():
+            self.add_stage(name, s["wall_s"], s["cpu_s"], s["calls"])
+        for path, s in other.get("sources", {}).items():
+            self.add_source(path, s["parser"], s["records"], s["bytes"])
+        with self._lock:
+            self.counters.update(other.get("counters", {}))
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "wall_s": round(time.perf_counter() - self.started, 4),
+                "stages": {k: {"wall_s": round(s["wall_s"], 4), "cpu_s": round(s["cpu_s"], 4), "calls": s["calls"]}
+                           for k, s in self.stages.items()},
+                "sources": {k: dict(s) for k, s in self.sources.items()},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def save(self, path) -> None:
+        Path(path).write_text(json.dumps(self.as_dict(), indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    def summary_lines(self) -> List[str]:
+        """Resumen legible (para la consola o el log de la GUI)."""
+        d = self.as_dict()
+        lines = [f"Estadísticas ({d['wall_s']:.2f} s en total)"]
+        for name, s in d["stages"].items():
+            lines.append(f"  {name:<22} {s['wall_s']:8.3f} s pared  {s['cpu_s']:8.3f} s CPU  ({s['calls']}x)")
+        for path, s in d["sources"].items():
+            lines.append(f"  {Path(path).name} [{s['parser']}]: {s['records']} registros, {s['bytes'] / 2 ** 20:.1f} MiB")
+        for name, n in d["counters"].items():
+            lines.append(f"  {name}: {n}")
+        return lines
+
+# ----------------- Estado global -----------------
+_current: Optional[Stats] = None
+_hooks: List[Callable[[Optional[Stats]], None]] = []
+_NULL = nullcontext()
+
+def _notify() -> None:
+    for hook in _hooks:
+        hook(_current)
+
+def enable() -> Stats:
+    """Empieza una medición nueva (reemplaza la anterior, si había)."""
+    global _current
+    _current = Stats()
+    _notify()
+    return _current
+
+def disable() -> Optional[Stats]:
+    """Termina la medición y devuelve lo registrado."""
+    global _current
+    st, _current = _current, None
+    _notify()
+    return st
+
+def finish(path) -> Optional[Stats]:
+    """Desactiva, guarda el JSON en `path` y muestra el resumen (para los CLIs)."""
+    st = disable()
+    if st is not None:
+        st.save(path)
+        print("\n".join(st.summary_lines()))
+        print(f"[OK] Estadísticas en: {path}")
+    return st
+
+def current() -> Optional[Stats]:
+    return _current
+
+def on_toggle(hook: Callable[[Optional[Stats]], None]) -> None:
+    """`hook(stats | None)` se llama cada vez que se activan o desactivan las estadísticas."""
+    _hooks.append(hook)
+    hook(_current)
+
+def stage(name: str):
+    """Contexto que mide una etapa; sin estadísticas activas no hace nada."""
+    return _current.stage(name) if _current is not None else _NULL
+
+def incr(name: str, n: int = 1) -> None:
+    st = _current
+    if st is not None:
+        st.incr(name, n)
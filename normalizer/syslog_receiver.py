@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Receptor syslog local (asyncio, UDP y/o TCP) para Cisco ASA.
+
+- Cada mensaje pasa por `parse_cisco_line`, igual que una línea de un .txt
+  exportado (se quita el `<PRI>` y se normaliza con normalize_asa_line).
+- El event loop solo recibe y encola; el parseo y la escritura corren en un hilo
+  aparte, por lotes de hasta `batch_lines` mensajes.
+- La cola está acotada. Con TCP, si se llena se deja de leer del socket (el
+  emisor frena por control de flujo). UDP no admite contrapresión: el socket
+  pide un buffer grande al kernel y, si aun así la cola se llena, el mensaje se
+  cuenta en `dropped` en lugar de bloquear la recepción.
+- La salida rota: `<prefijo>_<inicio>_<nnnn>.csv` con hasta `rotate_rows` filas.
+  Cada archivo tiene el header de FIELDNAMES y sirve directo para el reporte.
+- TCP acepta framing por salto de línea y por conteo de octetos (RFC 6587).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+import asyncio, csv, socket
+from .asa import parse_cisco_line
+from .core import FIELDNAMES
+from .progress import CancelToken
+from .run import _to_row
+from . import stats
+
+# Mensajes por lote de parseo/escritura
+BATCH_LINES = 2048
+# Mensajes en cola como máximo (entre la recepción y el parseo)
+QUEUE_LINES = 200_000
+# Filas por archivo de salida antes de rotar
+ROTATE_ROWS = 500_000
+# Buffer de recepción pedido para el socket UDP (absorbe ráfagas)
+UDP_RCVBUF = 16 * 1024 * 1024
+# Largo máximo de un mensaje
+MAX_MESSAGE = 64 * 1024
+# Dígitos como máximo en el largo de un frame con conteo de octetos
+MAX_FRAME_DIGITS = 10
+# Datagramas leídos por aviso del loop antes de cederle el turno a otras tareas
+UDP_DRAIN_MAX = 4096
+
+class _RotatingCsv:
+    """CSV normalizado que pasa a un archivo nuevo cada `rotate_rows` filas."""
+    def __init__(self, out_dir: Path, prefix: str, rotate_rows: int):
+        self.out_dir = out_dir
+        self.prefix = prefix
+        self.rotate_rows = max(1, rotate_rows)
+        self.started = datetime.now().strftime("%Y%m%dT%H%M%S")
+        self.seq = 0
+        self.rows = 0
+        self.f = self.w = None
+        self.paths: List[Path] = []
+
+    def _open(self) -> None:
+        self.seq += 1
+        path = self.out_dir / f"{self.prefix}_{self.started}_{self.seq:04d}.csv"
+        self.f = open(path, "w", newline="", encoding="utf-8")
+        self.w = csv.writer(self.f)
+        self.w.writerow(FIELDNAMES)
+        self.rows = 0
+        self.paths.append(path)
+
+    def write(self, rows: List[List[str]]) -> None:
+        while rows:
+            if self.f is None or self.rows >= self.rotate_rows:
+                self.close()
+                self._open()
+            take = rows[:self.rotate_rows - self.rows]
+            rows = rows[len(take):]
+            self.w.writerows(take)
+            self.rows += len(take)
+        if self.f is not None:
+            self.f.flush()
+
+    def close(self) -> None:
+        if self.f is not None:
+            self.f.close()
+            print(f"[OK] {self.rows} filas normalizadas en: {self.paths[-1]}")
+            self.f = self.w = None
+
+class SyslogReceiver:
+    """
+    Escucha syslog en `host` y escribe eventos ASA normalizados en `out_dir`.
+    Con puerto 0 se usa uno libre (queda en `udp_port` / `tcp_port` tras start()).
+    """
+    def __init__(self, out_dir, host: str = "127.0.0.1", udp_port: Optional[int] = 5514,
+                 tcp_port: Optional[int] = None, prefix: str = "asa", batch_lines: int = BATCH_LINES,
+                 queue_lines: int = QUEUE_LINES, rotate_rows: int = ROTATE_ROWS):
+        self.out_dir = Path(out_dir)
+        self.host = host
+        self.udp_port = udp_port
+        self.tcp_port = tcp_port
+        self.batch_lines = max(1, batch_lines)
+        self.queue_lines = queue_lines
+        self.received = 0
+        self.dropped = 0
+        self.written = 0
+        self._out = _RotatingCsv(self.out_dir, prefix, rotate_rows)
+        # Un solo hilo: los lotes se escriben en el orden en que llegaron
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="syslog-writer")
+        self._queue: Optional[asyncio.Queue] = None
+        self._udp = None
+        self._tcp = None
+        self._consumer = None
+
+    # ----------------- Recepción -----------------
+    def _on_udp_readable(self) -> None:
+        """
+        Vacía el socket UDP en cada aviso del loop (no un callback por datagrama)
+        y encola sin bloquear; con la cola llena el mensaje se descarta y se cuenta.
+        """
+        sock, q = self._udp, self._queue
+        for _ in range(UDP_DRAIN_MAX):
+            try:
+                data = sock.recv(MAX_MESSAGE)
+            except OSError:  # BlockingIOError: no queda nada por leer
+                return
+            # Un datagrama suele traer un mensaje; algunos relays juntan varios por línea
+            for line in data.splitlines():
+                if not line:
+                    continue
+                self.received += 1
+                try:
+                    q.put_nowait(line)
+                except asyncio.QueueFull:
+                    self.dropped += 1
+
+    async def _handle_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                # Conteo de octetos ("<largo> <mensaje>") solo si el prefijo son
+                # dígitos seguidos de un espacio; si no (p. ej. un timestamp ISO
+                # "2025-11-04T..."), es una línea común terminada en salto de línea.
+                head = await reader.read(1)
+                if not head:
+                    break
+                while head[-1:].isdigit() and len(head) <= MAX_FRAME_DIGITS:
+                    c = await reader.read(1)
+                    if not c:
+                        break
+                    head += c
+                if len(head) > 1 and head.endswith(b" ") and head[:-1].isdigit():
+                    n = int(head[:-1])
+                    line = await reader.readexactly(min(n, MAX_MESSAGE))
+                    # Lo que excede MAX_MESSAGE se descarta para no perder el framing
+                    rest = n - len(line)
+                    while rest > 0:
+                        rest -= len(await reader.readexactly(min(rest, MAX_MESSAGE)))
+                elif head.endswith(b"\n") or reader.at_eof():
+                    line = head
+                else:
+                    line = head + await reader.readline()
+                line = line.rstrip(b"\r\n")
+                if line:
+                    self.received += 1
+                    # Cola llena: se espera, y mientras tanto no se lee del socket
+                    await self._queue.put(line)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    # ----------------- Parseo y escritura -----------------
+    def _write_batch(self, lines: List[bytes]) -> int:
+        rows = []
+        for raw in lines:
+            ev = parse_cisco_line(raw.decode("utf-8", errors="ignore"))
+            if ev is not None:
+                rows.append(_to_row(ev))
+        self._out.write(rows)
+        return len(rows)
+
+    async def _consume(self) -> None:
+        loop = asyncio.get_running_loop()
+        q = self._queue
+        while True:
+            batch = [await q.get()]
+            while len(batch) < self.batch_lines and not q.empty():
+                batch.append(q.get_nowait())
+            n = await loop.run_in_executor(self._pool, self._write_batch, batch)
+            self.written += n
+            stats.incr("syslog.batches")
+            for _ in batch:
+                q.task_done()
+
+    # ----------------- Ciclo de vida -----------------
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._queue = asyncio.Queue(maxsize=self.queue_lines)
+        self._consumer = asyncio.create_task(self._consume())
+        if self.udp_port is not None:
+            sock = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RCVBUF)
+            except OSError:
+                pass
+            sock.bind((self.host, self.udp_port))
+            sock.setblocking(False)
+            self._udp = sock
+            loop.add_reader(sock.fileno(), self._on_udp_readable)
+            self.udp_port = sock.getsockname()[1]
+            print(f"[OK] Escuchando syslog UDP en {self.host}:{self.udp_port}")
+        if self.tcp_port is not None:
+            self._tcp = await asyncio.start_server(self._handle_tcp, self.host, self.tcp_port, limit=MAX_MESSAGE)
+            self.tcp_port = self._tcp.sockets[0].getsockname()[1]
+            print(f"[OK] Escuchando syslog TCP en {self.host}:{self.tcp_port}")
+
+    async def stop(self) -> None:
+        """Deja de escuchar, procesa lo que quedó en cola y cierra la salida."""
+        if self._udp is not None:
+            asyncio.get_running_loop().remove_reader(self._udp.fileno())
+            self._on_udp_readable()  # lo que quedó en el buffer del kernel
+            self._udp.close()
+        if self._tcp is not None:
+            self._tcp.close()
+            await self._tcp.wait_closed()
+        # Si el consumidor murió la cola nunca se vacía: se espera lo que pase primero
+        join = asyncio.ensure_future(self._queue.join())
+        await asyncio.wait({join, self._consumer}, return_when=asyncio.FIRST_COMPLETED)
+        join.cancel()
+        self._consumer.cancel()
+        err = (await asyncio.gather(self._consumer, return_exceptions=True))[0]
+        if isinstance(err, Exception):
+            print(f"[ERROR] El parseo de syslog se detuvo: {err!r}; "
+                  f"quedaron {self._queue.qsize()} mensajes sin escribir.")
+        await asyncio.get_running_loop().run_in_executor(self._pool, self._out.close)
+        self._pool.shutdown()
+        stats.incr("syslog.received", self.received)
+        stats.incr("syslog.dropped", self.dropped)
+        stats.incr("syslog.rows", self.written)
+        if self.dropped:
+            print(f"[WARN] Se descartaron {self.dropped} mensajes UDP con la cola llena.")
+        print(f"[OK] Recibidos {self.received} mensajes; {self.written} filas normalizadas.")
+
+    async def serve(self, cancel: Optional[CancelToken] = None, poll: float = 0.2) -> None:
+        """start(), espera hasta que se cancele (o Ctrl+C) y stop()."""
+        await self.start()
+        try:
+            while cancel is None or not cancel.cancelled:
+                await asyncio.sleep(poll)
+        finally:
+            await self.stop()
+
+def serve(out_dir, host: str = "127.0.0.1", udp_port: Optional[int] = 5514, tcp_port: Optional[int] = None,
+          cancel: Optional[CancelToken] = None, **kw) -> SyslogReceiver:
+    """Corre un SyslogReceiver hasta `cancel` o Ctrl+C y devuelve el receptor (con sus contadores)."""
+    rx = SyslogReceiver(out_dir, host, udp_port, tcp_port, **kw)
+    try:
+        asyncio.run(rx.serve(cancel))
+    except KeyboardInterrupt:
+        pass
+    return rx
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de timestamps compartido por normalizer y report_generator.
+
+- Los layouts fijos conocidos se parsean por slicing (sin strptime).
+- Los resultados se memoizan: en logs reales el mismo segundo se repite mucho.
+- El año de syslog (que no viene en la línea) se fija una sola vez por corrida.
+"""
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional, Tuple
+import calendar, re
+
+MONTHS = {m: i for i, m in enumerate(
+    ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"], start=1
+)}
+
+# Tamaño de las caches de memoización (valores distintos con resolución de segundos)
+CACHE_SIZE = 1 << 16
+
+RE_SYSLOG_PREFIX = re.compile(
+    r"^(?P<mon>[A-Z][a-z]{2})\s+(?P<day>\d{1,2})\s+(?P<time>\d{2}:\d{2}:\d{2})\s+(?P<host>\S+)\s+(?P<msg>.+)$"
+)
+
+# ----------------- Año de syslog -----------------
+_syslog_year: Optional[int] = None
+
+def set_syslog_year(year: Optional[int] = None) -> int:
+    """Fija el año usado para timestamps syslog (por defecto, el actual)."""
+    global _syslog_year
+    _syslog_year = year if year is not None else datetime.now().year
+    _syslog_stamp_to_iso.cache_clear()
+    return _syslog_year
+
+def syslog_year() -> int:
+    return _syslog_year if _syslog_year is not None else set_syslog_year()
+
+# ----------------- Helpers de slicing -----------------
+def _digits(s: str) -> bool:
+    return s.isascii() and s.isdigit()
+
+def _valid_hms(h: int, mi: int, s: int) -> bool:
+    return h < 24 and mi < 60 and s < 60
+
+def _valid_date(y: int, mo: int, d: int) -> bool:
+    return 1 <= mo <= 12 and 1 <= d <= calendar.monthrange(y, mo)[1] and y >= 1
+
+def _split_iso19(s: str) -> Optional[Tuple[int, int, int, int, int, int]]:
+    """'YYYY-MM-DD?HH:MM:SS' (? = 'T' o ' ') -> tupla validada, o None si no encaja."""
+    if (len(s) < 19 or s[4] != "-" or s[7] != "-" or s[10] not in "T "
+            or s[13] != ":" or s[16] != ":"):
+        return None
+    y, mo, d, h, mi, se = s[0:4], s[5:7], s[8:10], s[11:13], s[14:16], s[17:19]
+    if not (_digits(y) and _digits(mo) and _digits(d) and _digits(h) and _digits(mi) and _digits(se)):
+        return None
+    t = (int(y), int(mo), int(d), int(h), int(mi), int(se))
+    if not (_valid_date(t[0], t[1], t[2]) and _valid_hms(t[3], t[4], t[5])):
+        return None
+    return t
+
+def _fmt(t: Tuple[int, int, int, int, int, int]) -> str:
+    return "%04d-%02d-%02dT%02d:%02d:%02d" % t
+
+# ----------------- Normalización a ISO -----------------
+@lru_cache(maxsize=CACHE_SIZE)
+def _to_iso_cached(ts: str) -> Optional[str]:
+    # Rápido: 'YYYY-MM-DD[T ]HH:MM:SS' con 'Z' opcional
+    if len(ts) == 19 or (len(ts) == 20 and ts[19] == "Z"):
+        t = _split_iso19(ts)
+        if t is not None:
+            return _fmt(t) + ("+00:00" if len(ts) == 20 else "")
+    try:
+        return datetime.fromisoformat(ts.replace("Z", "+00:00")).replace(microsecond=0).isoformat()
+    except Exception:
+        pass
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y/%m/%d %H:%M:%S"):
+        try:
+            return datetime.strptime(ts, fmt).isoformat()
+        except Exception:
+            continue
+    return None
+
+def to_iso(ts: str) -> Optional[str]:
+    if not ts:
+        return None
+    return _to_iso_cached(ts.strip())
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _syslog_stamp_to_iso(mon: str, day: int, hms: str) -> Optional[str]:
+    mon_n = MONTHS.get(mon)
+    if not mon_n:
+        return None
+    h, mi, s = int(hms[0:2]), int(hms[3:5]), int(hms[6:8])
+    y = syslog_year()
+    if not (_valid_date(y, mon_n, day) and _valid_hms(h, mi, s)):
+        return None
+    return _fmt((y, mon_n, day, h, mi, s))
+
+def parse_syslog_prefix(line: str) -> Tuple[Optional[str], Optional[str], str]:
+    """
+    Extrae 'Mon DD HH:MM:SS host ' al inicio si está presente.
+    Retorna (iso_ts, host, msg_sin_prefijo)
+    """
+    line = line.strip()
+    # Rápido: 'Mmm DD HH:MM:SS ' en posiciones fijas (día con cero o espacio)
+    if (len(line) > 16 and line[3] == " " and line[6] == " " and line[9] == ":"
+            and line[12] == ":" and line[15] == " "):
+        mon, day, hms = line[0:3], line[4:6].lstrip(), line[7:15]
+        if (mon.isascii() and mon[0].isupper() and mon[1:].islower() and _digits(day)
+                and _digits(hms[0:2]) and _digits(hms[3:5]) and _digits(hms[6:8])):
+            parts = line[16:].split(None, 1)
+            if len(parts) == 2:
+                host, msg = parts
+                return _syslog_stamp_to_iso(mon, int(day), hms), host, msg
+
+    m = RE_SYSLOG_PREFIX.match(line)
+    if not m:
+        return None, None, line
+    return (_syslog_stamp_to_iso(m.group("mon"), int(m.group("day")), m.group("time")),
+            m.group("host"), m.group("msg"))
+
+# ----------------- Epoch (segundos UTC) -----------------
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_iso_utc(s: str) -> Optional[datetime]:
+    """ISO ('T' o espacio, con offset/Z opcional) -> datetime NAIVE en UTC."""
+    s = s.strip().replace("Z", "+00:00")
+    t = _split_iso19(s)
+    if t is not None and (len(s) == 19 or s[19:] == "+00:00"):
+        return datetime(*t)
+    for fmt in ("%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"):
+        try:
+            dt = datetime.strptime(s, fmt)
+            if dt.tzinfo is not None:
+                dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+            return dt
+        except Exception:
+            continue
+    return None
+
+@lru_cache(maxsize=CACHE_SIZE)
+def iso_to_epoch(s: str) -> Optional[int]:
+    """Segundos desde 1970 (UTC); los timestamps sin zona se asumen UTC."""
+    if not s:
+        return None
+    dt = parse_iso_utc(s)
+    return calendar.timegm(dt.timetuple()) if dt else None
+
+def epoch_to_iso_z(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S") + "Z"
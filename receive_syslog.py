@@ -0,0 +1,37 @@
+# python receive_syslog.py --out-dir live --udp 5514 --tcp 5514
+
+from normalizer.syslog_receiver import BATCH_LINES, QUEUE_LINES, ROTATE_ROWS, serve
+from normalizer import stats
+import argparse
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Receptor syslog (UDP/TCP) para Cisco ASA -> CSV normalizados con rotación"
+    )
+    ap.add_argument("--out-dir", dest="out_dir", required=True, help="Carpeta donde se escriben los CSV normalizados")
+    ap.add_argument("--host", default="127.0.0.1", help="Dirección donde escuchar (0.0.0.0 para aceptar firewalls de la red)")
+    ap.add_argument("--udp", dest="udp_port", type=int, default=5514, help="Puerto UDP (0 = uno libre)")
+    ap.add_argument("--tcp", dest="tcp_port", type=int, default=None, help="Puerto TCP (opcional)")
+    ap.add_argument("--no-udp", dest="no_udp", action="store_true", help="No escuchar por UDP")
+    ap.add_argument("--prefix", default="asa", help="Prefijo de los archivos de salida")
+    ap.add_argument("--rotate-rows", dest="rotate_rows", type=int, default=ROTATE_ROWS,
+                    help="Filas por archivo antes de pasar al siguiente")
+    ap.add_argument("--batch-lines", dest="batch_lines", type=int, default=BATCH_LINES,
+                    help="Mensajes por lote de parseo y escritura")
+    ap.add_argument("--queue-lines", dest="queue_lines", type=int, default=QUEUE_LINES,
+                    help="Mensajes en cola como máximo entre la recepción y el parseo")
+    ap.add_argument("--stats", dest="stats", default=None,
+                    help="Guarda tiempos por etapa y contadores en este JSON (p. ej. stats.json)")
+    args = ap.parse_args()
+    if args.no_udp and args.tcp_port is None:
+        ap.error("--no-udp requiere --tcp")
+    if args.stats:
+        stats.enable()
+    serve(args.out_dir, args.host, None if args.no_udp else args.udp_port, args.tcp_port,
+          prefix=args.prefix, rotate_rows=args.rotate_rows, batch_lines=args.batch_lines,
+          queue_lines=args.queue_lines)
+    if args.stats:
+        stats.finish(args.stats)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
-from .run import generate_report
-__all__ = ["generate_report"]
+from .run import build_report, generate_report, generate_report_from_events
+from .batch import generate_batch
+__all__ = ["build_report", "generate_batch", "generate_report", "generate_report_from_events"]
 
 # python -m report_generator.generate_report --in ".\LockBit Case\lockbit_combined.csv" --out ".\LockBit Case\Reporte_Borrador.docx"
-
+# python -m report_generator.generate_batch --in ".\LockBit Case\lockbit_combined.csv" --out-dir ".\LockBit Case\reportes" --by device --manifest overrides.json
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Varios borradores desde un mismo combinado, uno por grupo de eventos.
+
+- El combinado (CSV o .sqlite) se recorre una sola vez; cada grupo tiene su
+  propio SummaryAggregator.
+- Claves de agrupación: device, src_ip o ventanas fijas de tiempo (epoch
+  alineado a múltiplos de la ventana, en UTC).
+- Los DOCX se generan en paralelo en un pool de procesos.
+- Los overrides por grupo vienen de un manifiesto JSON:
+    {"*": {"Reportado por": "Ana"}, "fw-01": {"No de alerta": "INC-1042", "Criticidad": "Alta"}}
+  "*" se aplica a todos los grupos; la entrada del grupo tiene prioridad.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import json, re
+from normalizer import stats
+from normalizer.core import NormalizedEvent
+from normalizer.sqlite_store import is_sqlite_file
+from normalizer.timestamps import epoch_to_iso_z
+from .fields import TOPK_CAPACITY, SummaryAggregator, _row_epoch, iter_combined
+from .sqlite_backend import iter_sqlite
+from .run import _render
+
+GROUP_KEYS = ("device", "src_ip", "window")
+DEFAULT_WINDOW = 3600
+# Entrada del manifiesto que se aplica a todos los grupos
+MANIFEST_DEFAULTS = "*"
+
+_UNSAFE = re.compile(r"[^\w.-]+")
+
+def _key_fn(by: str, window: int) -> Callable[[NormalizedEvent], str]:
+    if by == "device":
+        return lambda r: r.device
+    if by == "src_ip":
+        return lambda r: r.src_ip
+    if by == "window":
+        if window <= 0:
+            raise ValueError("La ventana debe ser de al menos 1 segundo.")
+        def key(r: NormalizedEvent) -> str:
+            e = _row_epoch(r)
+            return epoch_to_iso_z(e - e % window) if e is not None else ""
+        return key
+    raise ValueError(f"Clave de agrupación desconocida: {by} (opciones: {', '.join(GROUP_KEYS)})")
+
+def group_summaries(combined: str, by: str = "device", window: int = DEFAULT_WINDOW,
+                    capacity: int = TOPK_CAPACITY) -> Dict[str, Dict]:
+    """
+    Resumen por grupo en una sola pasada, en orden de primera aparición.
+    Los eventos sin valor para la clave no entran en ningún grupo.
+    """
+    key = _key_fn(by, window)
+    rows = iter_sqlite(combined) if is_sqlite_file(combined) else iter_combined(combined)
+    groups: Dict[str, SummaryAggregator] = {}
+    skipped = 0
+    for r in rows:
+        k = key(r)
+        if not k:
+            skipped += 1
+            continue
+        agg = groups.get(k)
+        if agg is None:
+            agg = groups[k] = SummaryAggregator(capacity)
+        agg.add(r)
+    if skipped:
+        print(f"[WARN] {skipped} eventos sin valor para '{by}' (no se incluyen en ningún reporte).")
+    return {k: agg.result() for k, agg in groups.items()}
+
+def load_manifest(path: Optional[str]) -> Dict[str, Dict[str, str]]:
+    """Overrides por grupo; sin manifiesto, vacío."""
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        man = json.load(f)
+    if not isinstance(man, dict) or not all(isinstance(v, dict) for v in man.values()):
+        raise ValueError(f"Manifiesto inválido: {path} (se espera {{grupo: {{campo: valor}}}})")
+    return {g: {k: str(v) for k, v in fields.items() if v is not None} for g, fields in man.items()}
+
+def _outfiles(keys: List[str], out_dir: Path, prefix: str) -> Dict[str, Path]:
+    """Un nombre de archivo seguro y único por grupo."""
+    out, used = {}, set()
+    for k in keys:
+        stem = f"{prefix}_{_UNSAFE.sub('_', k).strip('_') or 'grupo'}"
+        name, n = stem, 1
+        while name.lower() in used:
+            n += 1
+            name = f"{stem}_{n}"
+        used.add(name.lower())
+        out[k] = out_dir / f"{name}.docx"
+    return out
+
+def generate_batch(combined: str, out_dir: str, by: str = "device", window: int = DEFAULT_WINDOW,
+                   manifest: Optional[str] = None, only_manifest: bool = False,
+                   workers: int = 1, prefix: str = "Reporte",
+                   header_image: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    Un borrador por grupo en `out_dir`. Con `only_manifest` solo se generan los
+    grupos listados en el manifiesto. Devuelve [(grupo, ruta del .docx)].
+    """
+    overrides = load_manifest(manifest)
+    with stats.stage("summarize"):
+        summaries = group_summaries(combined, by=by, window=window)
+    if only_manifest:
+        summaries = {k: v for k, v in summaries.items() if k in overrides}
+    missing = [k for k in overrides if k != MANIFEST_DEFAULTS and k not in summaries]
+    if missing:
+        print(f"[WARN] Grupos del manifiesto sin eventos: {', '.join(missing)}")
+    if not summaries:
+        print("[WARN] No hay grupos para generar.")
+        return []
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    files = _outfiles(list(summaries), out, prefix)
+    defaults = overrides.get(MANIFEST_DEFAULTS, {})
+    jobs = [(data, str(files[k]), {**defaults, **overrides.get(k, {})}, header_image)
+            for k, data in summaries.items()]
+
+    if workers and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            for fut in [ex.submit(_render, *job) for job in jobs]:
+                fut.result()
+    else:
+        for job in jobs:
+            _render(*job)
+    print(f"[OK] {len(jobs)} borradores en {out}")
+    return [(k, str(files[k])) for k in summaries]
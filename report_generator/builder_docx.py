@@ -1,7 +1,12 @@
 from docx import Document
 from docx.shared import Pt, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-import os
+from docx.table import Table
+from copy import deepcopy
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+import threading
 
 FIELD_ORDER = [
     "No de alerta", "Criticidad", "Reportado por", "Descripción de la alerta",
@@ -10,6 +15,11 @@ FIELD_ORDER = [
     "Indicadores de Compromiso (IoCs)", "Cuenta/s", "Análisis", "Recomendaciones",
 ]
 
+# Raíz del proyecto (carpeta que contiene report_generator/ e img/)
+BASE_DIR = Path(__file__).resolve().parent.parent
+# Imagen del encabezado; una ruta relativa se resuelve contra BASE_DIR, no contra el cwd
+HEADER_IMAGE = Path("img") / "Notificacion_de_seguridad.jpg"
+
 def _style_doc(doc: Document):
     style = doc.styles["Normal"]
     font = style.font
@@ -21,7 +31,12 @@ def _available_width_inches(doc: Document) -> float:
     emu_to_inch = 1 / 914400
     return (section.page_width - section.left_margin - section.right_margin) * emu_to_inch
 
-def build_docx(data: dict, outfile: str):
+def resolve_header_image(path=None) -> Path:
+    p = Path(path) if path else HEADER_IMAGE
+    return p if p.is_absolute() else BASE_DIR / p
+
+def _new_document(img_path: str) -> Document:
+    """Documento base: estilos, márgenes, encabezado con imagen y tabla con etiquetas, sin valores."""
     doc = Document()
     _style_doc(doc)
 
@@ -41,42 +56,70 @@ def build_docx(data: dict, outfile: str):
     hdr_para = hdr_cell.paragraphs[0]
     hdr_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
-    img_path = os.path.join(os.getcwd(), "img", "Notificacion_de_seguridad.jpg")
-    if os.path.exists(img_path):
+    if Path(img_path).exists():
         run = hdr_para.add_run()
         run.add_picture(img_path, width=Inches(_available_width_inches(doc)))
     else:
+        print(f"[WARN] No se encontró la imagen del encabezado: {img_path}")
         r = hdr_para.add_run("NOTIFICACIÓN DE SEGURIDAD")
         r.bold = True
         r.font.size = Pt(16)
 
-    # === Celdas Campo | Valor ===
+    # === Columna izquierda: etiquetas ===
     for field in FIELD_ORDER:
-        row = table.add_row().cells
-
-        # Columna izquierda:
-        left = row[0]
-        left.text = "" 
+        left = table.add_row().cells[0]
+        left.text = ""
         left_run = left.paragraphs[0].add_run(field + ":")
         left_run.bold = True
 
-        # Columna derecha: 
-        if field == "Indicadores de Compromiso (IoCs)":
-            raw_text = str(data.get(field, "") or "")
-            paragraph = row[1].paragraphs[0]
-            for line in raw_text.split("\n"):
-                txt = (line or "").strip()
-                if not txt:
-                    paragraph.add_run("\n")
-                    continue
-                if txt.lower().startswith(("malware name", "hash", "ip maliciosa", "puertos")):
-                    r = paragraph.add_run(txt + "\n")
-                    r.bold = True
-                else:
-                    paragraph.add_run(txt + "\n")
+    doc.add_paragraph("")
+    return doc
+
+class _Template:
+    """
+    Documento base armado una vez por proceso (y por imagen), con la imagen ya
+    embebida. Cada reporte reemplaza la tabla por una copia limpia del esqueleto
+    y completa los valores; el resto del paquete (estilos, imagen) se reutiliza.
+    """
+    def __init__(self, img_path: str):
+        self.doc = _new_document(img_path)
+        self.skeleton = deepcopy(self.doc.tables[0]._tbl)
+        self.lock = threading.Lock()
+
+    def fresh_table(self) -> Table:
+        current = self.doc.tables[0]._tbl
+        tbl = deepcopy(self.skeleton)
+        current.getparent().replace(current, tbl)
+        return Table(tbl, self.doc)
+
+@lru_cache(maxsize=4)
+def _template(img_path: str) -> _Template:
+    return _Template(img_path)
+
+def _fill_iocs(paragraph, raw_text: str):
+    for line in raw_text.split("\n"):
+        txt = (line or "").strip()
+        if not txt:
+            paragraph.add_run("\n")
+            continue
+        if txt.lower().startswith(("malware name", "hash", "ip maliciosa", "puertos")):
+            r = paragraph.add_run(txt + "\n")
+            r.bold = True
         else:
-            row[1].text = str(data.get(field, ""))
+            paragraph.add_run(txt + "\n")
 
-    doc.add_paragraph("")
-    doc.save(outfile)
+def build_docx(data: dict, outfile: str, header_image: Optional[str] = None):
+    tpl = _template(str(resolve_header_image(header_image)))
+    with tpl.lock:
+        rows = tpl.fresh_table().rows
+
+        # === Columna derecha: valores ===
+        for i, field in enumerate(FIELD_ORDER, start=1):
+            cell = rows[i].cells[1]
+            if field == "Indicadores de Compromiso (IoCs)":
+                _fill_iocs(cell.paragraphs[0], str(data.get(field, "") or ""))
+            else:
+                cell.text = str(data.get(field, ""))
+
+        tpl.doc.save(outfile)
     print(f"[OK] Reporte generado en: {outfile}")
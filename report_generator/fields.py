@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
-import csv, re
-from collections import Counter
-from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional
+import csv, heapq, re
+from operator import itemgetter
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from normalizer.core import FIELDNAMES, NormalizedEvent, open_text
+from normalizer.timestamps import epoch_to_iso_z, iso_to_epoch, parse_iso_utc
 
 # ----------------- Helpers de saneo -----------------
 _IPv4_RE = re.compile(r"^(?:(?:25[0-5]|2[0-4]\d|1?\d?\d)\.){3}(?:25[0-5]|2[0-4]\d|1?\d?\d)$")
@@ -18,24 +20,56 @@ def _safe_dt(s: str) -> Optional[datetime]:
     """Devuelve datetime NAIVE en UTC (sin tzinfo)."""
     if not s:
         return None
-    s = s.strip().replace("Z", "+00:00")
-    for fmt in ("%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"):
+    return parse_iso_utc(s)
+
+def _row_epoch(r: NormalizedEvent) -> Optional[int]:
+    """Usa la columna epoch del normalizador; solo parsea el ISO si falta."""
+    e = r.epoch
+    if e:
         try:
-            dt = datetime.strptime(s, fmt)
-            if dt.tzinfo is not None:
-                dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
-            return dt
-        except Exception:
-            continue
-    return None
-
-def read_combined(path: str) -> List[Dict[str, str]]:
-    rows: List[Dict[str, str]] = []
-    with open(path, "r", encoding="utf-8", newline="") as f:
-        dr = csv.DictReader(f)
-        for r in dr:
-            rows.append({(k or "").strip(): (v or "").strip() for k, v in r.items()})
-    return rows
+            return int(e)
+        except ValueError:
+            pass
+    return iso_to_epoch(r.timestamp or "")
+
+def iter_combined(path: str) -> Iterator[NormalizedEvent]:
+    """
+    Lee el combined CSV como NormalizedEvent (valores con strip, columnas
+    ausentes = ''). El header se resuelve una sola vez; se ignoran columnas extra.
+    """
+    with open_text(path, newline="") as f:
+        rd = csv.reader(f)
+        header = next(rd, None)
+        if header is None:
+            return
+        index = {}
+        for i, k in enumerate(header):
+            index[k.strip()] = i
+        cols = [index.get(k) for k in FIELDNAMES]
+        width = len(header)
+        exact = cols == list(range(len(FIELDNAMES))) and width == len(FIELDNAMES)
+        for r in rd:
+            if not r:
+                continue
+            if exact and len(r) == width:
+                yield NormalizedEvent(*map(str.strip, r))
+                continue
+            n = len(r)
+            yield NormalizedEvent(*[r[i].strip() if i is not None and i < n else "" for i in cols])
+
+def in_window(rows: Iterable[NormalizedEvent], start: Optional[int] = None,
+              end: Optional[int] = None) -> Iterator[NormalizedEvent]:
+    """Eventos con epoch en [start, end); sin rango pasan todos, los que no tienen fecha quedan afuera."""
+    if start is None and end is None:
+        yield from rows
+        return
+    for r in rows:
+        e = _row_epoch(r)
+        if e is not None and (start is None or e >= start) and (end is None or e < end):
+            yield r
+
+def read_combined(path: str) -> List[NormalizedEvent]:
+    return list(iter_combined(path))
 
 # ----------------- Reglas de llenado -----------------
 ANALYST_FIELDS = {
@@ -57,15 +91,27 @@ def _na_if_empty(val: str) -> str:
     """Para campos AUTO: si no hay valor -> 'N/A'."""
     return val if (val is not None and val != "") else "N/A"
 
-# ----------------- Resumen principal -----------------
-def summarize(rows: List[Dict[str, str]]) -> Dict[str, Any]:
-    """
-    Mapea el combined CSV a la plantilla SOC.
-    - Campos del analista: siempre vacíos.
-    - Campos auto: valor calculado o 'N/A' si no hay datos.
-    """
+# Cantidad de valores que se listan por categoría
+TOP_MALWARE = 3
+TOP_HASHES = 6
+TOP_EXT_IPS = 6
+TOP_PORTS = 6
+TOP_USERS = 5
+
+def _norm_port(p) -> Optional[int]:
+    """Puertos válidos: 1..65535."""
+    try:
+        pi = int(str(p).strip())
+    except Exception:
+        return None
+    return pi if 1 <= pi <= 65535 else None
+
+def _is_external_ip(ip: str) -> bool:
+    return bool(_IPv4_RE.match(ip)) and not _is_private(ip)
+
+def _empty_out() -> Dict[str, Any]:
     # Base con todos los campos
-    out: Dict[str, Any] = {
+    return {
         "No de alerta": "",
         "Criticidad": "",
         "Reportado por": "",
@@ -75,60 +121,28 @@ def summarize(rows: List[Dict[str, str]]) -> Dict[str, Any]:
         "Fuentes de Logs": "",
         "IP Origen": "",
         "IP Destino": "",
-        "Evento contenido": "",  
+        "Evento contenido": "",
         "Indicadores de Compromiso (IoCs)": "",
         "Cuenta/s": "",
         "Análisis": "",
         "Recomendaciones": "",
     }
 
-    if not rows:
+def _fill_summary(out: Dict[str, Any], ts_min: str, total: int, devices: List[str],
+                  src_top: str, dst_top: str, top_mal: List[str], top_hash: List[str],
+                  top_ext_ips: List[str], top_ports: List[str], top_users: List[str]) -> Dict[str, Any]:
+    """Vuelca los agregados (de cualquier backend) en los campos de la plantilla."""
+    if not total:
         for f in AUTO_FIELDS:
             out[f] = "N/A"
         return out
 
-    ts_list = [t for t in (_safe_dt(r.get("timestamp", "")) for r in rows) if t]
-    ts_min = (min(ts_list).strftime("%Y-%m-%dT%H:%M:%S") + "Z") if ts_list else ""
     out["Fecha y hora de Inicio de la alerta"] = _na_if_empty(ts_min)
-
-    out["Total de Eventos"] = _na_if_empty(str(len(rows)))
-
-    uniq_devices: List[str] = []
-    for r in rows:
-        d = (r.get("device") or "").strip()
-        if d and d not in uniq_devices:
-            uniq_devices.append(d)
-    fuentes = ", ".join(uniq_devices)
-    out["Fuentes de Logs"] = _na_if_empty(fuentes)
-
-    src_ips_all = [(r.get("src_ip") or "").strip() for r in rows if (r.get("src_ip") or "").strip()]
-    dst_ips_all = [(r.get("dst_ip") or "").strip() for r in rows if (r.get("dst_ip") or "").strip()]
-    src_top = Counter(src_ips_all).most_common(1)[0][0] if src_ips_all else ""
-    dst_top = Counter(dst_ips_all).most_common(1)[0][0] if dst_ips_all else ""
+    out["Total de Eventos"] = _na_if_empty(str(total))
+    out["Fuentes de Logs"] = _na_if_empty(", ".join(devices))
     out["IP Origen"]  = _na_if_empty(src_top)
     out["IP Destino"] = _na_if_empty(dst_top)
 
-    malnames = [(r.get("malware_name") or "").strip() for r in rows if (r.get("malware_name") or "").strip()]
-    hashes   = [(r.get("malware_hash") or "").strip() for r in rows if (r.get("malware_hash") or "").strip()]
-
-    # Puertos: 1..65535
-    norm_ports: List[int] = []
-    for p in [r.get("dst_port") for r in rows if r.get("dst_port")]:
-        try:
-            pi = int(str(p).strip())
-            if 1 <= pi <= 65535:
-                norm_ports.append(pi)
-        except Exception:
-            pass
-
-    ext_ips_raw = src_ips_all + dst_ips_all
-    ext_ips = [ip for ip in ext_ips_raw if _IPv4_RE.match(ip) and not _is_private(ip)]
-
-    top_mal     = [m for m, _ in Counter(malnames).most_common(3)]
-    top_hash    = [h for h, _ in Counter(hashes).most_common(6)]
-    top_ext_ips = [ip for ip, _ in Counter(ext_ips).most_common(6)]
-    top_ports   = [str(p) for p, _ in Counter(norm_ports).most_common(6)]
-
     lines: List[str] = []
     if top_mal:
         lines.append("Malware name:")
@@ -152,8 +166,153 @@ def summarize(rows: List[Dict[str, str]]) -> Dict[str, Any]:
     out["Indicadores de Compromiso (IoCs)"] = _na_if_empty(iocs)
 
     # ---------- Cuentas ----------
-    users = [(r.get("username") or "").strip() for r in rows if (r.get("username") or "").strip()]
-    victims = ", ".join(u for u, _ in Counter(users).most_common(5))
-    out["Cuenta/s"] = _na_if_empty(victims)
-
+    out["Cuenta/s"] = _na_if_empty(", ".join(top_users))
     return out
+
+# ----------------- Agregación incremental -----------------
+# Valores distintos que cada contador top-k mantiene como máximo
+TOPK_CAPACITY = 65536
+
+class TopK:
+    """
+    Contador de frecuencias con memoria acotada (Space-Saving).
+    Mientras haya menos de `capacity` valores distintos los conteos son exactos y
+    los empates se resuelven por primera aparición (igual que Counter). Al llenarse,
+    un valor nuevo reemplaza al de menor conteo y hereda ese conteo + 1.
+    """
+    __slots__ = ("capacity", "counts", "_heap", "_seq")
+
+    def __init__(self, capacity: int = TOPK_CAPACITY):
+        self.capacity = max(1, capacity)
+        self.counts: Dict[Any, int] = {}
+        self._heap: Optional[List[Tuple[int, int, Any]]] = None
+        self._seq = 0
+
+    def add(self, key) -> None:
+        counts = self.counts
+        c = counts.get(key)
+        if c is not None:
+            counts[key] = c + 1
+        elif len(counts) < self.capacity:
+            counts[key] = 1
+        else:
+            self._replace_min(key)
+
+    def _replace_min(self, key) -> None:
+        heap = self._heap
+        if heap is None:
+            # (conteo, secuencia, clave): los conteos del heap pueden quedar viejos,
+            # nunca por encima del real, así que se corrigen al llegar a la cima.
+            heap = self._heap = [(c, i, k) for i, (k, c) in enumerate(self.counts.items())]
+            self._seq = len(heap)
+            heapq.heapify(heap)
+        while True:
+            c, _, k = heap[0]
+            cur = self.counts[k]
+            if cur == c:
+                break
+            self._seq += 1
+            heapq.heapreplace(heap, (cur, self._seq, k))
+        del self.counts[k]
+        self.counts[key] = c + 1
+        self._seq += 1
+        heapq.heapreplace(heap, (c + 1, self._seq, key))
+
+    def merged(self, norm: Callable[[Any], Any]) -> Dict[Any, int]:
+        """Conteos agrupados por norm(clave), en orden de primera aparición; descarta None y ''."""
+        out: Dict[Any, int] = {}
+        for k, c in self.counts.items():
+            nk = norm(k)
+            if nk is None or nk == "":
+                continue
+            out[nk] = out.get(nk, 0) + c
+        return out
+
+def _strip(v) -> str:
+    return v.strip() if isinstance(v, str) else str(v).strip()
+
+def _most_common(counts: Dict[Any, int], n: int) -> List[Any]:
+    # nlargest es estable: a igual conteo gana el primero insertado (como Counter)
+    return [k for k, _ in heapq.nlargest(n, counts.items(), key=itemgetter(1))]
+
+class SummaryAggregator:
+    """
+    Acumula en una sola pasada, evento por evento, lo que necesita la plantilla:
+    timestamp mínimo, total, dispositivos en orden de aparición y top-k de IPs,
+    puertos, hashes, malware y cuentas. La memoria no depende del total de eventos.
+    Los valores se cuentan crudos y se normalizan (strip, puerto válido) al final.
+    """
+    def __init__(self, capacity: int = TOPK_CAPACITY):
+        self.total = 0
+        self.min_epoch: Optional[int] = None
+        self.devices: Dict[Any, None] = {}
+        self.src = TopK(capacity)
+        self.dst = TopK(capacity)
+        self.ports = TopK(capacity)
+        self.malware = TopK(capacity)
+        self.hashes = TopK(capacity)
+        self.users = TopK(capacity)
+
+    def add(self, r: NormalizedEvent) -> None:
+        self.total += 1
+        e = _row_epoch(r)
+        if e is not None and (self.min_epoch is None or e < self.min_epoch):
+            self.min_epoch = e
+        if r.device and r.device not in self.devices:
+            self.devices[r.device] = None
+        if r.src_ip:
+            self.src.add(r.src_ip)
+        if r.dst_ip:
+            self.dst.add(r.dst_ip)
+        if r.dst_port:
+            self.ports.add(r.dst_port)
+        if r.malware_name:
+            self.malware.add(r.malware_name)
+        if r.malware_hash:
+            self.hashes.add(r.malware_hash)
+        if r.username:
+            self.users.add(r.username)
+
+    def update(self, rows: Iterable[NormalizedEvent]) -> "SummaryAggregator":
+        add = self.add
+        for r in rows:
+            add(r)
+        return self
+
+    def result(self) -> Dict[str, Any]:
+        out = _empty_out()
+        if not self.total:
+            return _fill_summary(out, "", 0, [], "", "", [], [], [], [], [])
+
+        ts_min = epoch_to_iso_z(self.min_epoch) if self.min_epoch is not None else ""
+        devices = list(dict.fromkeys(d for d in map(_strip, self.devices) if d))
+
+        src = self.src.merged(_strip)
+        dst = self.dst.merged(_strip)
+        src_top = (_most_common(src, 1) or [""])[0]
+        dst_top = (_most_common(dst, 1) or [""])[0]
+
+        # Orígenes primero y luego destinos (como Counter(src_ips + dst_ips))
+        ext: Dict[str, int] = {ip: c for ip, c in src.items() if _is_external_ip(ip)}
+        for ip, c in dst.items():
+            if _is_external_ip(ip):
+                ext[ip] = ext.get(ip, 0) + c
+
+        return _fill_summary(
+            out, ts_min, self.total, devices, src_top, dst_top,
+            _most_common(self.malware.merged(_strip), TOP_MALWARE),
+            _most_common(self.hashes.merged(_strip), TOP_HASHES),
+            _most_common(ext, TOP_EXT_IPS),
+            [str(p) for p in _most_common(self.ports.merged(_norm_port), TOP_PORTS)],
+            _most_common(self.users.merged(_strip), TOP_USERS),
+        )
+
+# ----------------- Resumen principal -----------------
+def summarize(rows: Iterable[NormalizedEvent]) -> Dict[str, Any]:
+    """
+    Mapea el combined CSV a la plantilla SOC.
+    - Campos del analista: siempre vacíos.
+    - Campos auto: valor calculado o 'N/A' si no hay datos.
+    Acepta cualquier iterable (p. ej. iter_combined) y lo recorre una sola vez.
+    """
+    return SummaryAggregator().update(rows).result()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from report_generator.batch import DEFAULT_WINDOW, GROUP_KEYS, generate_batch
+import argparse
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Un borrador de reporte SOC L1 por grupo de eventos (device, IP origen o ventana de tiempo) desde un mismo combined CSV"
+    )
+    ap.add_argument("--in", dest="combined_csv", required=True, help="Ruta al CSV unificado (combined) o a la base .sqlite del normalizador")
+    ap.add_argument("--out-dir", dest="out_dir", required=True, help="Carpeta de salida de los .docx")
+    ap.add_argument("--by", choices=GROUP_KEYS, default="device", help="Clave de agrupación (default: device)")
+    ap.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                    help=f"Tamaño de la ventana en segundos con --by window (default: {DEFAULT_WINDOW})")
+    ap.add_argument("--manifest", default=None,
+                    help='JSON con overrides por grupo, p. ej. {"*": {"Reportado por": "Ana"}, "fw-01": {"No de alerta": "INC-1042"}}')
+    ap.add_argument("--only-manifest", action="store_true", help="Genera solo los grupos listados en el manifiesto")
+    ap.add_argument("--workers", type=int, default=1, help="Procesos en paralelo para generar los .docx")
+    ap.add_argument("--prefix", default="Reporte", help="Prefijo de los nombres de archivo (default: Reporte)")
+    ap.add_argument("--header-image", dest="header_image", default=None,
+                    help="Imagen del encabezado del .docx (default: img/Notificacion_de_seguridad.jpg; las rutas relativas se resuelven contra la carpeta del proyecto)")
+    args = ap.parse_args()
+
+    generate_batch(
+        args.combined_csv,
+        args.out_dir,
+        by=args.by,
+        window=args.window,
+        manifest=args.manifest,
+        only_manifest=args.only_manifest,
+        workers=args.workers,
+        prefix=args.prefix,
+        header_image=args.header_image,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,32 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from report_generator.run import generate_report
+from report_generator.run import BACKENDS, generate_report
+from normalizer import stats
 import argparse
 
 def main():
     ap = argparse.ArgumentParser(
         description="Generador de borrador de reporte SOC L1 desde logs unificados (combined CSV)"
     )
-    ap.add_argument("--in", dest="combined_csv", required=True, help="Ruta al CSV unificado (combined)")
+    ap.add_argument("--in", dest="combined_csv", required=True, help="Ruta al CSV unificado (combined), a la base .sqlite del normalizador o a una carpeta particionada (--partition)")
     ap.add_argument("--out", dest="outfile", default="Reporte_Borrador.docx", help="Ruta de salida .docx")
     ap.add_argument("--alert-id", dest="alert_id", default=None, help="No. de alerta (opcional)")
     ap.add_argument("--criticidad", dest="criticidad", default=None, help="Criticidad (opcional)")
     ap.add_argument("--reportado-por", dest="reportado_por", default=None, help="Nombre del analista (opcional)")
+    ap.add_argument("--backend", choices=BACKENDS, default="python",
+                    help="Cálculo del resumen: 'python' (streaming, memoria constante) o 'numpy' (columnas tipadas; requiere numpy)")
+    ap.add_argument("--header-image", dest="header_image", default=None,
+                    help="Imagen del encabezado del .docx (default: img/Notificacion_de_seguridad.jpg; las rutas relativas se resuelven contra la carpeta del proyecto)")
+    ap.add_argument("--from", dest="time_from", default=None,
+                    help="Solo eventos desde este instante (ISO, p. ej. 2025-11-04T14:00:00; UTC si no trae zona)")
+    ap.add_argument("--to", dest="time_to", default=None,
+                    help="Solo eventos anteriores a este instante (ISO; el límite no se incluye)")
+    ap.add_argument("--stats", dest="stats", default=None,
+                    help="Guarda tiempos por etapa y contadores en este JSON (p. ej. stats.json)")
     args = ap.parse_args()
+    if args.stats:
+        stats.enable()
 
     generate_report(
         combined_csv=args.combined_csv,
@@ -22,8 +35,14 @@ def main():
             "No de alerta": args.alert_id,
             "Criticidad": args.criticidad,
             "Reportado por": args.reportado_por,
-        }
+        },
+        backend=args.backend,
+        header_image=args.header_image,
+        time_from=args.time_from,
+        time_to=args.time_to,
     )
+    if args.stats:
+        stats.finish(args.stats)
 
 if __name__ == "__main__":
     main()
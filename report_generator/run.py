@@ -1,18 +1,152 @@
 # -*- coding: utf-8 -*-
-from typing import Dict
-from .fields import read_combined, summarize
+from typing import Dict, Iterable, List, Optional
+import os, time
+from normalizer.core import NormalizedEvent
+from normalizer.run import normalize_iter
+from normalizer.follow import POLL_INTERVAL, follow_files
+from normalizer.sqlite_store import is_sqlite_file
+from normalizer.partitions import is_partitioned, select_partitions
+from normalizer.timestamps import iso_to_epoch
+from normalizer import stats
+from normalizer.progress import CancelToken, ProgressFn, Tracker
+from .fields import SummaryAggregator, in_window, iter_combined, summarize
+from .sqlite_backend import summarize_sqlite
+from .numpy_backend import summarize_numpy
 from .builder_docx import build_docx
 
-def generate_report(combined_csv: str, outfile: str, override: Dict[str,str] = None):
-    rows = read_combined(combined_csv)
-    data = summarize(rows)
-
+def _render(data: Dict, outfile: str, override: Optional[Dict[str, str]],
+            header_image: Optional[str] = None):
     if override:
         for k, v in override.items():
             if v not in (None, ""):
                 data[k] = v
 
-    build_docx(data, outfile)
+    with stats.stage("render"):
+        build_docx(data, outfile, header_image=header_image)
     print(f"[OK] Borrador generado: {outfile}")
 
+BACKENDS = ("python", "numpy")
+
+def _epoch_arg(value: Optional[str], name: str) -> Optional[int]:
+    if not value:
+        return None
+    e = iso_to_epoch(value)
+    if e is None:
+        raise ValueError(f"{name} no es un timestamp ISO válido: {value}")
+    return e
+
+def _tracked_files(paths: List[str], tracker: Tracker, tracked: bool) -> Iterable[NormalizedEvent]:
+    for p in paths:
+        events = iter_combined(p)
+        yield from tracker.track(events, p) if tracked else events
+
+def generate_report(combined_csv: str, outfile: str, override: Dict[str,str] = None,
+                    backend: str = "python", header_image: Optional[str] = None,
+                    progress: Optional[ProgressFn] = None, cancel: Optional[CancelToken] = None,
+                    time_from: Optional[str] = None, time_to: Optional[str] = None):
+    """
+    Acepta el CSV combinado (opcionalmente comprimido), la base .sqlite del
+    normalizador o una carpeta particionada (normalize_files con `partition`).
+    Con `time_from`/`time_to` (ISO, UTC si no trae zona) el resumen cubre solo
+    [desde, hasta); en una carpeta particionada se abren solo las particiones
+    que se cruzan con ese rango.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {backend} (opciones: {', '.join(BACKENDS)})")
+    start, end = _epoch_arg(time_from, "--from"), _epoch_arg(time_to, "--to")
+    ranged = start is not None or end is not None
+    partitioned = os.path.isdir(combined_csv) and is_partitioned(combined_csv)
+    if (ranged or partitioned) and (backend != "python" or is_sqlite_file(combined_csv)):
+        raise ValueError("El rango de tiempo y las carpetas particionadas solo admiten el backend python sobre CSV.")
+    if partitioned:
+        paths = [str(p) for p in select_partitions(combined_csv, start, end)]
+        print(f"[INFO] {len(paths)} partición(es) dentro del rango.")
+    else:
+        paths = [combined_csv]
+    tracker = Tracker(sum(map(os.path.getsize, paths)), progress, cancel)
+    name = os.path.basename(combined_csv)
+    with stats.stage("summarize"):
+        if is_sqlite_file(combined_csv):
+            # SQLite y NumPy no avanzan fila a fila: solo se cancela antes y después
+            tracker.report(name)
+            data = summarize_sqlite(combined_csv)
+        elif backend == "numpy":
+            # Columnas tipadas en memoria; conteos exactos sin importar la cardinalidad
+            tracker.report(name)
+            data = summarize_numpy(combined_csv)
+        else:
+            # Una sola pasada sobre el CSV, en memoria constante
+            events = _tracked_files(paths, tracker, progress is not None or cancel is not None)
+            data = summarize(in_window(events, start, end))
+    tracker.check()
+    tracker.report("generando .docx", tracker.total)
+    _render(data, outfile, override, header_image)
+
+def generate_report_from_events(events: Iterable[NormalizedEvent], outfile: str,
+                                override: Dict[str, str] = None, header_image: Optional[str] = None):
+    """Reporte a partir de eventos ya normalizados (p. ej. normalizer.normalize_iter)."""
+    with stats.stage("summarize"):
+        data = summarize(events)
+    _render(data, outfile, override, header_image)
+
+def build_report(inputs: List[str], outfile: str, combined_csv: Optional[str] = None,
+                 override: Dict[str, str] = None, max_rows_in_memory: Optional[int] = None,
+                 workers: int = 1, header_image: Optional[str] = None,
+                 progress: Optional[ProgressFn] = None, cancel: Optional[CancelToken] = None,
+                 incremental: bool = False):
+    """
+    Logs crudos -> reporte en un solo proceso, sin releer un CSV intermedio.
+    Con `combined_csv` el CSV combinado se escribe igual, como derivación.
+    Con `incremental` (requiere `combined_csv`) solo se parsea lo agregado desde
+    el último checkpoint; el resumen recorre en la misma pasada las filas del
+    combinado existente y las nuevas, mientras se escribe el combinado actualizado.
+    `progress` recibe el avance en bytes de los logs crudos; con `cancel` la
+    corrida termina con Cancelled sin dejar el combinado ni el .docx a medias.
+    """
+    if incremental and not combined_csv:
+        raise ValueError("El modo incremental necesita la ruta del CSV combinado.")
+    events = normalize_iter(inputs, max_rows_in_memory=max_rows_in_memory, workers=workers,
+                            tee=combined_csv, progress=progress, cancel=cancel, incremental=incremental)
+    # Los eventos se producen a medida que se resumen: la etapa incluye el merge y
+    # la escritura del CSV (parse/sort se miden además por separado)
+    with stats.stage("normalize+summarize"):
+        data = summarize(events)
+    if cancel is not None:
+        cancel.check()
+    if progress is not None:
+        progress(1, 1, "generando .docx")
+    _render(data, outfile, override, header_image)
+
+def follow_report(inputs: List[str], combined_csv: str, outfile: str, every: float,
+                  override: Dict[str, str] = None, header_image: Optional[str] = None,
+                  poll_interval: float = POLL_INTERVAL, cancel: Optional[CancelToken] = None,
+                  max_rows_in_memory: Optional[int] = None, workers: int = 1):
+    """
+    normalizer.follow.follow_files + un reporte que se regenera cada `every`
+    segundos si llegaron eventos. El resumen se lee una vez del CSV al arrancar y
+    después solo suma los eventos de cada micro-lote (costo proporcional a lo agregado).
+    """
+    agg: Optional[SummaryAggregator] = None
+    dirty = False
+    last = 0.0
+
+    def on_batch(events: List[NormalizedEvent]):
+        nonlocal agg, dirty, last
+        if agg is None:
+            # Primer sondeo: el CSV ya tiene la corrida inicial (incluido este lote)
+            with stats.stage("summarize"):
+                agg = SummaryAggregator().update(iter_combined(combined_csv))
+            dirty = True
+        elif events:
+            with stats.stage("summarize"):
+                agg.update(events)
+            dirty = True
+        now = time.monotonic()
+        if dirty and now - last >= every:
+            _render(agg.result(), outfile, override, header_image)
+            dirty, last = False, now
 
+    follow_files(inputs, combined_csv, poll_interval=poll_interval, on_batch=on_batch, cancel=cancel,
+                 max_rows_in_memory=max_rows_in_memory, workers=workers)
+    if dirty:
+        _render(agg.result(), outfile, override, header_image)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Backend SQL de summarize: calcula los agregados con GROUP BY sobre la base que
+genera normalizer.sqlite_store, sin cargar los eventos en listas de Python.
+Los empates se rompen por primera aparición (MIN(rowid)), igual que Counter.
+"""
+from typing import Any, Dict, Iterator, List
+import sqlite3
+from normalizer.core import FIELDNAMES, NormalizedEvent
+from normalizer.sqlite_store import TABLE
+from normalizer.timestamps import epoch_to_iso_z, iso_to_epoch
+from .fields import (
+    TOP_EXT_IPS, TOP_HASHES, TOP_MALWARE, TOP_PORTS, TOP_USERS,
+    _empty_out, _fill_summary, _is_external_ip, _norm_port,
+)
+
+# Mismo saneo que read_combined (str.strip)
+_WS = "' \t\r\n'"
+
+def _trim(col: str) -> str:
+    return f"TRIM(COALESCE({col}, ''), {_WS})"
+
+def _top(con: sqlite3.Connection, col: str, limit: int) -> List[str]:
+    v = _trim(col)
+    sql = (f"SELECT {v} AS v FROM {TABLE} WHERE {v} != '' "
+           f"GROUP BY v ORDER BY COUNT(*) DESC, MIN(rowid) LIMIT ?")
+    return [r[0] for r in con.execute(sql, (limit,))]
+
+def summarize_sqlite(db_path: str) -> Dict[str, Any]:
+    out = _empty_out()
+    con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        con.create_function("norm_port", 1, _norm_port, deterministic=True)
+        con.create_function("is_ext_ip", 1, _is_external_ip, deterministic=True)
+        con.create_function("iso_epoch", 1, lambda s: iso_to_epoch(s or ""), deterministic=True)
+
+        total = con.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+        if not total:
+            return _fill_summary(out, "", 0, [], "", "", [], [], [], [], [])
+
+        ts = con.execute(
+            f"SELECT MIN(COALESCE(epoch, iso_epoch(timestamp))) FROM {TABLE}"
+        ).fetchone()[0]
+        ts_min = epoch_to_iso_z(ts) if ts is not None else ""
+
+        d = _trim("device")
+        devices = [r[0] for r in con.execute(
+            f"SELECT {d} AS v FROM {TABLE} WHERE {d} != '' GROUP BY v ORDER BY MIN(rowid)")]
+
+        src_top = (_top(con, "src_ip", 1) or [""])[0]
+        dst_top = (_top(con, "dst_ip", 1) or [""])[0]
+        top_mal = _top(con, "malware_name", TOP_MALWARE)
+        top_hash = _top(con, "malware_hash", TOP_HASHES)
+        top_users = _top(con, "username", TOP_USERS)
+
+        p = _trim("dst_port")
+        top_ports = [str(r[0]) for r in con.execute(
+            f"SELECT norm_port({p}) AS v FROM {TABLE} WHERE {p} != '' AND v IS NOT NULL "
+            f"GROUP BY v ORDER BY COUNT(*) DESC, MIN(rowid) LIMIT ?", (TOP_PORTS,))]
+
+        # Orígenes primero y luego destinos (mismo orden que src_ips_all + dst_ips_all)
+        s, t = _trim("src_ip"), _trim("dst_ip")
+        top_ext_ips = [r[0] for r in con.execute(
+            f"SELECT ip FROM ("
+            f"  SELECT {s} AS ip, rowid AS ord FROM {TABLE} WHERE {s} != ''"
+            f"  UNION ALL"
+            f"  SELECT {t} AS ip, rowid + (SELECT MAX(rowid) FROM {TABLE}) AS ord FROM {TABLE} WHERE {t} != ''"
+            f") WHERE is_ext_ip(ip) GROUP BY ip ORDER BY COUNT(*) DESC, MIN(ord) LIMIT ?", (TOP_EXT_IPS,))]
+
+        return _fill_summary(out, ts_min, total, devices, src_top, dst_top,
+                             top_mal, top_hash, top_ext_ips, top_ports, top_users)
+    finally:
+        con.close()
+
+def iter_sqlite(db_path: str) -> Iterator[NormalizedEvent]:
+    """Eventos de la base en el orden del CSV (rowid), saneados como iter_combined."""
+    con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        cur = con.execute(f"SELECT {', '.join(FIELDNAMES)} FROM {TABLE} ORDER BY rowid")
+        for r in cur:
+            yield NormalizedEvent(*["" if v is None else str(v).strip() for v in r])
+    finally:
+        con.close()
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from normalizer.asa import parse_cisco_line
+from normalizer.core import FIELDNAMES
+from normalizer.run import _to_row
+from normalizer.timestamps import set_syslog_year
+
+def test_login_denied_605004_full_row():
+    msg = ('%ASA-6-605004: Login denied from 198.51.100.7/51234 '
+           'to outside:203.0.113.1/ssh for user "admin"')
+    set_syslog_year(2025)
+    try:
+        row = dict(zip(FIELDNAMES, _to_row(parse_cisco_line(f"Nov 04 10:15:13 fw-asa1 {msg}"))))
+    finally:
+        set_syslog_year()
+    assert row == {
+        "timestamp": "2025-11-04T10:15:13", "epoch": "1762251313", "device": "fw-asa1",
+        "src_ip": "198.51.100.7", "src_port": "51234", "dst_ip": "203.0.113.1", "dst_port": "ssh",
+        "protocol": "", "action": "failed_login", "username": "admin",
+        "malware_name": "", "malware_hash": "", "msg": msg,
+        "severity": "6", "message_id": "605004",
+    }